@@ -0,0 +1,706 @@
+"""
+向量化回測引擎
+直接以 NumPy 陣列 (收盤價 / 移動平均 / 交易信號) 執行回測，
+產出與 GeneticAlgorithm.evaluate_fitness 相同的績效欄位：
+總利潤、勝率、最大回撤、Sharpe Ratio
+"""
+
+import random
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# 可選的 numba JIT 編譯器：有安裝時交易模擬狀態機以編譯後的機器碼執行
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 是否使用 numba 核心（未安裝 numba 時使用 NumPy 實作）
+USE_NUMBA = NUMBA_AVAILABLE
+
+# 價格欄位候選名稱（依優先順序）
+PRICE_COLUMNS = ['Close', 'close', '收盤價', 'CLOSE', 'Close Price']
+
+# 日期欄位候選名稱
+DATE_COLUMNS = ['Date', 'date', '日期', 'DATE', 'DateTime', 'Time']
+
+# 初始資金（與原始回測迴圈一致）
+INITIAL_CAPITAL = 1000.0
+
+
+@dataclass
+class BacktestStats:
+    """單次回測統計結果"""
+    total_profit: float = 0.0   # 各筆交易報酬率加總（未換算金額）
+    wins: int = 0
+    trades: int = 0
+    max_drawdown: float = 0.0
+    sharpe_ratio: float = 0.0
+    buy_signals: int = 0
+
+
+def find_price_column(data: pd.DataFrame):
+    """找出價格欄位名稱（已移除BOM字符），找不到時回傳 None"""
+    columns = [str(col).replace('\ufeff', '') for col in data.columns]
+    for name in PRICE_COLUMNS:
+        if name in columns:
+            return data.columns[columns.index(name)]
+
+    # 沒有明確的價格欄位時，使用最後一個數值欄位
+    numeric_cols = data.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) > 0:
+        return numeric_cols[-1]
+    return None
+
+
+def extract_close_array(data: pd.DataFrame):
+    """從DataFrame取出連續的 float64 收盤價陣列（已轉數值並移除缺值）
+
+    回傳 (close, price_column)，找不到價格欄位時 close 為 None
+    """
+    price_column = find_price_column(data)
+    if price_column is None:
+        return None, None
+
+    close = pd.to_numeric(data[price_column], errors='coerce').to_numpy(dtype=np.float64)
+    close = np.ascontiguousarray(close[~np.isnan(close)])
+    return close, str(price_column).replace('\ufeff', '')
+
+
+def _moving_average_from_cumsum(cumsum: np.ndarray, window: int) -> np.ndarray:
+    """由累積和陣列計算簡單移動平均，前 window-1 筆為 NaN"""
+    n = len(cumsum) - 1
+    ma = np.full(n, np.nan)
+    if window <= 0 or window > n:
+        return ma
+    ma[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return ma
+
+
+def moving_average(close: np.ndarray, window: int) -> np.ndarray:
+    """以累積和計算簡單移動平均，前 window-1 筆為 NaN"""
+    return _moving_average_from_cumsum(np.concatenate(([0.0], np.cumsum(close))), window)
+
+
+class MovingAverageBank:
+    """單一資料集的移動平均庫
+
+    以一次累積和預先算出 m_intervals 範圍內所有窗口的移動平均，
+    整個GA執行期間的每次評估都直接取用，不再重複計算 rolling mean。
+    """
+
+    def __init__(self, close: np.ndarray, window_range=(5, 50)):
+        self.close = close
+        self.min_window, self.max_window = int(window_range[0]), int(window_range[1])
+        self._cumsum = np.concatenate(([0.0], np.cumsum(close)))
+
+        windows = range(self.min_window, self.max_window + 1)
+        self.averages = np.vstack([_moving_average_from_cumsum(self._cumsum, w) for w in windows]) \
+            if len(windows) > 0 else np.empty((0, len(close)))
+        self._extra = {}
+
+    def matrix(self, windows) -> np.ndarray:
+        """取得多個窗口的移動平均矩陣 (len(windows) × 交易日)"""
+        windows = np.asarray(windows, dtype=np.int64)
+        if np.all((windows >= self.min_window) & (windows <= self.max_window)):
+            return self.averages[windows - self.min_window]
+        return np.vstack([self.get(w) for w in windows])
+
+    def get(self, window: int) -> np.ndarray:
+        """取得指定窗口的移動平均（範圍外的窗口首次使用時計算並快取）"""
+        window = int(window)
+        if self.min_window <= window <= self.max_window:
+            return self.averages[window - self.min_window]
+        if window not in self._extra:
+            self._extra[window] = _moving_average_from_cumsum(self._cumsum, window)
+        return self._extra[window]
+
+
+@dataclass
+class PreparedSeries:
+    """預先整理好的價格序列
+
+    GA 建立時針對訓練/測試資料各建立一次：移除BOM、偵測價格欄位、轉為數值並移除缺值，
+    之後所有評估只讀取這裡的連續 float64 收盤價陣列與移動平均庫。
+    """
+    name: str
+    close: np.ndarray = None          # 連續的 float64 收盤價（無缺值）
+    dates: np.ndarray = None          # 與 close 對齊的日期（沒有日期欄位時為 None）
+    price_column: str = None
+    source_rows: int = 0              # 原始資料筆數
+    error_message: str = None         # 無法評估的原因，可評估時為 None
+    ma_bank: MovingAverageBank = None
+
+    @property
+    def empty(self) -> bool:
+        return self.source_rows == 0
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error_message is None
+
+    @property
+    def n_bars(self) -> int:
+        return 0 if self.close is None else len(self.close)
+
+
+def prepare_series(data: pd.DataFrame, name: str = 'train', window_range=(5, 50)) -> PreparedSeries:
+    """由DataFrame建立 PreparedSeries（含移動平均庫）"""
+    if data is None or data.empty:
+        return PreparedSeries(name=name, error_message="⚠️ 評估資料為空")
+
+    try:
+        price_column = find_price_column(data)
+        if price_column is None:
+            return PreparedSeries(name=name, source_rows=len(data), error_message="❌ 無法找到價格欄位")
+
+        close = pd.to_numeric(data[price_column], errors='coerce').to_numpy(dtype=np.float64)
+        valid = ~np.isnan(close)
+        close = np.ascontiguousarray(close[valid])
+
+        dates = None
+        columns = [str(col).replace('\ufeff', '') for col in data.columns]
+        for date_name in DATE_COLUMNS:
+            if date_name in columns:
+                dates = pd.to_datetime(data.iloc[:, columns.index(date_name)], errors='coerce').to_numpy()[valid]
+                break
+
+        return PreparedSeries(
+            name=name,
+            close=close,
+            dates=dates,
+            price_column=str(price_column).replace('\ufeff', ''),
+            source_rows=len(data),
+            ma_bank=MovingAverageBank(close, window_range) if len(close) > 0 else None
+        )
+    except Exception as e:
+        return PreparedSeries(name=name, source_rows=len(data), error_message=f"❌ 價格數據轉換失敗: {e}")
+
+
+def effective_window(m_intervals: int, n_bars: int) -> int:
+    """實際使用的移動平均窗口（與原始實作相同的上下限處理）"""
+    return max(1, min(int(m_intervals), n_bars // 2))
+
+
+def generate_signals(close: np.ndarray, ma: np.ndarray, alpha: float) -> np.ndarray:
+    """產生交易信號：1=買入, -1=賣出, 0=無動作（MA 為 NaN 時不產生信號）"""
+    alpha_threshold = alpha / 100.0  # α直接代表門檻百分比
+    signal = np.zeros(len(close), dtype=np.int8)
+    signal[close > ma * (1 + alpha_threshold)] = 1
+    signal[close < ma * (1 - alpha_threshold)] = -1
+    return signal
+
+
+def _trade_state_machine(close, signal, start, end, target_profit_ratio, hold_days):
+    """逐日部位狀態機（開倉 / 達標 / 持有到期 / 賣出信號）
+
+    在迴圈內以累加器計算勝場、交易數、峰值權益、最大回撤，
+    以及每日收益率的 Welford 平均與平方差和，額外記憶體為 O(1)。
+    有安裝 numba 時會編譯為釋放 GIL 的機器碼。
+    """
+    total_profit = 0.0
+    wins = 0
+    trades = 0
+    max_drawdown = 0.0
+    peak_value = INITIAL_CAPITAL
+    current_value = INITIAL_CAPITAL
+    return_count = 0
+    return_mean = 0.0
+    return_m2 = 0.0
+
+    in_position = False
+    entry_price = 0.0
+    entry_bar = 0
+    target_price = 0.0
+
+    for i in range(start, end):
+        price = close[i]
+        current_signal = signal[i]
+        previous_value = current_value
+
+        if not in_position:
+            if current_signal == 1:
+                # 開多倉
+                in_position = True
+                entry_price = price
+                entry_bar = i
+                target_price = price * (1 + target_profit_ratio)
+        elif price >= target_price or i - entry_bar >= hold_days or current_signal == -1:
+            # 出場並計算利潤
+            profit_pct = (price - entry_price) / entry_price
+            total_profit += profit_pct
+            current_value *= (1 + profit_pct)
+            if profit_pct > 0:
+                wins += 1
+            trades += 1
+
+            # 更新最大回撤
+            if current_value > peak_value:
+                peak_value = current_value
+            drawdown = (peak_value - current_value) / peak_value if peak_value > 0 else 0.0
+            if drawdown > max_drawdown:
+                max_drawdown = drawdown
+            in_position = False
+
+        # 每日收益率（無論是否有交易）以 Welford 方法累計
+        if previous_value > 0:
+            daily_return = (current_value - previous_value) / previous_value
+            if np.isfinite(daily_return):
+                return_count += 1
+                delta = daily_return - return_mean
+                return_mean += delta / return_count
+                return_m2 += delta * (daily_return - return_mean)
+
+    return total_profit, wins, trades, max_drawdown, return_count, return_mean, return_m2
+
+
+def _population_state_machine(close_matrix, close_rows, signals, starts, ends, target_profit_ratios, hold_days):
+    """對每個個體執行部位狀態機，close_rows 指定每個個體使用的價格列，ends 為各列有效長度"""
+    pop_size = signals.shape[0]
+    total_profit = np.zeros(pop_size)
+    wins = np.zeros(pop_size, dtype=np.int64)
+    trades = np.zeros(pop_size, dtype=np.int64)
+    max_drawdown = np.zeros(pop_size)
+    return_count = np.zeros(pop_size, dtype=np.int64)
+    return_mean = np.zeros(pop_size)
+    return_m2 = np.zeros(pop_size)
+    for k in range(pop_size):
+        result = _trade_state_machine(close_matrix[close_rows[k]], signals[k], starts[k], ends[k],
+                                      target_profit_ratios[k], hold_days[k])
+        total_profit[k] = result[0]
+        wins[k] = result[1]
+        trades[k] = result[2]
+        max_drawdown[k] = result[3]
+        return_count[k] = result[4]
+        return_mean[k] = result[5]
+        return_m2[k] = result[6]
+    return total_profit, wins, trades, max_drawdown, return_count, return_mean, return_m2
+
+
+if NUMBA_AVAILABLE:
+    _trade_state_machine = njit(cache=True, nogil=True)(_trade_state_machine)
+    _population_state_machine = njit(cache=True, nogil=True)(_population_state_machine)
+
+
+def merge_zero_returns(count, mean, m2, zeros):
+    """將一段收益率為 0 的交易日併入 Welford 累加器（Chan 合併公式，可輸入陣列）"""
+    total = count + zeros
+    safe_total = np.where(total > 0, total, 1)
+    delta = 0.0 - mean
+    merged_mean = mean + delta * zeros / safe_total
+    merged_m2 = m2 + delta * delta * count * zeros / safe_total
+    return total, merged_mean, merged_m2
+
+
+def sharpe_from_welford(count, mean, m2):
+    """由每日收益率的 Welford 累加器計算年化 Sharpe Ratio (假設 252 個交易日，可輸入陣列)"""
+    count = np.atleast_1d(np.asarray(count, dtype=np.float64))
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), count.shape)
+    m2 = np.broadcast_to(np.asarray(m2, dtype=np.float64), count.shape)
+
+    sharpe = np.zeros(count.shape)
+    valid = count > 1
+    variance = np.divide(m2, count - 1, out=np.zeros(count.shape), where=valid)
+    valid &= variance > 0
+    sharpe[valid] = (mean[valid] * 252) / (np.sqrt(variance[valid]) * np.sqrt(252))
+    return sharpe
+
+
+def simulate_trades(close: np.ndarray, signal: np.ndarray, start: int,
+                    target_profit_ratio: float, hold_days: int) -> BacktestStats:
+    """模擬交易 - 有 numba 時使用編譯後的狀態機，否則使用 NumPy 實作"""
+    if not USE_NUMBA:
+        return simulate_trades_numpy(close, signal, start, target_profit_ratio, hold_days)
+
+    n = len(close)
+    if start >= n:
+        return BacktestStats()
+    total_profit, wins, trades, max_drawdown, return_count, return_mean, return_m2 = _trade_state_machine(
+        np.ascontiguousarray(close, dtype=np.float64), np.ascontiguousarray(signal),
+        int(start), n, float(target_profit_ratio), int(hold_days)
+    )
+    return BacktestStats(
+        total_profit=float(total_profit),
+        wins=int(wins),
+        trades=int(trades),
+        max_drawdown=float(max_drawdown),
+        sharpe_ratio=float(sharpe_from_welford(return_count, return_mean, return_m2)[0]) if trades > 0 else 0.0
+    )
+
+
+def simulate_trades_numpy(close: np.ndarray, signal: np.ndarray, start: int,
+                          target_profit_ratio: float, hold_days: int) -> BacktestStats:
+    """模擬交易（事件驅動：逐筆交易而非逐日迴圈）
+
+    進場：空手且出現買入信號；出場：達到目標價、持有天數到期或出現賣出信號，
+    以先發生者為準。資料結束時仍未平倉的部位不計入。
+    """
+    n = len(close)
+    stats = BacktestStats()
+    if start >= n:
+        return stats
+
+    buy_index = np.flatnonzero(signal[start:] == 1) + start
+    sell_mask = signal == -1
+
+    total_profit = 0
+    current_value = INITIAL_CAPITAL
+    peak_value = INITIAL_CAPITAL
+    return_count, return_mean, return_m2 = 0, 0.0, 0.0
+    pointer = start
+    while True:
+        k = np.searchsorted(buy_index, pointer)
+        if k >= len(buy_index):
+            break
+        entry = int(buy_index[k])
+        entry_price = close[entry]
+        target_price = entry_price * (1 + target_profit_ratio)
+
+        # 在持有期間內尋找第一個出場點
+        last = min(entry + hold_days, n - 1)
+        hit = (close[entry + 1:last + 1] >= target_price) | sell_mask[entry + 1:last + 1]
+        if hit.any():
+            exit_bar = entry + 1 + int(np.argmax(hit))
+        elif entry + hold_days <= n - 1:
+            exit_bar = entry + hold_days
+        else:
+            break  # 持倉至資料結束
+
+        profit_pct = (close[exit_bar] - entry_price) / entry_price
+        total_profit += profit_pct
+        if profit_pct > 0:
+            stats.wins += 1
+        stats.trades += 1
+
+        # 權益、峰值與最大回撤（僅於出場時更新）
+        previous_value = current_value
+        current_value *= (1 + profit_pct)
+        peak_value = max(peak_value, current_value)
+        stats.max_drawdown = max(stats.max_drawdown, (peak_value - current_value) / peak_value)
+
+        # 出場日收益率以 Welford 方法累計，其餘交易日收益率為 0 於最後合併
+        daily_return = (current_value - previous_value) / previous_value
+        if np.isfinite(daily_return):
+            return_count += 1
+            delta = daily_return - return_mean
+            return_mean += delta / return_count
+            return_m2 += delta * (daily_return - return_mean)
+        pointer = exit_bar + 1
+
+    if stats.trades == 0:
+        return stats
+
+    stats.total_profit = float(total_profit)
+    stats.max_drawdown = float(stats.max_drawdown)
+    stats.sharpe_ratio = float(sharpe_from_welford(
+        *merge_zero_returns(return_count, return_mean, return_m2, (n - start) - stats.trades)
+    )[0])
+    return stats
+
+
+def run_backtest(close: np.ndarray, params, ma_bank: MovingAverageBank = None) -> BacktestStats:
+    """對單一參數組執行完整回測（移動平均 → 信號 → 交易模擬）"""
+    window = effective_window(params.m_intervals, len(close))
+    ma = ma_bank.get(window) if ma_bank is not None else moving_average(close, window)
+    signal = generate_signals(close, ma, params.alpha)
+
+    buy_signals = int((signal == 1).sum())
+    if buy_signals == 0:
+        return BacktestStats(buy_signals=0)
+
+    stats = simulate_trades(close, signal, window, params.target_profit_ratio, params.hold_days)
+    stats.buy_signals = buy_signals
+    return stats
+
+
+def compute_fitness(stats: BacktestStats, params, n_bars: int) -> float:
+    """計算適應度（不含隨機擾動）"""
+    if stats.trades > 0:
+        avg_profit = stats.total_profit / stats.trades
+        win_rate = stats.wins / stats.trades
+
+        profit_score = avg_profit * 100                                  # 基礎收益分數
+        winrate_score = win_rate * 20                                    # 勝率分數
+        drawdown_penalty = stats.max_drawdown * stats.max_drawdown * 50  # 回撤懲罰 (非線性)
+
+        # 交易頻率獎勵 (適度交易)
+        trade_frequency = stats.trades / n_bars
+        frequency_bonus = min(trade_frequency * 10, 5) if trade_frequency > 0.01 else 0
+
+        return profit_score + winrate_score - drawdown_penalty + frequency_bonus
+
+    # 無交易時的處理 - 根據α值與目標利潤給予不同程度的懲罰
+    if params.alpha > 50 or params.target_profit_ratio > 0.5:
+        return -2
+    return -3
+
+
+def fitness_noise(stats: BacktestStats) -> float:
+    """適應度隨機擾動，避免收斂到局部最優"""
+    if stats.trades > 0:
+        return random.uniform(-0.1, 0.1)
+    return random.uniform(-0.5, 0.5)
+
+
+@dataclass
+class PopulationStats:
+    """族群批次回測統計（每個欄位為長度 P 的陣列）"""
+    total_profit: np.ndarray
+    wins: np.ndarray
+    trades: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe_ratio: np.ndarray
+    buy_signals: np.ndarray
+
+    def row(self, i: int) -> BacktestStats:
+        """取出第 i 個個體的回測統計"""
+        return BacktestStats(
+            total_profit=float(self.total_profit[i]),
+            wins=int(self.wins[i]),
+            trades=int(self.trades[i]),
+            max_drawdown=float(self.max_drawdown[i]),
+            sharpe_ratio=float(self.sharpe_ratio[i]),
+            buy_signals=int(self.buy_signals[i])
+        )
+
+
+def compute_population_fitness(stats: PopulationStats, target_profit_ratios, alphas, n_bars) -> np.ndarray:
+    """計算整個族群的適應度（不含隨機擾動，與 compute_fitness 逐一計算的結果相同）
+
+    沒有買入信號的個體給予 -3（與 GeneticAlgorithm 的處理一致）
+    """
+    trades = stats.trades.astype(np.float64)
+    traded = trades > 0
+    safe_trades = np.where(traded, trades, 1.0)
+
+    profit_score = stats.total_profit / safe_trades * 100
+    winrate_score = stats.wins / safe_trades * 20
+    drawdown_penalty = stats.max_drawdown * stats.max_drawdown * 50
+    trade_frequency = trades / n_bars
+    frequency_bonus = np.where(trade_frequency > 0.01, np.minimum(trade_frequency * 10, 5), 0.0)
+    traded_fitness = profit_score + winrate_score - drawdown_penalty + frequency_bonus
+
+    no_trade_fitness = np.where((np.asarray(alphas) > 50) | (np.asarray(target_profit_ratios) > 0.5), -2.0, -3.0)
+    fitness = np.where(traded, traded_fitness, no_trade_fitness)
+    return np.where(stats.buy_signals == 0, -3.0, fitness)
+
+
+def population_fitness_noise(stats: PopulationStats, rng: np.random.Generator) -> np.ndarray:
+    """整個族群的適應度隨機擾動（有買入信號的個體才加入）"""
+    scale = np.where(stats.trades > 0, 0.1, 0.5)
+    return np.where(stats.buy_signals > 0, rng.uniform(-1.0, 1.0, len(scale)) * scale, 0.0)
+
+
+def generate_signal_matrix(close: np.ndarray, ma_matrix: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """產生整個族群的信號矩陣 (族群 × 交易日)"""
+    thresholds = (np.asarray(alphas, dtype=np.float64) / 100.0)[:, None]
+    signals = np.zeros(ma_matrix.shape, dtype=np.int8)
+    signals[close > ma_matrix * (1 + thresholds)] = 1
+    signals[close < ma_matrix * (1 - thresholds)] = -1
+    return signals
+
+
+def simulate_population(close: np.ndarray, signals: np.ndarray, starts, target_profit_ratios,
+                        hold_days, ends=None, close_rows=None) -> PopulationStats:
+    """模擬整個族群的交易 - 有 numba 時使用編譯後的狀態機，否則使用 NumPy 實作
+
+    close 可為所有個體共用的一維收盤價，或與 signals 同形狀的二維價格面板；
+    提供 close_rows 時 close 為 (股票 × 交易日) 面板，第 i 個個體使用第 close_rows[i] 列的價格。
+    ends 為各列的有效交易日數（預設為全長）。
+    """
+    if not USE_NUMBA:
+        if close_rows is not None:
+            close = np.asarray(close)[np.asarray(close_rows, dtype=np.int64)]
+        return simulate_population_numpy(close, signals, starts, target_profit_ratios, hold_days, ends)
+
+    signals = np.ascontiguousarray(signals)
+    pop_size, n = signals.shape
+    starts = np.ascontiguousarray(starts, dtype=np.int64)
+    ends = np.full(pop_size, n, dtype=np.int64) if ends is None else np.ascontiguousarray(ends, dtype=np.int64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if close.ndim == 1:
+        close_matrix, close_rows = close.reshape(1, n), np.zeros(pop_size, dtype=np.int64)
+    elif close_rows is not None:
+        close_matrix, close_rows = close, np.ascontiguousarray(close_rows, dtype=np.int64)
+    else:
+        close_matrix, close_rows = close, np.arange(pop_size, dtype=np.int64)
+
+    total_profit, wins, trades, max_drawdown, return_count, return_mean, return_m2 = _population_state_machine(
+        close_matrix,
+        close_rows,
+        signals,
+        starts,
+        ends,
+        np.ascontiguousarray(target_profit_ratios, dtype=np.float64),
+        np.ascontiguousarray(hold_days, dtype=np.int64)
+    )
+    sharpe = np.where(trades > 0, sharpe_from_welford(return_count, return_mean, return_m2), 0.0)
+    return PopulationStats(
+        total_profit=total_profit,
+        wins=wins,
+        trades=trades,
+        max_drawdown=max_drawdown,
+        sharpe_ratio=sharpe,
+        buy_signals=(signals == 1).sum(axis=1)
+    )
+
+
+def simulate_population_numpy(close: np.ndarray, signals: np.ndarray, starts, target_profit_ratios,
+                              hold_days, ends=None) -> PopulationStats:
+    """同時模擬整個族群的交易（NumPy 實作）
+
+    每一步讓所有仍在回測中的個體同時前進到下一次進場與出場，
+    迴圈次數為最多交易筆數而非交易日數，且每一步都是整個族群的陣列運算。
+    """
+    signals = np.asarray(signals)
+    pop_size, n = signals.shape
+    close = np.broadcast_to(close, (pop_size, n))
+    starts = np.asarray(starts, dtype=np.int64)
+    targets = np.asarray(target_profit_ratios, dtype=np.float64)
+    holds = np.asarray(hold_days, dtype=np.int64)
+    ends = np.full(pop_size, n, dtype=np.int64) if ends is None else np.asarray(ends, dtype=np.int64)
+
+    # 每個位置（含）之後第一個買入信號的位置，沒有則為 n
+    buy_positions = np.where(signals == 1, np.arange(n), n)
+    next_buy = np.minimum.accumulate(buy_positions[:, ::-1], axis=1)[:, ::-1]
+    next_buy = np.hstack([next_buy, np.full((pop_size, 1), n)])
+
+    total_profit = np.zeros(pop_size)
+    wins = np.zeros(pop_size, dtype=np.int64)
+    trades = np.zeros(pop_size, dtype=np.int64)
+    value = np.full(pop_size, INITIAL_CAPITAL)
+    peak = np.full(pop_size, INITIAL_CAPITAL)
+    max_drawdown = np.zeros(pop_size)
+    return_count = np.zeros(pop_size)
+    return_mean = np.zeros(pop_size)
+    return_m2 = np.zeros(pop_size)
+
+    pointer = np.minimum(starts, n)
+    rows = np.flatnonzero(pointer < ends)
+    while len(rows) > 0:
+        # 進場：下一個買入信號
+        entry = next_buy[rows, pointer[rows]]
+        keep = entry < ends[rows]
+        rows, entry = rows[keep], entry[keep]
+        if len(rows) == 0:
+            break
+
+        # 出場：持有期間內第一個達標價、賣出信號或持有到期的交易日
+        holding = holds[rows]
+        entry_price = close[rows, entry]
+        target_price = entry_price * (1 + targets[rows])
+        offsets = np.arange(1, holding.max() + 1)
+        cols = entry[:, None] + offsets
+        in_range = (offsets <= holding[:, None]) & (cols < ends[rows][:, None])
+        cols = np.minimum(cols, n - 1)
+        hit = ((close[rows[:, None], cols] >= target_price[:, None])
+               | (signals[rows[:, None], cols] == -1)
+               | (offsets == holding[:, None])) & in_range
+
+        has_exit = hit.any(axis=1)  # 沒有出場點代表持倉至資料結束
+        rows, entry, entry_price, hit = rows[has_exit], entry[has_exit], entry_price[has_exit], hit[has_exit]
+        if len(rows) == 0:
+            break
+        exit_bar = entry + 1 + hit.argmax(axis=1)
+
+        profit_pct = (close[rows, exit_bar] - entry_price) / entry_price
+        total_profit[rows] += profit_pct
+        wins[rows] += profit_pct > 0
+        trades[rows] += 1
+
+        previous_value = value[rows]
+        current_value = previous_value * (1 + profit_pct)
+        value[rows] = current_value
+        daily_return = (current_value - previous_value) / previous_value
+        finite = np.isfinite(daily_return)
+        update_rows, daily_return = rows[finite], daily_return[finite]
+        return_count[update_rows] += 1
+        delta = daily_return - return_mean[update_rows]
+        return_mean[update_rows] += delta / return_count[update_rows]
+        return_m2[update_rows] += delta * (daily_return - return_mean[update_rows])
+
+        peak[rows] = np.maximum(peak[rows], current_value)
+        drawdown = (peak[rows] - current_value) / peak[rows]
+        max_drawdown[rows] = np.maximum(max_drawdown[rows], drawdown)
+
+        pointer[rows] = exit_bar + 1
+        rows = rows[pointer[rows] < ends[rows]]
+
+    # Sharpe Ratio：每日收益率僅出場日非零，其餘交易日以 0 併入 Welford 累加器
+    zero_days = np.maximum(ends - starts, 0) - trades
+    sharpe = np.where(trades > 0, sharpe_from_welford(*merge_zero_returns(return_count, return_mean, return_m2,
+                                                                          zero_days)), 0.0)
+
+    return PopulationStats(
+        total_profit=total_profit,
+        wins=wins,
+        trades=trades,
+        max_drawdown=max_drawdown,
+        sharpe_ratio=sharpe,
+        buy_signals=(signals == 1).sum(axis=1)
+    )
+
+
+def run_population_backtest(close: np.ndarray, m_intervals, hold_days, target_profit_ratios, alphas,
+                            ma_bank: MovingAverageBank = None) -> PopulationStats:
+    """對整個族群執行批次回測（移動平均矩陣 → 信號矩陣 → 族群交易模擬）"""
+    n = len(close)
+    windows = np.maximum(1, np.minimum(np.asarray(m_intervals, dtype=np.int64), n // 2))
+    if ma_bank is None:
+        ma_bank = MovingAverageBank(close, (int(windows.min()), int(windows.max())))
+    signals = generate_signal_matrix(close, ma_bank.matrix(windows), alphas)
+    return simulate_population(close, signals, windows, target_profit_ratios, hold_days)
+
+
+@dataclass
+class PricePanel:
+    """多檔股票的價格面板（股票 × 交易日，長度不足以 NaN 補齊）"""
+    names: list
+    close: np.ndarray      # (股票數, 最長交易日數)
+    lengths: np.ndarray    # 各股票的有效交易日數
+
+
+def build_price_panel(series_list) -> PricePanel:
+    """由多個 PreparedSeries 建立價格面板（略過無法評估的序列）"""
+    usable = [series for series in series_list if series.is_valid and series.n_bars > 0]
+    if not usable:
+        return PricePanel(names=[], close=np.empty((0, 0)), lengths=np.empty(0, dtype=np.int64))
+
+    lengths = np.array([series.n_bars for series in usable], dtype=np.int64)
+    close = np.full((len(usable), int(lengths.max())), np.nan)
+    for k, series in enumerate(usable):
+        close[k, :series.n_bars] = series.close
+    return PricePanel(names=[series.name for series in usable], close=close, lengths=lengths)
+
+
+def panel_moving_average(close: np.ndarray, lengths: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """價格面板的移動平均，每檔股票可使用不同窗口，有效長度之外為 NaN"""
+    n_stocks, n_bars = close.shape
+    cumsum = np.zeros((n_stocks, n_bars + 1))
+    cumsum[:, 1:] = np.cumsum(np.nan_to_num(close), axis=1)
+
+    bar_index = np.arange(n_bars)
+    windows = np.asarray(windows, dtype=np.int64)[:, None]
+    lower = bar_index[None, :] + 1 - windows
+    valid = (lower >= 0) & (bar_index[None, :] < np.asarray(lengths)[:, None])
+
+    ma = (cumsum[:, 1:] - np.take_along_axis(cumsum, np.clip(lower, 0, None), axis=1)) / windows
+    ma[~valid] = np.nan
+    return ma
+
+
+def run_panel_backtest(panel: PricePanel, params) -> PopulationStats:
+    """對價格面板上的所有股票，以同一組參數一次完成回測"""
+    n_stocks = len(panel.lengths)
+    windows = np.maximum(1, np.minimum(int(params.m_intervals), panel.lengths // 2))
+    ma = panel_moving_average(panel.close, panel.lengths, windows)
+    signals = generate_signal_matrix(panel.close, ma, np.full(n_stocks, params.alpha))
+    return simulate_population(
+        panel.close, signals, windows,
+        np.full(n_stocks, params.target_profit_ratio),
+        np.full(n_stocks, params.hold_days),
+        panel.lengths
+    )
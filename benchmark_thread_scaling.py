@@ -0,0 +1,75 @@
+"""
+執行緒擴展性基準測試
+以合成的 5 年日線資料，比較 1 到 N 個執行緒同時評估族群的速度，
+驗證回測核心釋放 GIL 後 ThreadPoolExecutor 的實際加速比
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import backtest_engine
+from backtest_engine import prepare_series
+from ga_optimizer import TradingParameters, evaluate_parameter_population_parallel
+from synthetic_data import TRADING_DAYS_PER_YEAR, make_synthetic_data
+
+
+def make_synthetic_series(years: int = 5, seed: int = 42):
+    """產生合成日線資料的預處理序列"""
+    return prepare_series(make_synthetic_data(years * TRADING_DAYS_PER_YEAR, seed), 'benchmark')
+
+
+def make_random_population(size: int, seed: int = 0):
+    """產生隨機參數族群（範圍與 GeneticAlgorithm.create_random_individual 相同）"""
+    rng = random.Random(seed)
+    return [
+        TradingParameters(
+            m_intervals=rng.randint(5, 50),
+            hold_days=rng.randint(1, 30),
+            target_profit_ratio=round(rng.uniform(0.02, 1.0), 4),
+            alpha=round(rng.uniform(0.5, 10.0), 3)
+        )
+        for _ in range(size)
+    ]
+
+
+def run_benchmark(max_threads: int, population_size: int, repeats: int):
+    """從 1 到 max_threads 個執行緒測量評估速度"""
+    series = make_synthetic_series()
+    population = make_random_population(population_size)
+
+    backend = 'numba (nogil)' if backtest_engine.USE_NUMBA else 'NumPy'
+    print(f"🧪 執行緒擴展性測試: {series.n_bars} 個交易日, 族群 {population_size}, 重複 {repeats} 次")
+    print(f"⚙️ 回測核心: {backend}, CPU 核心數: {mp.cpu_count()}")
+
+    # 預熱（觸發 numba 編譯）
+    evaluate_parameter_population_parallel(series, population[:8], None, 1)
+
+    baseline = None
+    print("-" * 50)
+    print(f"{'執行緒':>6} {'耗時(秒)':>10} {'評估/秒':>10} {'加速比':>8}")
+    for threads in range(1, max_threads + 1):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                evaluate_parameter_population_parallel(series, population, executor, threads)
+            elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        throughput = population_size * repeats / elapsed
+        print(f"{threads:>6} {elapsed:>10.3f} {throughput:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="回測評估的執行緒擴展性基準測試")
+    parser.add_argument('--threads', type=int, default=mp.cpu_count(), help="最大執行緒數")
+    parser.add_argument('--population', type=int, default=2000, help="每次評估的族群大小")
+    parser.add_argument('--repeats', type=int, default=5, help="每種執行緒數的重複次數")
+    parser.add_argument('--numpy', action='store_true', help="停用 numba，改用 NumPy 核心")
+    args = parser.parse_args()
+
+    if args.numpy:
+        backtest_engine.USE_NUMBA = False
+    run_benchmark(args.threads, args.population, args.repeats)
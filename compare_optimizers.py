@@ -0,0 +1,103 @@
+"""
+最佳化器比較
+以相同的速度預設執行遺傳演算法、差分演化與 CMA-ES，
+統計達到目標適應度所需的評估次數（目標預設為網格搜尋全域最佳值的一定比例）；
+評估次數一律計算每一次適應度呼叫，包含重複基因、沿用上一代適應度與快取命中
+"""
+
+import argparse
+import io
+import random
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from fast_ga_optimizer import create_speed_preset, get_optimizer_class
+from grid_search import grid_search
+from ga_optimizer import split_train_test_data
+from backtest_engine import prepare_series
+from synthetic_data import TRADING_DAYS_PER_YEAR, make_synthetic_data
+
+
+def fitness_call_history(optimizer) -> np.ndarray:
+    """每世代結束時的累計適應度呼叫次數
+
+    遺傳演算法的 evaluation_history 只計算實際回測的新基因，這裡加回沿用適應度省下的次數，
+    與差分演化、CMA-ES 等每個候選解都計入的最佳化器使用相同的計數方式
+    """
+    evaluations = np.asarray(optimizer.evaluation_history, dtype=np.int64)
+    saved = getattr(optimizer, 'evaluations_saved_history', [])
+    if len(saved):
+        evaluations = evaluations + np.cumsum(saved)[:len(evaluations)]
+    return evaluations
+
+
+def evaluations_to_target(optimizer, target: float):
+    """第一次達到目標適應度時的累計適應度呼叫次數（未達到時回傳 None）"""
+    for best, evaluations in zip(optimizer.best_fitness_history, fitness_call_history(optimizer)):
+        if best >= target:
+            return int(evaluations)
+    return None
+
+
+def default_target(data, target_ratio: float) -> float:
+    """以網格搜尋在訓練資料上的全域最佳適應度乘上比例作為目標"""
+    with redirect_stdout(io.StringIO()):
+        train_data, _ = split_train_test_data(data.copy())
+    best = float(grid_search(prepare_series(train_data, 'train')).fitness.max())
+    return best * target_ratio if best > 0 else best / target_ratio
+
+
+def run_comparison(data, names, repeats: int, speed_mode: str, target: float):
+    """每個最佳化器重複執行並彙整結果"""
+    print(f"🎯 目標適應度: {target:.4f}, 速度預設: {speed_mode}, 每個最佳化器重複 {repeats} 次")
+    print("📏 評估次數: 每一次適應度呼叫都計入（含重複基因、沿用適應度與快取命中）")
+    print("-" * 78)
+    print(f"{'最佳化器':<8} {'達標率':>8} {'評估次數(中位)':>14} {'評估次數(平均)':>14} {'最佳適應度':>10} {'耗時(秒)':>9}")
+
+    summary = {}
+    for name in names:
+        hits, bests, times = [], [], []
+        for repeat in range(repeats):
+            config = create_speed_preset(speed_mode)
+            if name != 'ga':
+                config['seed'] = repeat
+            random.seed(repeat)
+            np.random.seed(repeat)
+
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                optimizer = get_optimizer_class(name)(data, **config)
+                result = optimizer.evolve()
+            times.append(time.perf_counter() - start)
+            bests.append(result.fitness)
+            hits.append(evaluations_to_target(optimizer, target))
+
+        reached = [count for count in hits if count is not None]
+        median = f"{np.median(reached):.0f}" if reached else "-"
+        mean = f"{np.mean(reached):.0f}" if reached else "-"
+        print(f"{name:<8} {len(reached) / repeats:>8.0%} {median:>14} {mean:>14} "
+              f"{np.mean(bests):>10.4f} {np.mean(times):>9.2f}")
+        summary[name] = {'evaluations_to_target': hits, 'best_fitness': bests, 'seconds': times}
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比較各最佳化器達到目標適應度所需的評估次數")
+    parser.add_argument('--optimizers', default='ga,de,cmaes', help="以逗號分隔的最佳化器名稱")
+    parser.add_argument('--repeats', type=int, default=5, help="每個最佳化器的重複次數")
+    parser.add_argument('--speed-mode', default='balanced', help="速度預設 (ultra_fast/fast/balanced/quality)")
+    parser.add_argument('--target', type=float, default=None, help="目標適應度（預設由網格搜尋決定）")
+    parser.add_argument('--target-ratio', type=float, default=0.9, help="目標為網格搜尋最佳值的比例")
+    parser.add_argument('--table', default=None, help="從資料庫讀取的股票資料表（預設使用合成資料）")
+    args = parser.parse_args()
+
+    if args.table:
+        from db_connector import DBConnector
+        data = DBConnector().read_stock_data(args.table)
+    else:
+        data = make_synthetic_data(days=6 * TRADING_DAYS_PER_YEAR)
+
+    target = args.target if args.target is not None else default_target(data, args.target_ratio)
+    run_comparison(data, args.optimizers.split(','), args.repeats, args.speed_mode, target)
@@ -0,0 +1,243 @@
+"""
+差分演化與 CMA-ES 最佳化器
+在 [0, 1]^4 的正規化空間中搜尋，解碼時將 m_intervals / hold_days 四捨五入為整數，
+對 target_profit_ratio 與 alpha 這類連續參數的狹長山脊收斂較快；
+與遺傳演算法共用評估流程，evolve() 的輸出相容，可由 fast_optimize 依名稱選用
+"""
+
+import time
+from abc import ABC, abstractmethod
+from dataclasses import replace
+
+import numpy as np
+
+from ga_optimizer import GeneticAlgorithm, TradingResult, parameters_matrix
+from vectorized_ga import PopulationArrays, evaluate_population_arrays, population_result
+
+# FastGeneticAlgorithm 專用、這裡不使用的設定（由速度預設傳入時忽略）
+GA_ONLY_SETTINGS = ('use_parallel', 'max_workers', 'parallel_backend', 'elite_ratio', 'adaptive_mutation')
+
+
+class ArrayOptimizer(GeneticAlgorithm, ABC):
+    """以 ask/tell 介面搜尋正規化參數空間的最佳化器基底類別"""
+
+    name = 'array'
+    supports_checkpoint = False
+
+    def __init__(self, data, seed: int = None, early_stop_patience: int = None, max_target_ratio: float = 1.0,
+                 **kwargs):
+        for key in GA_ONLY_SETTINGS:
+            kwargs.pop(key, None)
+        super().__init__(data, **kwargs)
+        self.rng = np.random.default_rng(seed)
+        self.early_stop_patience = early_stop_patience
+        self.evaluation_history = []  # 每世代結束時的累計評估次數
+
+        # 正規化空間的上下限（target_profit_ratio 以隨機個體的生成上限作為搜尋上限）
+        self.lower = np.array([self.param_ranges['m_intervals'][0], self.param_ranges['hold_days'][0],
+                               self.param_ranges['target_profit_ratio'][0], self.param_ranges['alpha'][0]],
+                              dtype=np.float64)
+        self.upper = np.array([self.param_ranges['m_intervals'][1], self.param_ranges['hold_days'][1],
+                               max_target_ratio, self.param_ranges['alpha'][1]], dtype=np.float64)
+
+    def decode(self, x: np.ndarray) -> PopulationArrays:
+        """將正規化向量 (個體數 × 4) 解碼為參數（整數基因四捨五入）"""
+        values = self.lower + np.clip(x, 0.0, 1.0) * (self.upper - self.lower)
+        return PopulationArrays(
+            m_intervals=np.rint(values[:, 0]).astype(np.int64),
+            hold_days=np.rint(values[:, 1]).astype(np.int64),
+            target_profit_ratio=np.round(values[:, 2], 4),
+            alpha=np.round(values[:, 3], 3)
+        )
+
+    def encode(self, population) -> np.ndarray:
+        """將參數列表編碼為正規化向量 (個體數 × 4)，超出搜尋範圍的值裁切到邊界"""
+        return np.clip((parameters_matrix(population) - self.lower) / (self.upper - self.lower), 0.0, 1.0)
+
+    def initial_points(self, count: int) -> np.ndarray:
+        """初始的正規化候選解：有種子參數時依 GeneticAlgorithm.initial_population 由種子產生一部分，其餘隨機"""
+        if not self.seed_parameters:
+            return self.rng.random((count, len(self.lower)))
+        seeded = self.encode(self.initial_population()[:int(round(count * self.seed_fraction))])
+        return np.vstack([seeded, self.rng.random((count - len(seeded), len(self.lower)))])
+
+    @abstractmethod
+    def initialize(self):
+        """建立初始狀態（子類別實作）"""
+
+    @abstractmethod
+    def ask(self) -> np.ndarray:
+        """產生本世代要評估的正規化候選解（子類別實作）"""
+
+    @abstractmethod
+    def tell(self, x: np.ndarray, fitness: np.ndarray):
+        """以評估結果更新搜尋狀態（子類別實作）"""
+
+    def evolve(self, resume_from: str = None) -> TradingResult:
+        """執行最佳化（停止條件與輸出與 GeneticAlgorithm.evolve 相同；不支援從檢查點繼續）"""
+        if resume_from is not None:
+            raise ValueError(f"{type(self).__name__} 不支援從檢查點繼續 (resume_from)")
+        start_time = time.time()
+        self.initialize()
+        best_result = None
+        evaluations = 0
+        stale_generations = 0
+
+        generation = 0
+        while generation < self.generations:
+            x = self.ask()
+            population = self.decode(x)
+            fitness, stats = evaluate_population_arrays(self.train_series, population, self.rng)
+            self.tell(x, fitness)
+            evaluations += len(fitness)
+
+            best_index = int(np.argmax(fitness))
+            if best_result is None or fitness[best_index] > best_result.fitness:
+                best_result = population_result(population, fitness, stats, best_index)
+                stale_generations = 0
+            else:
+                stale_generations += 1
+
+            self.best_fitness_history.append(best_result.fitness)
+            self.avg_fitness_history.append(float(fitness.mean()))
+            self.evaluation_history.append(evaluations)
+
+            stop_conditions = []
+            if self.check_time_limit(start_time):
+                self.stop_reason = f"達到時間限制 ({self.max_time_minutes} 分鐘)"
+                stop_conditions.append("時間限制")
+            if self.check_convergence():
+                self.stop_reason = f"種群已收斂 (適應度變異 < {self.convergence_threshold})"
+                stop_conditions.append("種群收斂")
+            if self.early_stop_patience and stale_generations >= self.early_stop_patience:
+                self.stop_reason = f"早期停止 ({self.early_stop_patience} 世代無改善)"
+                stop_conditions.append("早期停止")
+            if generation >= self.generations - 1:
+                self.stop_reason = f"達到最大世代數 ({self.generations})"
+                stop_conditions.append("最大世代")
+
+            if stop_conditions:
+                print(f"世代 {generation}: 停止演化 - {', '.join(stop_conditions)}")
+                break
+
+            if generation % 5 == 0:
+                elapsed_minutes = (time.time() - start_time) / 60
+                print(f"世代 {generation}: 最佳適應度 = {best_result.fitness:.4f}, "
+                      f"平均適應度 = {self.avg_fitness_history[-1]:.4f}, 已用時間 = {elapsed_minutes:.1f}分")
+            generation += 1
+
+        total_time = (time.time() - start_time) / 60
+        test_result = self.evaluate_on_test_data(best_result.parameters)
+
+        print(f"\n🎉 {self.name} 完成!")
+        print(f"📊 停止原因: {self.stop_reason}")
+        print(f"⏱️  總用時間: {total_time:.2f} 分鐘, 評估次數: {evaluations}")
+        print(f"📈 訓練數據最佳適應度: {best_result.fitness:.4f}")
+        if not self.test_data.empty:
+            print(f"🧪 測試數據適應度: {test_result.fitness:.4f}")
+
+        return replace(best_result, test_result=test_result if not self.test_data.empty else None)
+
+
+class DifferentialEvolutionOptimizer(ArrayOptimizer):
+    """差分演化（DE/rand/1/bin）"""
+
+    name = '差分演化'
+
+    def __init__(self, data, differential_weight: float = 0.6, crossover_probability: float = 0.9, **kwargs):
+        super().__init__(data, **kwargs)
+        self.differential_weight = differential_weight
+        self.crossover_probability = crossover_probability
+        self.population = None
+        self.fitness = None
+
+    def initialize(self):
+        self.population = None
+        self.fitness = None
+
+    def ask(self) -> np.ndarray:
+        n, dim = self.population_size, len(self.lower)
+        if self.population is None:
+            return self.initial_points(n)
+
+        # 每個目標個體選出三個互不相同（也不等於自己）的個體
+        donors = np.argsort(self.rng.random((n, n)) + np.eye(n) * 2, axis=1)[:, :3]
+        a, b, c = (self.population[donors[:, k]] for k in range(3))
+        mutant = np.clip(a + self.differential_weight * (b - c), 0.0, 1.0)
+
+        cross = self.rng.random((n, dim)) < self.crossover_probability
+        cross[np.arange(n), self.rng.integers(0, dim, n)] = True
+        return np.where(cross, mutant, self.population)
+
+    def tell(self, x: np.ndarray, fitness: np.ndarray):
+        if self.population is None:
+            self.population, self.fitness = x.copy(), fitness.copy()
+            return
+        # 貪婪選擇：試驗向量不比目標個體差時取代
+        improved = fitness >= self.fitness
+        self.population[improved] = x[improved]
+        self.fitness[improved] = fitness[improved]
+
+
+class CMAESOptimizer(ArrayOptimizer):
+    """共變異數矩陣自適應演化策略（CMA-ES，(μ/μ_w, λ)）"""
+
+    name = 'CMA-ES'
+
+    def __init__(self, data, initial_sigma: float = 0.3, **kwargs):
+        super().__init__(data, **kwargs)
+        self.initial_sigma = initial_sigma
+
+    def initialize(self):
+        dim = len(self.lower)
+        self.lam = max(4, self.population_size)
+        self.mu = self.lam // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / dim) / (dim + 4 + 2 * self.mueff / dim)
+        self.cs = (self.mueff + 2) / (dim + self.mueff + 5)
+        self.c1 = 2 / ((dim + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((dim + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mueff - 1) / (dim + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(dim) * (1 - 1 / (4 * dim) + 1 / (21 * dim ** 2))
+
+        # 有種子參數時以種子的重心作為初始平均（暖啟動），否則隨機
+        self.mean = self.encode(self.seed_parameters).mean(axis=0) if self.seed_parameters else self.rng.random(dim)
+        self.sigma = self.initial_sigma
+        self.C = np.eye(dim)
+        self.B = np.eye(dim)
+        self.D = np.ones(dim)
+        self.pc = np.zeros(dim)
+        self.ps = np.zeros(dim)
+        self.iteration = 0
+
+    def ask(self) -> np.ndarray:
+        z = self.rng.standard_normal((self.lam, len(self.mean)))
+        # 超出邊界的候選解修復到 [0, 1]，更新時使用修復後的位置
+        return np.clip(self.mean + self.sigma * (z * self.D) @ self.B.T, 0.0, 1.0)
+
+    def tell(self, x: np.ndarray, fitness: np.ndarray):
+        dim = len(self.mean)
+        selected = x[np.argsort(fitness)[::-1][:self.mu]]
+        old_mean = self.mean
+        self.mean = self.weights @ selected
+        step = (self.mean - old_mean) / self.sigma
+
+        inv_sqrt_C = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_C @ step
+        self.iteration += 1
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / np.sqrt(1 - (1 - self.cs) ** (2 * self.iteration)) / self.chi_n < 1.4 + 2 / (dim + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+
+        deviations = (selected - old_mean) / self.sigma
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * deviations.T @ np.diag(self.weights) @ deviations)
+        self.sigma = min(1.0, self.sigma * np.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1)))
+
+        self.C = (self.C + self.C.T) / 2
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
@@ -130,6 +130,71 @@ class DBConnector:
         self.conn.cursor().execute(query, params)
         self.conn.commit()
 
+    def create_pareto_front_table(self):
+        """建立儲存 NSGA-II 柏拉圖前緣的資料表（與 BestParameters 欄位對應，同一次執行共用 RunId）"""
+        query = '''
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='ParetoFront' AND xtype='U')
+        CREATE TABLE ParetoFront (
+            Id INT IDENTITY(1,1) PRIMARY KEY,
+            RunId NVARCHAR(50),
+            StockCode NVARCHAR(50),
+            StockName NVARCHAR(50),
+            Industry NVARCHAR(50),
+            BestIntervals INT,
+            HoldDays INT,
+            TargetProfitRatio FLOAT,
+            Alpha FLOAT,
+            TotalProfit FLOAT,
+            WinRate FLOAT,
+            MaxDrawdown FLOAT,
+            SharpeRatio FLOAT,
+            Fitness FLOAT,
+            CreateTime DATETIME DEFAULT GETDATE()
+        )'''
+        self.conn.cursor().execute(query)
+        self.conn.commit()
+
+    def save_pareto_front(self, table_name, results, industry):
+        """儲存一次 NSGA-II 執行的柏拉圖前緣，回傳本次的 RunId"""
+        import uuid
+        stock_code = self.extract_stock_code_from_table_name(table_name)
+        info = self.get_stock_info(stock_code)
+        stock_name = info['StockName'] if info else "未知"
+        run_id = uuid.uuid4().hex
+        query = '''
+        INSERT INTO ParetoFront
+        (RunId, StockCode, StockName, Industry, BestIntervals, HoldDays, TargetProfitRatio, Alpha, TotalProfit, WinRate, MaxDrawdown, SharpeRatio, Fitness)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        rows = [(run_id, stock_code, stock_name, industry,
+                 r.parameters.m_intervals, r.parameters.hold_days, r.parameters.target_profit_ratio,
+                 r.parameters.alpha, r.total_profit, r.win_rate, r.max_drawdown, r.sharpe_ratio, r.fitness)
+                for r in results]
+        if rows:
+            self.create_pareto_front_table()
+            self.conn.cursor().executemany(query, rows)
+            self.conn.commit()
+        return run_id
+
+    def get_recent_best_params(self, stock_code, industry=None, limit=20):
+        """取得最近的最佳參數紀錄：先取同一檔股票，再取同產業其他股票，各自依建立時間由新到舊"""
+        query = '''
+        SELECT TOP (?) StockCode, BestIntervals, HoldDays, TargetProfitRatio, Alpha, Fitness, CreateTime
+        FROM BestParameters
+        WHERE StockCode = ? OR Industry = ?
+        ORDER BY CASE WHEN StockCode = ? THEN 0 ELSE 1 END, CreateTime DESC
+        '''
+        try:
+            rows = self.conn.cursor().execute(query, (limit, stock_code, industry, stock_code)).fetchall()
+        except Exception as e:
+            print(f"讀取歷史最佳參數失敗: {e}")
+            return []
+        return [
+            {"StockCode": row[0], "BestIntervals": row[1], "HoldDays": row[2], "TargetProfitRatio": row[3],
+             "Alpha": row[4], "Fitness": row[5], "CreateTime": row[6]}
+            for row in rows
+        ]
+
     def execute_query(self, query, params=None):
         """執行SQL查詢並返回結果"""
         try:
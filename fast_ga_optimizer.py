@@ -15,7 +15,11 @@ from dataclasses import dataclass
 from typing import List
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import multiprocessing as mp
-from ga_optimizer import TradingParameters, TradingResult, GeneticAlgorithm
+from ga_optimizer import (TradingParameters, TradingResult, GeneticAlgorithm, evaluate_parameter_population,
+                          evaluate_parameter_population_parallel)
+from ga_checkpoint import save_checkpoint, load_checkpoint, parameters_to_arrays, arrays_to_parameters
+from fitness_cache import quantize_parameters
+from shared_memory_pool import SharedMemoryEvaluationPool
 
 class FastGeneticAlgorithm(GeneticAlgorithm):
     """加速版遺傳演算法"""
@@ -29,9 +33,15 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
             'convergence_threshold': 0.01,  # 放寬收斂條件
             'convergence_generations': 5,   # 減少收斂判斷世代數
             'use_parallel': True,       # 啟用並行處理
+            'max_workers': min(4, mp.cpu_count()),  # 並行評估的執行緒/行程數
+            'parallel_backend': 'thread',  # 'thread'：執行緒池，'process'：共享記憶體行程池
             'early_stop_patience': 10,  # 早期停止耐心值
             'elite_ratio': 0.2,        # 精英比例
-            'adaptive_mutation': True   # 自適應突變
+            'adaptive_mutation': True,  # 自適應突變
+            'restart_on_stagnation': False,  # 停滯時以更大的族群重新開始（IPOP），直到時間用完
+            'restart_growth': 2.0,      # 每次重新開始時族群放大的倍數
+            'max_population_size': 400,  # 重新開始時族群大小的上限
+            'hall_of_fame_size': 5      # 跨重新開始保留的最佳個體數
         }
         
         # 合併用戶參數
@@ -41,9 +51,15 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
         
         # 提取加速相關參數
         self.use_parallel = kwargs.pop('use_parallel', True)
+        self.max_workers = kwargs.pop('max_workers', min(4, mp.cpu_count()))
+        self.parallel_backend = kwargs.pop('parallel_backend', 'thread')
         self.early_stop_patience = kwargs.pop('early_stop_patience', 10)
         self.elite_ratio = kwargs.pop('elite_ratio', 0.2)
         self.adaptive_mutation = kwargs.pop('adaptive_mutation', True)
+        self.restart_on_stagnation = kwargs.pop('restart_on_stagnation', False)
+        self.restart_growth = kwargs.pop('restart_growth', 2.0)
+        self.max_population_size = kwargs.pop('max_population_size', 400)
+        self.hall_of_fame_size = kwargs.pop('hall_of_fame_size', 5)
         
         super().__init__(data, **kwargs)
         
@@ -51,22 +67,83 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
         self.no_improvement_count = 0
         self.best_ever_fitness = -float('inf')
         self.stop_reason = ""  # 初始化停止原因
+        self._thread_pool = None  # 整個演化過程共用的執行緒池
+        self._process_pool = None  # 整個演化過程共用的共享記憶體行程池
+        self.timing_stats = {'evaluation_seconds': 0.0}
+        self.evaluations_saved_history = []  # 每世代省下的評估次數
+        self.evaluation_history = []  # 每世代結束時的累計評估次數
+        self.hall_of_fame = []  # [(適應度, 參數)]，依適應度降序、基因不重複
+        self.restart_history = []  # 每次重新開始的 (世代, 新族群大小, 當時最佳適應度)
         
+    def get_thread_pool(self) -> ThreadPoolExecutor:
+        """取得（必要時建立）評估用的執行緒池"""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._thread_pool
+    
+    def shutdown_pools(self):
+        """關閉評估用的執行緒池與行程池"""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self.timing_stats.update(self._process_pool.timing_stats())
+            print(f"🧵 行程池: {self._process_pool.summary()}")
+            self._process_pool.close()
+            self._process_pool = None
+    
+    def get_process_pool(self) -> SharedMemoryEvaluationPool:
+        """取得（必要時建立）以共享記憶體發佈訓練收盤價的評估行程池"""
+        if self._process_pool is None:
+            self._process_pool = SharedMemoryEvaluationPool(
+                self.train_series, self.max_workers, self.param_ranges['m_intervals']
+            )
+        return self._process_pool
+    
     def parallel_fitness_evaluation(self, population: List[TradingParameters]) -> List[float]:
-        """並行評估適應度"""
-        if not self.use_parallel or len(population) < 4:
-            # 如果不使用並行或族群太小，使用原始方法
-            return [self.evaluate_fitness(individual).fitness for individual in population]
+        """並行評估適應度 - 族群分塊批次評估
+
+        thread：回測核心釋放 GIL，執行緒真正同時運算；
+        process：常駐行程池透過共享記憶體讀取收盤價，每世代只傳送參數陣列
+        """
+        start = time.perf_counter()
+        try:
+            return [result.fitness for result in self.parallel_population_evaluation(population)]
+        finally:
+            self.timing_stats['evaluation_seconds'] += time.perf_counter() - start
+    
+    def parallel_population_evaluation(self, population: List[TradingParameters]) -> List[TradingResult]:
+        """依並行設定評估族群，回傳 TradingResult"""
+        if not self.use_parallel or len(population) < 4 or self.max_workers <= 1:
+            return self.evaluate_population(population)
         
         try:
-            # 使用線程池而不是進程池，避免數據序列化開銷
-            with ThreadPoolExecutor(max_workers=min(4, len(population))) as executor:
-                fitness_results = list(executor.map(self.evaluate_fitness, population))
-                fitness_values = [result.fitness for result in fitness_results]
-            return fitness_values
+            series = self.current_series()
+            if self.parallel_backend == 'process' and series is self.train_series and series.is_valid:
+                return evaluate_parameter_population(
+                    series, population, self.fitness_cache, self.get_process_pool().run_population_backtest
+                )
+            return evaluate_parameter_population_parallel(
+                series, population, self.get_thread_pool(), self.max_workers, self.fitness_cache
+            )
         except Exception as e:
             print(f"⚠️ 並行處理失敗，回退到串行處理: {e}")
-            return [self.evaluate_fitness(individual).fitness for individual in population]
+            return self.evaluate_population(population)
+    
+    def evaluate_generation(self, population: List[TradingParameters], known_fitness: dict) -> tuple:
+        """評估新世代：沿用上一世代相同基因的適應度，其餘依基因去重後才送入評估
+
+        回傳 (適應度串列, 本世代基因→適應度對照表, 實際評估次數)
+        """
+        keys = [quantize_parameters(individual) for individual in population]
+        pending = {}
+        for key, individual in zip(keys, population):
+            if key not in known_fitness and key not in pending:
+                pending[key] = individual
+        
+        evaluated = dict(zip(pending.keys(), self.parallel_fitness_evaluation(list(pending.values()))))
+        generation_fitness = {key: known_fitness[key] if key in known_fitness else evaluated[key] for key in keys}
+        return [generation_fitness[key] for key in keys], generation_fitness, len(pending)
     
     def adaptive_mutation_rate(self, generation: int) -> float:
         """自適應突變率"""
@@ -103,6 +180,54 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
             self.no_improvement_count += 1
             return self.no_improvement_count >= self.early_stop_patience
     
+    def update_hall_of_fame(self, population: List[TradingParameters], fitness_values: List[float]):
+        """將族群中的最佳個體併入名人堂（相同基因只保留適應度較高者）"""
+        entries = {quantize_parameters(individual): (fitness, individual) for fitness, individual in self.hall_of_fame}
+        for individual, fitness in zip(population, fitness_values):
+            key = quantize_parameters(individual)
+            if key not in entries or fitness > entries[key][0]:
+                entries[key] = (fitness, individual)
+        self.hall_of_fame = sorted(entries.values(), key=lambda entry: entry[0], reverse=True)[:self.hall_of_fame_size]
+    
+    def restart_population(self, population_size: int) -> List[TradingParameters]:
+        """重新開始：由本輪族群大小放大 restart_growth 倍，名人堂個體放回新族群、其餘重新隨機取樣，
+        停滯計數從新的一輪算起
+
+        設定的 population_size 不變，放大後的大小只用於本次演化
+        """
+        new_size = min(self.max_population_size, int(round(population_size * self.restart_growth)))
+        self.best_ever_fitness = -float('inf')
+        self.no_improvement_count = 0
+        seeds = [individual for _, individual in self.hall_of_fame][:new_size]
+        return seeds + [self.create_random_individual() for _ in range(new_size - len(seeds))]
+    
+    def checkpoint_state(self, population: List[TradingParameters], generation: int, elapsed_seconds: float,
+                         run_state: dict = None) -> dict:
+        """目前演化狀態（寫入檢查點用）：族群為尚未評估的基因，run_state 為 evolve 迴圈的區域狀態"""
+        return {
+            'population': parameters_to_arrays(population),
+            **self.history_state(generation, elapsed_seconds),
+            'run_state': dict(run_state or {}),
+            'no_improvement_count': self.no_improvement_count,
+            'best_ever_fitness': self.best_ever_fitness,
+            'evaluations_saved_history': list(self.evaluations_saved_history),
+            'evaluation_history': list(self.evaluation_history),
+            'hall_of_fame': list(self.hall_of_fame),
+            'restart_history': list(self.restart_history)
+        }
+    
+    def restore_checkpoint(self, state: dict) -> tuple:
+        """由檢查點還原演化狀態，回傳 (族群, 世代, 已用秒數, 迴圈區域狀態)"""
+        self.restore_history(state)
+        self.no_improvement_count = state['no_improvement_count']
+        self.best_ever_fitness = state['best_ever_fitness']
+        self.evaluations_saved_history = list(state['evaluations_saved_history'])
+        self.evaluation_history = list(state['evaluation_history'])
+        self.hall_of_fame = list(state['hall_of_fame'])
+        self.restart_history = list(state['restart_history'])
+        return (arrays_to_parameters(state['population']), state['generation'], state['elapsed_seconds'],
+                state['run_state'])
+    
     def tournament_selection_fast(self, population: List[TradingParameters], fitness_values: List[float], tournament_size: int = 3) -> TradingParameters:
         """快速錦標賽選擇 - 適合加速版本"""
         if not population or not fitness_values:
@@ -144,88 +269,141 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
         
         return child1, child2
 
-    def evolve(self) -> TradingResult:
-        """加速版演化過程"""
+    def evolve(self, resume_from: str = None) -> TradingResult:
+        """加速版演化過程（resume_from 指定檢查點檔案時從該處繼續）"""
         print(f"🚀 啟動加速版遺傳演算法優化")
         print(f"📊 參數: 族群={self.population_size}, 世代={self.generations}, 並行={self.use_parallel}")
         
-        start_time = time.time()
-        
-        # 初始化族群
-        population = [self.create_random_individual() for _ in range(self.population_size)]
-        
-        best_individual = None
-        best_fitness = -float('inf')
-        
-        for generation in range(self.generations):
-            generation_start = time.time()
-            
-            # 並行評估適應度
-            fitness_values = self.parallel_fitness_evaluation(population)
-            
-            # 記錄最佳適應度
-            current_best_fitness = max(fitness_values) if fitness_values else -float('inf')
-            current_avg_fitness = np.mean(fitness_values) if fitness_values else 0
-            
-            self.best_fitness_history.append(current_best_fitness)
-            self.avg_fitness_history.append(current_avg_fitness)
-            
-            # 更新全局最佳
-            if current_best_fitness > best_fitness:
-                best_fitness = current_best_fitness
-                best_individual = population[fitness_values.index(current_best_fitness)]
-            
-            generation_time = time.time() - generation_start
-            print(f"世代 {generation+1}/{self.generations}: 最佳適應度={current_best_fitness:.4f}, "
-                  f"平均適應度={current_avg_fitness:.4f}, 耗時={generation_time:.2f}秒")
-            
-            # 檢查停止條件
-            if self.check_time_limit(start_time):
-                self.stop_reason = f"超過時間限制 ({self.max_time_minutes} 分鐘)"
-                print(f"⏰ {self.stop_reason}")
-                break
+        if resume_from is not None:
+            population, generation, elapsed_seconds, run_state = self.restore_checkpoint(load_checkpoint(resume_from))
+            start_time = time.time() - elapsed_seconds
+            best_individual = run_state['best_individual']
+            best_fitness = run_state['best_fitness']
+            known_fitness = run_state['known_fitness']
+            run_population_size = run_state['run_population_size']
+            run_start = run_state['run_start']
+            print(f"♻️ 從檢查點繼續: 世代 {generation}, 已用時間 {elapsed_seconds / 60:.1f}分")
+        else:
+            start_time = time.time()
             
-            if self.check_convergence():
-                self.stop_reason = f"達到收斂條件 (變異 < {self.convergence_threshold})"
-                print(f"🎯 {self.stop_reason}")
-                break
+            # 初始化族群
+            population = self.initial_population()
             
-            if self.check_early_stop(current_best_fitness):
-                self.stop_reason = f"早期停止 ({self.early_stop_patience} 世代無改善)"
-                print(f"⏹️ {self.stop_reason}")
-                break
+            best_individual = None
+            best_fitness = -float('inf')
+            known_fitness = {}  # 上一世代的基因→適應度（精英與未變動的個體不再重新評估）
+            run_population_size = self.population_size  # 本輪族群大小（重新開始時放大）
             
-            # 選擇、交叉、突變
-            if generation < self.generations - 1:  # 不是最後一世代
-                # 精英選擇
-                elites = self.elite_selection(population, fitness_values)
+            # 開啟重新開始時，generations 限制的是每一輪（重新開始之間）的世代數，整體由時間限制結束
+            generation = 0
+            run_start = 0  # 本輪的第一個世代
+        
+        try:
+            while True:
+                generation_start = time.time()
+                
+                # 並行評估適應度（只評估新的或改變過的基因）
+                fitness_values, known_fitness, evaluation_count = self.evaluate_generation(population, known_fitness)
+                self.evaluations_saved_history.append(len(population) - evaluation_count)
+                self.evaluation_history.append(sum(self.evaluation_history[-1:]) + evaluation_count)
+                
+                # 記錄最佳適應度
+                current_best_fitness = max(fitness_values) if fitness_values else -float('inf')
+                current_avg_fitness = np.mean(fitness_values) if fitness_values else 0
                 
-                # 生成新世代
-                new_population = elites.copy()  # 保留精英
+                self.best_fitness_history.append(current_best_fitness)
+                self.avg_fitness_history.append(current_avg_fitness)
+                current_diversity = self.record_diversity(population)
                 
-                # 自適應突變率
-                current_mutation_rate = self.adaptive_mutation_rate(generation)
+                # 更新全局最佳
+                if current_best_fitness > best_fitness:
+                    best_fitness = current_best_fitness
+                    best_individual = population[fitness_values.index(current_best_fitness)]
                 
-                while len(new_population) < self.population_size:
-                    # 選擇父母
-                    parent1 = self.tournament_selection_fast(population, fitness_values)
-                    parent2 = self.tournament_selection_fast(population, fitness_values)
+                generation_time = time.time() - generation_start
+                print(f"世代 {generation+1}/{self.generations}: 最佳適應度={current_best_fitness:.4f}, "
+                      f"平均適應度={current_avg_fitness:.4f}, 評估={evaluation_count}/{len(population)} "
+                      f"(節省 {len(population) - evaluation_count}), 多樣性={current_diversity:.3f}, 耗時={generation_time:.2f}秒")
+                if self.restart_on_stagnation:
+                    self.update_hall_of_fame(population, fitness_values)
+                
+                # 檢查停止條件
+                if self.check_time_limit(start_time):
+                    self.stop_reason = f"超過時間限制 ({self.max_time_minutes} 分鐘)"
+                    print(f"⏰ {self.stop_reason}")
+                    break
+                
+                # 本輪停滯（收斂、基因塌縮、早期停止或達到世代數）：不重新開始時結束演化
+                run_generations = generation - run_start + 1
+                # 每世代都更新早期停止的最佳值與無改善計數，不受其他停滯條件先成立影響
+                early_stop = self.check_early_stop(current_best_fitness)
+                stagnation = None
+                if run_generations >= self.convergence_generations and self.check_convergence():
+                    stagnation = ("🎯", f"達到收斂條件 (變異 < {self.convergence_threshold})")
+                elif self.check_diversity_collapse():
+                    stagnation = ("🧬", f"族群基因已塌縮 (多樣性 {current_diversity:.4f} < {self.diversity_threshold})")
+                elif early_stop:
+                    stagnation = ("⏹️", f"早期停止 ({self.early_stop_patience} 世代無改善)")
+                elif run_generations >= self.generations:
+                    stagnation = ("🔚", f"達到最大世代數 ({self.generations})")
+                
+                if stagnation and not self.restart_on_stagnation:
+                    self.stop_reason = stagnation[1]
+                    print(f"{stagnation[0]} {self.stop_reason}")
+                    break
+                
+                if stagnation:
+                    # IPOP 重新開始：以更大的新族群繼續搜尋，名人堂的最佳個體放回新族群
+                    population = self.restart_population(run_population_size)
+                    run_population_size = len(population)
+                    run_start = generation + 1
+                    self.restart_history.append((generation + 1, run_population_size, best_fitness))
+                    print(f"🔄 {stagnation[1]}，第 {len(self.restart_history)} 次重新開始: "
+                          f"族群={run_population_size}, 名人堂={len(self.hall_of_fame)}")
+                else:
+                    # 精英選擇
+                    elites = self.elite_selection(population, fitness_values)
+                    
+                    # 生成新世代
+                    new_population = elites.copy()  # 保留精英
                     
-                    # 交叉
-                    if random.random() < self.crossover_rate:
-                        child1, child2 = self.crossover_fast(parent1, parent2)
-                    else:
-                        child1, child2 = parent1, parent2
+                    # 自適應突變率（每輪重新計算；多樣性偏低時提高）
+                    current_mutation_rate = self.diversity_mutation_rate(self.adaptive_mutation_rate(generation - run_start))
                     
-                    # 突變
-                    if random.random() < current_mutation_rate:
-                        child1 = self.mutate(child1)
-                    if random.random() < current_mutation_rate:
-                        child2 = self.mutate(child2)
+                    while len(new_population) < run_population_size:
+                        # 選擇父母
+                        parent1 = self.tournament_selection_fast(population, fitness_values)
+                        parent2 = self.tournament_selection_fast(population, fitness_values)
+                        
+                        # 交叉
+                        if random.random() < self.crossover_rate:
+                            child1, child2 = self.crossover_fast(parent1, parent2)
+                        else:
+                            child1, child2 = parent1, parent2
+                        
+                        # 突變（參數不可變，突變產生新物件，不影響親代與精英）
+                        if random.random() < current_mutation_rate:
+                            child1 = self.mutate(child1)
+                        if random.random() < current_mutation_rate:
+                            child2 = self.mutate(child2)
+                        
+                        new_population.extend([child1, child2])
                     
-                    new_population.extend([child1, child2])
+                    population = new_population[:run_population_size]
                 
-                population = new_population[:self.population_size]
+                generation += 1
+                
+                # 定期寫入檢查點（族群為下一世代尚未評估的基因）
+                if self.checkpoint_path and generation % self.checkpoint_interval == 0:
+                    save_checkpoint(self.checkpoint_path, self.checkpoint_state(
+                        population, generation, time.time() - start_time,
+                        {'best_individual': best_individual, 'best_fitness': best_fitness,
+                         'known_fitness': known_fitness, 'run_population_size': run_population_size,
+                         'run_start': run_start}
+                    ))
+        finally:
+            # 正常結束、例外或中斷時都關閉執行緒池與行程池（含共享記憶體）
+            self.shutdown_pools()
         
         # 計算最終結果
         if best_individual:
@@ -233,6 +411,11 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
             total_time = (time.time() - start_time) / 60
             print(f"✅ 優化完成！總耗時: {total_time:.2f} 分鐘")
             print(f"🎯 停止原因: {self.stop_reason}")
+            print(f"🗂️ 適應度快取: {self.fitness_cache.summary()}")
+            print(f"⏱️ 評估耗時: {self.timing_stats['evaluation_seconds']:.2f} 秒")
+            print(f"♻️ 沿用適應度省下 {sum(self.evaluations_saved_history)} 次評估")
+            if self.restart_history:
+                print(f"🔄 重新開始 {len(self.restart_history)} 次, 最終族群={run_population_size}")
             return final_result
         else:
             print("❌ 優化失敗")
@@ -246,7 +429,7 @@ class FastGeneticAlgorithm(GeneticAlgorithm):
             )
 
 def create_speed_preset(speed_mode: str) -> dict:
-    """創建速度預設配置"""
+    """創建速度預設配置（最佳化器建構參數，可直接傳給 FastGeneticAlgorithm）"""
     presets = {
         'ultra_fast': {
             'population_size': 20,
@@ -286,16 +469,28 @@ def create_speed_preset(speed_mode: str) -> dict:
         }
     }
     
-    return presets.get(speed_mode, presets['balanced'])
+    return dict(presets.get(speed_mode, presets['balanced']))
+
+def get_optimizer_class(name: str):
+    """依名稱取得最佳化器類別"""
+    from continuous_optimizers import CMAESOptimizer, DifferentialEvolutionOptimizer
+    from steady_state_ga import SteadyStateGeneticAlgorithm
+    
+    optimizers = {
+        'ga': FastGeneticAlgorithm,
+        'steady': SteadyStateGeneticAlgorithm,
+        'de': DifferentialEvolutionOptimizer,
+        'cmaes': CMAESOptimizer
+    }
+    if name not in optimizers:
+        raise ValueError(f"未知的最佳化器: {name}（可用: {', '.join(optimizers)}）")
+    return optimizers[name]
 
 # 便利函數
-def fast_optimize(data: pd.DataFrame, speed_mode: str = 'fast') -> TradingResult:
-    """快速優化便利函數"""
+def fast_optimize(data: pd.DataFrame, speed_mode: str = 'fast', optimizer: str = 'ga') -> TradingResult:
+    """快速優化便利函數（optimizer 為最佳化器名稱，見 get_optimizer_class，預設為 FastGeneticAlgorithm）"""
     config = create_speed_preset(speed_mode)
-    
-    # 所有模式都使用 FastGeneticAlgorithm，不再使用 UltraFastGeneticAlgorithm
-    optimizer = FastGeneticAlgorithm(data, **config)
-    return optimizer.evolve()
+    return get_optimizer_class(optimizer)(data, **config).evolve()
 
 if __name__ == "__main__":
     # 測試不同速度模式
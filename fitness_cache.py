@@ -0,0 +1,73 @@
+"""
+適應度快取
+以量化後的交易參數為鍵，快取不含隨機擾動的回測統計，
+精英、未變動的錦標賽勝者與重複的交叉子代不需再重新回測
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def quantize_parameters(params) -> tuple:
+    """將交易參數量化為快取鍵（精度與 create_random_individual 一致）"""
+    return (
+        int(params.m_intervals),
+        int(params.hold_days),
+        round(float(params.target_profit_ratio), 4),
+        round(float(params.alpha), 3)
+    )
+
+
+class FitnessCache:
+    """有容量上限的 LRU 適應度快取"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset: str, params):
+        """查詢快取，未命中時回傳 None"""
+        if self.max_size <= 0:
+            return None
+        key = (dataset,) + quantize_parameters(params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, dataset: str, params, entry):
+        """寫入快取，超過容量時淘汰最久未使用的項目"""
+        if self.max_size <= 0:
+            return
+        key = (dataset,) + quantize_parameters(params)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空快取與統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def summary(self) -> str:
+        """快取統計摘要"""
+        return f"命中 {self.hits} 次, 未命中 {self.misses} 次, 命中率 {self.hit_rate:.1%}, 項目 {len(self)}/{self.max_size}"
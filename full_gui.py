@@ -47,8 +47,8 @@ def get_stocks_for_industry(industry, db_obj):
     except Exception as e:
         return gr.Dropdown(choices=[f"錯誤: {str(e)}"], value=None)
 
-def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
-    """執行完整的基因演算法分析"""
+def run_full_ga_analysis(stock_name, db_obj, use_islands=False, progress=gr.Progress()):
+    """執行完整的基因演算法分析（use_islands 開啟時以島嶼模型在多個行程中演化，總族群大小不變）"""
     if not db_obj:
         return "❌ 資料庫未連接", None
     
@@ -79,8 +79,10 @@ def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
         progress(0.2, desc="初始化基因演算法...")
         
         # 導入基因演算法模組
-        from ga_optimizer import GeneticAlgorithm
+        from ga_optimizer import GeneticAlgorithm, load_warm_start_parameters
+        from island_ga import IslandGeneticAlgorithm
         from report_generator import save_evolution_plot
+        import multiprocessing as mp
         
         # 固定參數設定
         generations = 50
@@ -96,7 +98,7 @@ def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
         print(f"📊 原始資料形狀: {data.shape}")
         print(f"📊 資料欄位: {list(data.columns)}")
         
-        ga = GeneticAlgorithm(
+        ga_kwargs = dict(
             data=data, 
             population_size=population_size, 
             generations=generations,
@@ -104,9 +106,22 @@ def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
             crossover_rate=0.8,
             max_time_minutes=max_time_minutes,
             convergence_threshold=convergence_threshold,
-            convergence_generations=convergence_generations
+            convergence_generations=convergence_generations,
+            # 暖啟動：30% 初始個體由同股票/同產業最近的最佳參數擾動產生
+            seed_parameters=load_warm_start_parameters(db_obj, stock_name, industry),
+            seed_fraction=0.3
         )
         
+        # 選用島嶼模型時，總族群平均分給各島嶼（每個島嶼在獨立行程中演化），評估量與時間預算不變
+        n_islands = min(4, mp.cpu_count()) if use_islands else 1
+        if n_islands > 1:
+            ga_kwargs['population_size'] = max(2, population_size // n_islands)
+            ga = IslandGeneticAlgorithm(n_islands=n_islands, migration_interval=5, **ga_kwargs)
+            island_info = f" ({n_islands} 個島嶼 × {ga_kwargs['population_size']})"
+        else:
+            ga = GeneticAlgorithm(**ga_kwargs)
+            island_info = ""
+        
         progress(0.3, desc="開始基因演算法演化...")
         
         # 執行演化過程
@@ -118,7 +133,8 @@ def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
         
         # 生成演化過程圖表
         os.makedirs("outputs", exist_ok=True)
-        save_evolution_plot(ga.best_fitness_history, ga.avg_fitness_history)
+        save_evolution_plot(ga.best_fitness_history, ga.avg_fitness_history,
+                            island_histories=getattr(ga, 'island_best_histories', None))
         
         progress(0.9, desc="保存最佳參數...")
         
@@ -146,7 +162,7 @@ def run_full_ga_analysis(stock_name, db_obj, progress=gr.Progress()):
 
 ⚙️ **演算法參數與智能停止條件**
 最大世代數: {generations}
-族群大小: {population_size}
+族群大小: {population_size}{island_info}
 突變率: 0.1
 交配率: 0.8
 時間限制: {max_time_minutes} 分鐘
@@ -784,6 +800,12 @@ def create_full_interface():
                             label="📊 選擇股票"
                         )
                         
+                        # 島嶼模型（多行程）選項
+                        use_islands_checkbox = gr.Checkbox(
+                            value=False,
+                            label="🏝️ 使用島嶼模型 (多核心並行，族群平均分給各島嶼)"
+                        )
+                        
                         # 分析按鈕
                         analyze_btn = gr.Button(
                             "🧬 開始基因演算法分析", 
@@ -838,8 +860,8 @@ def create_full_interface():
                 def update_stocks(industry):
                     return get_stocks_for_industry(industry, db_obj)
                 
-                def run_analysis_with_progress(stock):
-                    return run_full_ga_analysis(stock, db_obj)
+                def run_analysis_with_progress(stock, use_islands):
+                    return run_full_ga_analysis(stock, db_obj, use_islands)
                 
                 industry_dropdown.change(
                     update_stocks,
@@ -849,7 +871,7 @@ def create_full_interface():
                 
                 analyze_btn.click(
                     run_analysis_with_progress,
-                    inputs=[stock_dropdown],
+                    inputs=[stock_dropdown, use_islands_checkbox],
                     outputs=[result_textbox, result_image]
                 )
                 
@@ -1165,8 +1187,7 @@ def run_detailed_buy_hold_analysis(stock, db_obj):
     except Exception as e:
         return f"❌ 分析執行錯誤: {str(e)}"
 
-# 創建完整界面
-demo = create_full_interface()
-
 if __name__ == "__main__":
+    # 只在主程式建立界面：Windows 以 spawn 啟動島嶼工作行程時會重新匯入本模組，不應再連線資料庫與建立界面
+    demo = create_full_interface()
     demo.launch(server_name="127.0.0.1", server_port=7860)
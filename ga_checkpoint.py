@@ -0,0 +1,84 @@
+"""
+遺傳演算法檢查點
+定期將演化狀態（族群基因、適應度、隨機數狀態、適應度歷史、已用時間）
+寫入單一檔案，寫入時先寫暫存檔再以 os.replace 原子替換，中斷後可從檔案繼續演化
+"""
+
+import os
+import pickle
+import tempfile
+from typing import List
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+RESULT_FIELDS = ('fitness', 'total_profit', 'win_rate', 'max_drawdown', 'sharpe_ratio')
+
+
+def parameters_to_arrays(parameters) -> dict:
+    """將 TradingParameters 串列轉為緊湊的陣列"""
+    return {
+        'm_intervals': np.array([p.m_intervals for p in parameters], dtype=np.int64),
+        'hold_days': np.array([p.hold_days for p in parameters], dtype=np.int64),
+        'target_profit_ratio': np.array([p.target_profit_ratio for p in parameters], dtype=np.float64),
+        'alpha': np.array([p.alpha for p in parameters], dtype=np.float64)
+    }
+
+
+def arrays_to_parameters(arrays: dict) -> List:
+    """由陣列還原 TradingParameters 串列"""
+    from ga_optimizer import TradingParameters
+
+    return [
+        TradingParameters(
+            m_intervals=int(arrays['m_intervals'][i]),
+            hold_days=int(arrays['hold_days'][i]),
+            target_profit_ratio=float(arrays['target_profit_ratio'][i]),
+            alpha=float(arrays['alpha'][i])
+        )
+        for i in range(len(arrays['m_intervals']))
+    ]
+
+
+def results_to_arrays(results) -> dict:
+    """將 TradingResult 串列轉為緊湊的陣列"""
+    return {
+        **parameters_to_arrays([r.parameters for r in results]),
+        **{name: np.array([getattr(r, name) for r in results], dtype=np.float64) for name in RESULT_FIELDS}
+    }
+
+
+def arrays_to_results(arrays: dict) -> List:
+    """由陣列還原 TradingResult 串列"""
+    from ga_optimizer import TradingResult
+
+    return [
+        TradingResult(parameters=parameters, **{name: float(arrays[name][i]) for name in RESULT_FIELDS})
+        for i, parameters in enumerate(arrays_to_parameters(arrays))
+    ]
+
+
+def save_checkpoint(path: str, state: dict):
+    """原子寫入檢查點：寫入同目錄的暫存檔後以 os.replace 替換"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.checkpoint-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump({'version': CHECKPOINT_VERSION, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_checkpoint(path: str) -> dict:
+    """讀取檢查點"""
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"不支援的檢查點版本: {state.get('version')}")
+    return state
@@ -1,17 +1,46 @@
 import numpy as np
 import pandas as pd
 import random
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, replace
 from typing import List
 
-@dataclass
+# 最低需求 Python 3.10（見 README 環境需求）：TradingParameters / TradingResult 使用 dataclass 的 slots 參數
+if sys.version_info < (3, 10):
+    raise RuntimeError(f"需要 Python 3.10 或更高版本，目前為 {sys.version.split()[0]}")
+
+from backtest_engine import (prepare_series, PreparedSeries, run_backtest, run_population_backtest,
+                             compute_fitness, fitness_noise)
+from fitness_cache import FitnessCache, quantize_parameters
+from ga_checkpoint import save_checkpoint, load_checkpoint, results_to_arrays, arrays_to_results
+
+@dataclass(frozen=True, slots=True)
 class TradingParameters:
+    """交易參數（不可變、可雜湊；突變與交叉都回傳新物件，同一物件可安全地被多個個體共用）"""
     m_intervals: int
     hold_days: int
     target_profit_ratio: float
     alpha: float
+    
+    def as_tuple(self) -> tuple:
+        """(m_intervals, hold_days, target_profit_ratio, alpha)"""
+        return (self.m_intervals, self.hold_days, self.target_profit_ratio, self.alpha)
+    
+    def as_array(self) -> np.ndarray:
+        """長度 4 的浮點數陣列（順序同 GENE_NAMES）"""
+        return np.array(self.as_tuple(), dtype=np.float64)
+    
+    @classmethod
+    def from_sequence(cls, values) -> 'TradingParameters':
+        """由 (m_intervals, hold_days, target_profit_ratio, alpha) 序列或陣列建立"""
+        m_intervals, hold_days, target_profit_ratio, alpha = values
+        return cls(int(m_intervals), int(hold_days), float(target_profit_ratio), float(alpha))
+
+GENE_NAMES = ('m_intervals', 'hold_days', 'target_profit_ratio', 'alpha')
+# target_profit_ratio 沒有上限，正規化基因時以隨機個體的生成上限為準
+NORMALIZE_TARGET_MAX = 1.0
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TradingResult:
     parameters: TradingParameters
     fitness: float
@@ -21,11 +50,277 @@ class TradingResult:
     sharpe_ratio: float = 0.0
     test_result: 'TradingResult' = None  # 測試數據結果
 
+def split_train_test_data(data):
+    """分割訓練和測試數據：2019-2023訓練，2024測試"""
+    try:
+        # 處理欄位名稱中的BOM字符
+        data.columns = data.columns.str.replace('\ufeff', '', regex=False)
+        
+        print(f"📊 原始數據: {len(data)} 筆, 欄位: {list(data.columns)}")
+        
+        # 找到日期欄位
+        date_column = None
+        for col in ['Date', 'date', '日期', 'DATE', 'DateTime', 'Time']:
+            if col in data.columns:
+                date_column = col
+                break
+        
+        if date_column is None:
+            print("⚠️ 警告: 沒有找到日期欄位，使用全部資料作為訓練資料")
+            return data.copy(), pd.DataFrame()
+        
+        # 確保Date欄位為datetime類型
+        data[date_column] = pd.to_datetime(data[date_column], errors='coerce')
+        
+        # 移除無效日期
+        data = data.dropna(subset=[date_column])
+        
+        if len(data) == 0:
+            print("❌ 日期轉換後資料為空")
+            return pd.DataFrame(), pd.DataFrame()
+        
+        data_sorted = data.sort_values(date_column).reset_index(drop=True)
+        
+        # 檢查日期範圍
+        min_date = data_sorted[date_column].min()
+        max_date = data_sorted[date_column].max()
+        print(f"📅 資料日期範圍: {min_date.strftime('%Y-%m-%d')} 到 {max_date.strftime('%Y-%m-%d')}")
+        
+        # 分割數據
+        train_data = data_sorted[data_sorted[date_column].dt.year.between(2019, 2023)].copy()
+        test_data = data_sorted[data_sorted[date_column].dt.year == 2024].copy()
+        
+        print(f"📊 數據分割完成:")
+        print(f"   訓練數據 (2019-2023): {len(train_data)} 筆")
+        print(f"   測試數據 (2024): {len(test_data)} 筆")
+        
+        if len(train_data) == 0:
+            print("⚠️ 警告: 2019-2023年訓練數據為空，使用全部數據的前80%作為訓練")
+            split_point = int(len(data_sorted) * 0.8)
+            train_data = data_sorted[:split_point].copy()
+            test_data = data_sorted[split_point:].copy()
+            print(f"📊 重新分割: 訓練 {len(train_data)} 筆, 測試 {len(test_data)} 筆")
+        
+        if len(test_data) == 0:
+            print("⚠️ 警告: 2024年測試數據為空")
+        
+        return train_data, test_data
+        
+    except Exception as e:
+        print(f"❌ 數據分割失敗: {e}")
+        print("使用全部數據作為訓練數據")
+        return data.copy(), pd.DataFrame()
+
+def penalty_result(params: TradingParameters, fitness: float) -> TradingResult:
+    """無法回測時的懲罰結果"""
+    return TradingResult(
+        parameters=params,
+        fitness=fitness,
+        total_profit=0,
+        win_rate=0,
+        max_drawdown=1.0,
+        sharpe_ratio=0.0
+    )
+
+def build_trading_result(params: TradingParameters, stats, n_bars: int) -> TradingResult:
+    """將回測統計轉換為 TradingResult（在此加入隨機擾動）"""
+    if stats.buy_signals == 0:
+        # 沒有買入信號，給予適度懲罰讓演算法有機會調整
+        return TradingResult(
+            parameters=params,
+            fitness=-3,
+            total_profit=0,
+            win_rate=0,
+            max_drawdown=0.1,
+            sharpe_ratio=0.0
+        )
+    
+    fitness = compute_fitness(stats, params, n_bars) + fitness_noise(stats)
+    return TradingResult(
+        parameters=params,
+        fitness=fitness,
+        total_profit=stats.total_profit * 1000,  # 轉換為實際金額
+        win_rate=stats.wins / stats.trades if stats.trades > 0 else 0,
+        max_drawdown=stats.max_drawdown,
+        sharpe_ratio=stats.sharpe_ratio
+    )
+
+def evaluate_parameters(series: PreparedSeries, params: TradingParameters,
+                        fitness_cache: FitnessCache = None) -> TradingResult:
+    """無狀態的個體評估：只讀取傳入的預處理序列，可在多個執行緒同時對不同資料集評估"""
+    try:
+        # 檢查資料是否為空
+        if series.empty:
+            print("⚠️ 評估資料為空")
+            return penalty_result(params, -10)
+        
+        # 檢查參數合理性
+        if params.m_intervals <= 0 or params.hold_days <= 0 or params.target_profit_ratio <= 0 or params.alpha <= 0:
+            print(f"❌ 參數不合理: m_intervals={params.m_intervals}, hold_days={params.hold_days}, target_profit_ratio={params.target_profit_ratio}, alpha={params.alpha}")
+            return penalty_result(params, -8)
+        
+        if not series.is_valid:
+            print(series.error_message)
+            return penalty_result(params, -10)
+        
+        close = series.close
+        if len(close) < params.m_intervals + 10:  # 需要足夠的資料點
+            print(f"⚠️ 資料不足: 只有 {len(close)} 筆資料")
+            return penalty_result(params, -5)
+        
+        # 先查快取，隨機擾動在查詢之後才加入，快取結果保持有效
+        use_cache = fitness_cache is not None and series.name
+        stats = fitness_cache.get(series.name, params) if use_cache else None
+        if stats is None:
+            stats = run_backtest(close, params, series.ma_bank)
+            if use_cache:
+                fitness_cache.put(series.name, params, stats)
+        return build_trading_result(params, stats, len(close))
+        
+    except Exception as e:
+        print(f"❌ 適應度評估失敗: {e}")
+        import traceback
+        traceback.print_exc()
+        return penalty_result(params, -10)
+
+def evaluate_parameter_population(series: PreparedSeries, population: List[TradingParameters],
+                                  fitness_cache: FitnessCache = None, backtest=None) -> List[TradingResult]:
+    """無狀態的族群批次評估：以 (族群 × 交易日) 信號矩陣一次模擬所有個體
+
+    backtest 可替換批次回測函式 backtest(m_intervals, hold_days, target_profit_ratios, alphas)，
+    例如交由共享記憶體行程池執行；未指定時在目前行程以 series 回測
+    """
+    if not population:
+        return []
+    
+    try:
+        if not series.is_valid:
+            print(series.error_message)
+            return [penalty_result(params, -10) for params in population]
+        close = series.close
+        
+        # 不合理參數與資料不足的個體直接給予懲罰，其餘進入批次回測
+        results = [None] * len(population)
+        batch = []
+        for i, params in enumerate(population):
+            if params.m_intervals <= 0 or params.hold_days <= 0 or params.target_profit_ratio <= 0 or params.alpha <= 0:
+                results[i] = penalty_result(params, -8)
+            elif len(close) < params.m_intervals + 10:
+                results[i] = penalty_result(params, -5)
+            else:
+                batch.append(i)
+        
+        # 查詢快取，未命中的個體依量化參數去重後整批回測
+        use_cache = fitness_cache is not None and series.name
+        batch_stats = {}
+        pending = {}
+        for i in batch:
+            key = quantize_parameters(population[i])
+            if key in pending:
+                pending[key].append(i)
+                continue
+            cached = fitness_cache.get(series.name, population[i]) if use_cache else None
+            if cached is not None:
+                batch_stats[i] = cached
+            else:
+                pending[key] = [i]
+        
+        if pending:
+            members = [population[indices[0]] for indices in pending.values()]
+            if backtest is None:
+                backtest = lambda m, h, t, a: run_population_backtest(close, m, h, t, a, series.ma_bank)
+            stats = backtest(
+                [p.m_intervals for p in members],
+                [p.hold_days for p in members],
+                [p.target_profit_ratio for p in members],
+                [p.alpha for p in members]
+            )
+            for k, indices in enumerate(pending.values()):
+                row_stats = stats.row(k)
+                if use_cache:
+                    fitness_cache.put(series.name, members[k], row_stats)
+                for i in indices:
+                    batch_stats[i] = row_stats
+        
+        for i in batch:
+            results[i] = build_trading_result(population[i], batch_stats[i], len(close))
+        
+        return results
+        
+    except Exception as e:
+        print(f"⚠️ 批次評估失敗，改用逐一評估: {e}")
+        return [evaluate_parameters(series, params, fitness_cache) for params in population]
+
+def evaluate_parameter_population_parallel(series: PreparedSeries, population: List[TradingParameters],
+                                           executor, n_chunks: int,
+                                           fitness_cache: FitnessCache = None) -> List[TradingResult]:
+    """將族群切成多塊由執行緒池同時批次評估
+
+    回測核心（numba nogil 狀態機與大型 NumPy 陣列運算）執行時會釋放 GIL，
+    因此多個執行緒可以真正同時運算。
+    """
+    if executor is None or n_chunks <= 1 or len(population) < 2 * n_chunks:
+        return evaluate_parameter_population(series, population, fitness_cache)
+    
+    chunk_size = -(-len(population) // n_chunks)
+    chunks = [population[i:i + chunk_size] for i in range(0, len(population), chunk_size)]
+    results = []
+    for chunk_results in executor.map(lambda chunk: evaluate_parameter_population(series, chunk, fitness_cache), chunks):
+        results.extend(chunk_results)
+    return results
+
+def parameters_matrix(population: List[TradingParameters]) -> np.ndarray:
+    """(個體數 × 4) 的基因矩陣（欄位順序同 GENE_NAMES）"""
+    return np.array([p.as_tuple() for p in population], dtype=np.float64).reshape(-1, len(GENE_NAMES))
+
+def normalize_gene_matrix(genes: np.ndarray, param_ranges: dict) -> np.ndarray:
+    """將基因矩陣的每個基因縮放到約 [0, 1]"""
+    lower = np.array([param_ranges[name][0] for name in GENE_NAMES], dtype=np.float64)
+    upper = np.array([param_ranges[name][1] for name in GENE_NAMES], dtype=np.float64)
+    upper[GENE_NAMES.index('target_profit_ratio')] = NORMALIZE_TARGET_MAX
+    return (genes - lower) / (upper - lower)
+
+def genotypic_diversity(genes: np.ndarray, param_ranges: dict) -> float:
+    """族群的基因型多樣性：正規化基因兩兩距離的均方根，以均勻隨機族群的期望值為 1（族群塌縮時趨近 0）
+
+    所有個體兩兩距離平方的平均等於各基因樣本變異數總和的兩倍，因此只需 O(個體數) 的計算
+    """
+    if len(genes) < 2:
+        return 0.0
+    variance = normalize_gene_matrix(genes, param_ranges).var(axis=0, ddof=1).sum()
+    return float(np.sqrt(variance / (genes.shape[1] / 12)))
+
+def load_warm_start_parameters(db, table_name: str, industry: str = None, limit: int = 20) -> List[TradingParameters]:
+    """由 BestParameters 取得同一檔股票與同產業最近的最佳參數，作為初始族群的種子"""
+    stock_code = db.extract_stock_code_from_table_name(table_name)
+    seeds = []
+    for row in db.get_recent_best_params(stock_code, industry, limit):
+        try:
+            params = TradingParameters(
+                m_intervals=int(row['BestIntervals']),
+                hold_days=int(row['HoldDays']),
+                target_profit_ratio=float(row['TargetProfitRatio']),
+                alpha=float(row['Alpha'])
+            )
+        except (TypeError, ValueError):
+            continue
+        if params.m_intervals > 0 and params.hold_days > 0 and params.target_profit_ratio > 0 and params.alpha > 0:
+            seeds.append(params)
+    print(f"🌱 取得 {len(seeds)} 組歷史最佳參數作為種子 ({stock_code}, {industry})")
+    return seeds
+
 class GeneticAlgorithm:
+    # evolve 是否支援 checkpoint_path 檢查點與 resume_from 繼續；不支援的子類別指定 checkpoint_path 時拋出 ValueError
+    supports_checkpoint = True
+    
     def __init__(self, data: pd.DataFrame, population_size: int = 50, generations: int = 100, 
                  mutation_rate: float = 0.1, crossover_rate: float = 0.8,
                  max_time_minutes: float = 10.0, convergence_threshold: float = 1e-6,
-                 convergence_generations: int = 10):
+                 convergence_generations: int = 10, fitness_cache_size: int = 10000,
+                 checkpoint_path: str = None, checkpoint_interval: int = 10,
+                 seed_parameters: List[TradingParameters] = None, seed_fraction: float = 0.3,
+                 diversity_threshold: float = None, diversity_boost_threshold: float = None,
+                 diversity_boost_factor: float = 2.0):
         self.original_data = data.copy()
         self.population_size = population_size
         self.generations = generations
@@ -41,9 +336,15 @@ class GeneticAlgorithm:
         self.convergence_threshold = convergence_threshold  # 適應度變異閾值
         self.convergence_generations = convergence_generations  # 判斷收斂的世代數
         
-        # 記錄適應度歷史
+        # 記錄適應度與基因型多樣性歷史
         self.best_fitness_history = []
         self.avg_fitness_history = []
+        self.diversity_history = []
+        
+        # 多樣性低於 diversity_threshold 時停止演化；低於 diversity_boost_threshold 時突變率乘上 diversity_boost_factor
+        self.diversity_threshold = diversity_threshold
+        self.diversity_boost_threshold = diversity_boost_threshold
+        self.diversity_boost_factor = diversity_boost_factor
         
         # 停止條件狀態
         self.stop_reason = ""
@@ -55,67 +356,40 @@ class GeneticAlgorithm:
             'target_profit_ratio': (0.02, float('inf')),  # 調整為2%到無上限
             'alpha': (0.5, 99.0)  # α代表門檻百分比，0.5%到99%之間
         }
+        
+        # 適應度快取（快取不含隨機擾動的回測統計）
+        self.fitness_cache = FitnessCache(fitness_cache_size)
+        
+        # 暖啟動：初始族群中 seed_fraction 比例的個體由歷史最佳參數擾動產生
+        self.seed_parameters = list(seed_parameters or [])
+        self.seed_fraction = min(max(seed_fraction, 0.0), 1.0)
+        
+        # 檢查點：每 checkpoint_interval 世代寫入 checkpoint_path（未指定時不寫入）
+        if checkpoint_path and not self.supports_checkpoint:
+            raise ValueError(f"{type(self).__name__} 不支援檢查點 (checkpoint_path)")
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        
+        # 訓練/測試資料的預處理價格序列與移動平均庫（每個資料集只建立一次）
+        self.train_series, self.test_series = self.build_series()
+    
+    def build_series(self) -> tuple:
+        """建立訓練/測試資料的預處理價格序列，回傳 (訓練序列, 測試序列)"""
+        return (prepare_series(self.train_data, 'train', self.param_ranges['m_intervals']),
+                prepare_series(self.test_data, 'test', self.param_ranges['m_intervals']))
+    
+    def current_series(self) -> PreparedSeries:
+        """取得目前評估資料對應的預處理價格序列"""
+        if self.data is self.train_data:
+            return self.train_series
+        if self.data is self.test_data:
+            return self.test_series
+        # self.data 被替換為其他資料時臨時建立（不使用快取）
+        return prepare_series(self.data, None, self.param_ranges['m_intervals'])
     
     def split_train_test_data(self, data):
         """分割訓練和測試數據：2019-2023訓練，2024測試"""
-        try:
-            # 處理欄位名稱中的BOM字符
-            data.columns = data.columns.str.replace('\ufeff', '', regex=False)
-            
-            print(f"📊 原始數據: {len(data)} 筆, 欄位: {list(data.columns)}")
-            
-            # 找到日期欄位
-            date_column = None
-            for col in ['Date', 'date', '日期', 'DATE', 'DateTime', 'Time']:
-                if col in data.columns:
-                    date_column = col
-                    break
-            
-            if date_column is None:
-                print("⚠️ 警告: 沒有找到日期欄位，使用全部資料作為訓練資料")
-                return data.copy(), pd.DataFrame()
-            
-            # 確保Date欄位為datetime類型
-            data[date_column] = pd.to_datetime(data[date_column], errors='coerce')
-            
-            # 移除無效日期
-            data = data.dropna(subset=[date_column])
-            
-            if len(data) == 0:
-                print("❌ 日期轉換後資料為空")
-                return pd.DataFrame(), pd.DataFrame()
-            
-            data_sorted = data.sort_values(date_column).reset_index(drop=True)
-            
-            # 檢查日期範圍
-            min_date = data_sorted[date_column].min()
-            max_date = data_sorted[date_column].max()
-            print(f"📅 資料日期範圍: {min_date.strftime('%Y-%m-%d')} 到 {max_date.strftime('%Y-%m-%d')}")
-            
-            # 分割數據
-            train_data = data_sorted[data_sorted[date_column].dt.year.between(2019, 2023)].copy()
-            test_data = data_sorted[data_sorted[date_column].dt.year == 2024].copy()
-            
-            print(f"📊 數據分割完成:")
-            print(f"   訓練數據 (2019-2023): {len(train_data)} 筆")
-            print(f"   測試數據 (2024): {len(test_data)} 筆")
-            
-            if len(train_data) == 0:
-                print("⚠️ 警告: 2019-2023年訓練數據為空，使用全部數據的前80%作為訓練")
-                split_point = int(len(data_sorted) * 0.8)
-                train_data = data_sorted[:split_point].copy()
-                test_data = data_sorted[split_point:].copy()
-                print(f"📊 重新分割: 訓練 {len(train_data)} 筆, 測試 {len(test_data)} 筆")
-            
-            if len(test_data) == 0:
-                print("⚠️ 警告: 2024年測試數據為空")
-            
-            return train_data, test_data
-            
-        except Exception as e:
-            print(f"❌ 數據分割失敗: {e}")
-            print("使用全部數據作為訓練數據")
-            return data.copy(), pd.DataFrame()
+        return split_train_test_data(data)
     
     def create_random_individual(self) -> TradingParameters:
         """創建隨機個體 - 增強多樣性"""
@@ -129,6 +403,37 @@ class GeneticAlgorithm:
             alpha=round(random.uniform(*self.param_ranges['alpha']), 3)
         )
     
+    def create_seeded_individual(self, seed: TradingParameters, perturb: bool = True) -> TradingParameters:
+        """由種子參數產生個體（perturb 時加入小幅擾動並限制在參數範圍內）"""
+        m_low, m_high = self.param_ranges['m_intervals']
+        h_low, h_high = self.param_ranges['hold_days']
+        a_low, a_high = self.param_ranges['alpha']
+        m_intervals, hold_days = seed.m_intervals, seed.hold_days
+        target_profit_ratio, alpha = seed.target_profit_ratio, seed.alpha
+        if perturb:
+            m_intervals += random.randint(-2, 2)
+            hold_days += random.randint(-2, 2)
+            target_profit_ratio *= random.uniform(0.9, 1.1)
+            alpha *= random.uniform(0.9, 1.1)
+        
+        return TradingParameters(
+            m_intervals=max(m_low, min(m_high, int(m_intervals))),
+            hold_days=max(h_low, min(h_high, int(hold_days))),
+            target_profit_ratio=round(max(self.param_ranges['target_profit_ratio'][0], target_profit_ratio), 4),
+            alpha=round(max(a_low, min(a_high, alpha)), 3)
+        )
+    
+    def initial_population(self) -> List[TradingParameters]:
+        """建立初始族群：有種子參數時部分個體由種子產生（每個種子先保留一份原值），其餘隨機"""
+        seed_count = int(round(self.population_size * self.seed_fraction)) if self.seed_parameters else 0
+        population = [
+            self.create_seeded_individual(self.seed_parameters[i % len(self.seed_parameters)],
+                                          perturb=i >= len(self.seed_parameters))
+            for i in range(seed_count)
+        ]
+        population.extend(self.create_random_individual() for _ in range(self.population_size - seed_count))
+        return population
+    
     def check_convergence(self) -> bool:
         """檢查種群是否已收斂"""
         if len(self.best_fitness_history) < self.convergence_generations:
@@ -143,14 +448,45 @@ class GeneticAlgorithm:
         # 如果變異小於閾值，認為已收斂
         return fitness_variance < self.convergence_threshold
     
+    def record_diversity(self, population: List[TradingParameters]) -> float:
+        """計算並記錄族群的基因型多樣性"""
+        diversity = genotypic_diversity(parameters_matrix(population), self.param_ranges)
+        self.diversity_history.append(diversity)
+        return diversity
+    
+    def check_diversity_collapse(self) -> bool:
+        """檢查族群基因是否已塌縮（未設定 diversity_threshold 時不檢查）"""
+        return (self.diversity_threshold is not None and bool(self.diversity_history)
+                and self.diversity_history[-1] < self.diversity_threshold)
+    
+    def diversity_mutation_rate(self, mutation_rate: float) -> float:
+        """多樣性偏低時提高突變率"""
+        if (self.diversity_boost_threshold is not None and self.diversity_history
+                and self.diversity_history[-1] < self.diversity_boost_threshold):
+            return min(1.0, mutation_rate * self.diversity_boost_factor)
+        return mutation_rate
+    
     def check_time_limit(self, start_time) -> bool:
         """檢查是否超過時間限制"""
         import time
         elapsed_minutes = (time.time() - start_time) / 60
         return elapsed_minutes >= self.max_time_minutes
     
-    def evaluate_fitness(self, params: TradingParameters) -> TradingResult:
-        """評估個體適應度"""
+    def evaluate_fitness(self, params: TradingParameters, series: PreparedSeries = None) -> TradingResult:
+        """評估個體適應度 - 使用向量化回測引擎（series 未指定時使用目前的評估資料）"""
+        if series is None:
+            series = self.current_series()
+        return evaluate_parameters(series, params, self.fitness_cache)
+    
+    def evaluate_population(self, population: List[TradingParameters],
+                            series: PreparedSeries = None) -> List[TradingResult]:
+        """批次評估整個族群 - 以 (族群 × 交易日) 信號矩陣一次模擬所有個體"""
+        if series is None:
+            series = self.current_series()
+        return evaluate_parameter_population(series, population, self.fitness_cache)
+    
+    def evaluate_fitness_reference(self, params: TradingParameters) -> TradingResult:
+        """評估個體適應度 - 原始逐日迴圈參考實作（用於驗證向量化引擎的等價性）"""
         try:
             # 檢查資料是否為空
             if self.data.empty:
@@ -434,21 +770,11 @@ class GeneticAlgorithm:
             )
         
         try:
-            # 使用測試數據進行評估
-            original_data = self.data
-            self.data = self.test_data  # 暫時切換到測試數據
-            
-            # 調用原有的評估方法
-            result = self.evaluate_fitness(params)
-            
-            # 恢復原有數據
-            self.data = original_data
-            
-            return result
+            # 直接以測試資料序列評估，不切換 self.data，可與訓練資料評估同時進行
+            return self.evaluate_fitness(params, self.test_series)
             
         except Exception as e:
             print(f"❌ 測試評估失敗: {e}")
-            self.data = original_data  # 確保恢復原有數據
             return TradingResult(
                 parameters=params,
                 fitness=-10,
@@ -477,39 +803,40 @@ class GeneticAlgorithm:
             alpha=new_alpha
         )
     
-    def mutate(self, individual: TradingParameters) -> TradingParameters:
-        """突變操作 - 增強版"""
+    def mutate(self, individual: TradingParameters, mutation_rate: float = None) -> TradingParameters:
+        """突變操作 - 增強版（mutation_rate 未指定時使用 self.mutation_rate；回傳新的參數物件）"""
+        if mutation_rate is None:
+            mutation_rate = self.mutation_rate
+        m_intervals, hold_days, target_profit_ratio, alpha = individual.as_tuple()
+        
         # 每個參數都有機會突變
-        if random.random() < self.mutation_rate:
+        if random.random() < mutation_rate:
             # m_intervals 突變
             if random.random() < 0.25:
-                individual.m_intervals = max(self.param_ranges['m_intervals'][0], 
-                                           min(self.param_ranges['m_intervals'][1],
-                                               individual.m_intervals + random.randint(-8, 8)))
+                m_intervals = max(self.param_ranges['m_intervals'][0],
+                                  min(self.param_ranges['m_intervals'][1], m_intervals + random.randint(-8, 8)))
         
-        if random.random() < self.mutation_rate:
+        if random.random() < mutation_rate:
             # hold_days 突變
             if random.random() < 0.25:
-                individual.hold_days = max(self.param_ranges['hold_days'][0],
-                                         min(self.param_ranges['hold_days'][1],
-                                             individual.hold_days + random.randint(-5, 5)))
+                hold_days = max(self.param_ranges['hold_days'][0],
+                                min(self.param_ranges['hold_days'][1], hold_days + random.randint(-5, 5)))
         
-        if random.random() < self.mutation_rate:
+        if random.random() < mutation_rate:
             # target_profit_ratio 突變
             if random.random() < 0.25:
-                new_ratio = individual.target_profit_ratio + random.uniform(-0.03, 0.03)
                 # 確保不低於下限，無上限
-                individual.target_profit_ratio = max(self.param_ranges['target_profit_ratio'][0], new_ratio)
+                target_profit_ratio = max(self.param_ranges['target_profit_ratio'][0],
+                                          target_profit_ratio + random.uniform(-0.03, 0.03))
         
-        if random.random() < self.mutation_rate:
+        if random.random() < mutation_rate:
             # alpha 突變
             if random.random() < 0.25:
-                individual.alpha = max(self.param_ranges['alpha'][0],
-                                     min(self.param_ranges['alpha'][1],
-                                         individual.alpha + random.uniform(-5.0, 5.0)))
                 # 確保alpha值在合理範圍內（0.5%到99%）
+                alpha = max(self.param_ranges['alpha'][0],
+                            min(self.param_ranges['alpha'][1], alpha + random.uniform(-5.0, 5.0)))
         
-        return individual
+        return TradingParameters(m_intervals, hold_days, target_profit_ratio, alpha)
     
     def tournament_selection(self, population: List[TradingResult], tournament_size: int = 3) -> TradingParameters:
         """錦標賽選擇"""
@@ -517,26 +844,59 @@ class GeneticAlgorithm:
         winner = max(tournament, key=lambda x: x.fitness)
         return winner.parameters
     
-    def evolve(self) -> TradingResult:
-        """執行遺傳演算法 - 使用智能停止條件"""
+    def history_state(self, generation: int, elapsed_seconds: float) -> dict:
+        """各最佳化器共用的檢查點狀態：世代、已用時間、適應度與多樣性歷史、隨機數狀態"""
+        return {
+            'generation': generation,
+            'elapsed_seconds': elapsed_seconds,
+            'best_fitness_history': list(self.best_fitness_history),
+            'avg_fitness_history': list(self.avg_fitness_history),
+            'diversity_history': list(self.diversity_history),
+            'random_state': random.getstate(),
+            'numpy_random_state': np.random.get_state(),
+            'train_rows': len(self.train_data)
+        }
+    
+    def restore_history(self, state: dict):
+        """由檢查點還原適應度與多樣性歷史及隨機數狀態"""
+        if state.get('train_rows') != len(self.train_data):
+            print(f"⚠️ 檢查點的訓練資料筆數 ({state.get('train_rows')}) 與目前資料 ({len(self.train_data)}) 不同")
+        self.best_fitness_history = list(state['best_fitness_history'])
+        self.avg_fitness_history = list(state['avg_fitness_history'])
+        self.diversity_history = list(state.get('diversity_history', []))
+        random.setstate(state['random_state'])
+        np.random.set_state(state['numpy_random_state'])
+    
+    def checkpoint_state(self, population: List[TradingResult], generation: int, elapsed_seconds: float) -> dict:
+        """目前演化狀態（寫入檢查點用）"""
+        return {'population': results_to_arrays(population), **self.history_state(generation, elapsed_seconds)}
+    
+    def restore_checkpoint(self, state: dict) -> tuple:
+        """由檢查點還原演化狀態，回傳 (族群, 世代, 已用秒數)"""
+        self.restore_history(state)
+        return arrays_to_results(state['population']), state['generation'], state['elapsed_seconds']
+    
+    def evolve(self, resume_from: str = None) -> TradingResult:
+        """執行遺傳演算法 - 使用智能停止條件（resume_from 指定檢查點檔案時從該處繼續）"""
         import time
         
-        # 設定隨機種子以確保每次執行都有不同結果
-        random.seed()
-        np.random.seed()
-        
-        # 記錄開始時間
-        start_time = time.time()
-        
-        # 初始化族群
-        population = []
-        for _ in range(self.population_size):
-            individual = self.create_random_individual()
-            result = self.evaluate_fitness(individual)
-            population.append(result)
+        if resume_from is not None:
+            population, generation, elapsed_seconds = self.restore_checkpoint(load_checkpoint(resume_from))
+            start_time = time.time() - elapsed_seconds
+            print(f"♻️ 從檢查點繼續: 世代 {generation}, 已用時間 {elapsed_seconds / 60:.1f}分")
+        else:
+            # 設定隨機種子以確保每次執行都有不同結果
+            random.seed()
+            np.random.seed()
+            
+            # 記錄開始時間
+            start_time = time.time()
+            
+            # 初始化族群（有種子參數時部分個體由歷史最佳參數產生）
+            population = self.evaluate_population(self.initial_population())
+            generation = 0
         
         # 演化過程 - 檢查三個停止條件
-        generation = 0
         while generation < self.generations:
             # 記錄當前世代的適應度
             fitnesses = [ind.fitness for ind in population]
@@ -545,6 +905,7 @@ class GeneticAlgorithm:
             
             self.best_fitness_history.append(best_fitness)
             self.avg_fitness_history.append(avg_fitness)
+            self.record_diversity([ind.parameters for ind in population])
             
             # 檢查停止條件
             stop_conditions = []
@@ -559,7 +920,12 @@ class GeneticAlgorithm:
                 self.stop_reason = f"種群已收斂 (適應度變異 < {self.convergence_threshold})"
                 stop_conditions.append("種群收斂")
             
-            # 條件3：檢查最大世代數
+            # 條件3：檢查基因型多樣性
+            if self.check_diversity_collapse():
+                self.stop_reason = f"族群基因已塌縮 (多樣性 {self.diversity_history[-1]:.4f} < {self.diversity_threshold})"
+                stop_conditions.append("多樣性塌縮")
+            
+            # 條件4：檢查最大世代數
             if generation >= self.generations - 1:
                 self.stop_reason = f"達到最大世代數 ({self.generations})"
                 stop_conditions.append("最大世代")
@@ -577,16 +943,18 @@ class GeneticAlgorithm:
             best_individual = max(population, key=lambda x: x.fitness)
             new_population.append(best_individual)
             
-            # 產生其他個體
-            while len(new_population) < self.population_size:
+            # 產生其他個體，整批評估（多樣性偏低時提高突變率）
+            mutation_rate = self.diversity_mutation_rate(self.mutation_rate)
+            children = []
+            while len(new_population) + len(children) < self.population_size:
                 parent1 = self.tournament_selection(population)
                 parent2 = self.tournament_selection(population)
                 
                 child = self.crossover(parent1, parent2)
-                child = self.mutate(child)
-                
-                child_result = self.evaluate_fitness(child)
-                new_population.append(child_result)
+                child = self.mutate(child, mutation_rate)
+                children.append(child)
+            
+            new_population.extend(self.evaluate_population(children))
             
             population = new_population
             
@@ -596,6 +964,11 @@ class GeneticAlgorithm:
                 print(f"世代 {generation}: 最佳適應度 = {best_fitness:.4f}, 平均適應度 = {avg_fitness:.4f}, 已用時間 = {elapsed_minutes:.1f}分")
             
             generation += 1
+            
+            # 定期寫入檢查點
+            if self.checkpoint_path and generation % self.checkpoint_interval == 0:
+                save_checkpoint(self.checkpoint_path,
+                                self.checkpoint_state(population, generation, time.time() - start_time))
         
         # 獲取最佳結果（基於訓練數據）
         best_result = max(population, key=lambda x: x.fitness)
@@ -617,7 +990,7 @@ class GeneticAlgorithm:
         if len(self.best_fitness_history) > 0:
             print(f"📊 適應度改進: {self.best_fitness_history[-1] - self.best_fitness_history[0]:.4f}")
         
-        # 將測試結果添加到最佳結果中供後續使用
-        best_result.test_result = test_result if not self.test_data.empty else None
+        print(f"🗂️ 適應度快取: {self.fitness_cache.summary()}")
         
-        return best_result
\ No newline at end of file
+        # 將測試結果添加到最佳結果中供後續使用
+        return replace(best_result, test_result=test_result if not self.test_data.empty else None)
\ No newline at end of file
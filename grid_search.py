@@ -0,0 +1,198 @@
+"""
+窮舉式向量化網格搜尋
+離散參數空間很小（46 種區間數 × 30 種持有天數），且每組 (m_intervals, alpha) 的信號向量固定，
+因此可以用共用的移動平均庫與族群批次模擬一次掃過整個參數網格，
+回傳全域最佳參數與完整的適應度地形，結果沒有隨機擾動
+"""
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import (PreparedSeries, compute_fitness, compute_population_fitness, effective_window,
+                             generate_signal_matrix, prepare_series, run_backtest, simulate_population)
+from ga_optimizer import TradingParameters, TradingResult, penalty_result, split_train_test_data
+
+GRID_AXES = ('m_intervals', 'hold_days', 'target_profit_ratio', 'alpha')
+
+
+@dataclass
+class ParameterGrid:
+    """四個參數的搜尋網格"""
+    m_intervals: np.ndarray = field(default_factory=lambda: np.arange(5, 51))
+    hold_days: np.ndarray = field(default_factory=lambda: np.arange(1, 31))
+    target_profit_ratio: np.ndarray = field(default_factory=lambda: np.round(np.linspace(0.02, 0.5, 13), 4))
+    alpha: np.ndarray = field(default_factory=lambda: np.round(np.geomspace(0.5, 20.0, 12), 3))
+
+    def __post_init__(self):
+        self.m_intervals = np.asarray(self.m_intervals, dtype=np.int64)
+        self.hold_days = np.asarray(self.hold_days, dtype=np.int64)
+        self.target_profit_ratio = np.asarray(self.target_profit_ratio, dtype=np.float64)
+        self.alpha = np.asarray(self.alpha, dtype=np.float64)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(getattr(self, axis)) for axis in GRID_AXES)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def parameters(self, index) -> TradingParameters:
+        """網格索引 (i, j, k, l) 對應的交易參數"""
+        i, j, k, l = index
+        return TradingParameters(
+            m_intervals=int(self.m_intervals[i]),
+            hold_days=int(self.hold_days[j]),
+            target_profit_ratio=float(self.target_profit_ratio[k]),
+            alpha=float(self.alpha[l])
+        )
+
+
+@dataclass
+class GridSearchResult:
+    """網格搜尋結果：每個欄位為與網格同形狀的四維陣列"""
+    grid: ParameterGrid
+    fitness: np.ndarray
+    total_profit: np.ndarray
+    win_rate: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe_ratio: np.ndarray
+    elapsed_seconds: float = 0.0
+
+    @property
+    def best_index(self) -> tuple:
+        return np.unravel_index(int(np.argmax(self.fitness)), self.fitness.shape)
+
+    def result_at(self, index) -> TradingResult:
+        """網格索引對應的 TradingResult"""
+        index = tuple(int(i) for i in index)
+        return TradingResult(
+            parameters=self.grid.parameters(index),
+            fitness=float(self.fitness[index]),
+            total_profit=float(self.total_profit[index]),
+            win_rate=float(self.win_rate[index]),
+            max_drawdown=float(self.max_drawdown[index]),
+            sharpe_ratio=float(self.sharpe_ratio[index])
+        )
+
+    def best_result(self) -> TradingResult:
+        return self.result_at(self.best_index)
+
+    def top_results(self, k: int = 10) -> List[TradingResult]:
+        """適應度最高的 k 組參數"""
+        flat = np.argsort(self.fitness, axis=None)[::-1][:k]
+        return [self.result_at(np.unravel_index(i, self.fitness.shape)) for i in flat]
+
+    def landscape(self, axes=('m_intervals', 'alpha')) -> np.ndarray:
+        """將適應度地形投影到兩個參數軸上（其餘軸取最大值）"""
+        keep = [GRID_AXES.index(axis) for axis in axes]
+        reduce = tuple(i for i in range(len(GRID_AXES)) if i not in keep)
+        return self.fitness.max(axis=reduce)
+
+
+def grid_search(series: PreparedSeries, grid: ParameterGrid = None, progress=None) -> GridSearchResult:
+    """在預處理序列上窮舉整個參數網格
+
+    每個 m_intervals 只建立一次 (alpha 數 × 交易日) 的信號矩陣，再展開成所有
+    (hold_days, target_profit_ratio, alpha) 組合一次批次模擬；適應度不含隨機擾動
+    """
+    grid = grid or ParameterGrid()
+    start = time.perf_counter()
+    shape = grid.shape
+    fitness = np.full(shape, -10.0)
+    total_profit, win_rate, sharpe_ratio = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    max_drawdown = np.ones(shape)
+
+    if not series.is_valid:
+        print(series.error_message)
+        return GridSearchResult(grid, fitness, total_profit, win_rate, max_drawdown, sharpe_ratio)
+
+    close, n = series.close, series.n_bars
+    # 每個 m_intervals 區塊內的 (hold_days, target_profit_ratio, alpha) 組合
+    hold_index, target_index, alpha_index = (axis.ravel() for axis in np.meshgrid(
+        np.arange(shape[1]), np.arange(shape[2]), np.arange(shape[3]), indexing='ij'
+    ))
+    holds = grid.hold_days[hold_index]
+    targets = grid.target_profit_ratio[target_index]
+    alphas = grid.alpha[alpha_index]
+
+    for i, m in enumerate(grid.m_intervals):
+        if n < m + 10:
+            fitness[i] = -5.0
+            continue
+
+        window = effective_window(m, n)
+        ma = series.ma_bank.get(window)
+        alpha_signals = generate_signal_matrix(close, np.broadcast_to(ma, (shape[3], n)), grid.alpha)
+        signals = alpha_signals[alpha_index]
+        stats = simulate_population(close, signals, np.full(len(holds), window), targets, holds)
+
+        block = compute_population_fitness(stats, targets, alphas, n).reshape(shape[1:])
+        traded = stats.trades > 0
+        no_buys = stats.buy_signals == 0
+        fitness[i] = block
+        total_profit[i] = (stats.total_profit * 1000).reshape(shape[1:])
+        win_rate[i] = np.where(traded, stats.wins / np.where(traded, stats.trades, 1), 0.0).reshape(shape[1:])
+        max_drawdown[i] = np.where(no_buys, 0.1, stats.max_drawdown).reshape(shape[1:])
+        sharpe_ratio[i] = stats.sharpe_ratio.reshape(shape[1:])
+
+        if progress is not None:
+            progress((i + 1) / shape[0])
+
+    return GridSearchResult(grid, fitness, total_profit, win_rate, max_drawdown, sharpe_ratio,
+                            elapsed_seconds=time.perf_counter() - start)
+
+
+def evaluate_deterministic(series: PreparedSeries, params: TradingParameters) -> TradingResult:
+    """評估單組參數（不含隨機擾動，與網格搜尋的適應度一致）"""
+    if not series.is_valid:
+        return penalty_result(params, -10)
+    if series.n_bars < params.m_intervals + 10:
+        return penalty_result(params, -5)
+
+    stats = run_backtest(series.close, params, series.ma_bank)
+    if stats.buy_signals == 0:
+        return TradingResult(parameters=params, fitness=-3, total_profit=0, win_rate=0,
+                             max_drawdown=0.1, sharpe_ratio=0.0)
+    return TradingResult(
+        parameters=params,
+        fitness=compute_fitness(stats, params, series.n_bars),
+        total_profit=stats.total_profit * 1000,
+        win_rate=stats.wins / stats.trades if stats.trades > 0 else 0,
+        max_drawdown=stats.max_drawdown,
+        sharpe_ratio=stats.sharpe_ratio
+    )
+
+
+class GridSearchOptimizer:
+    """以網格搜尋取代遺傳演算法的最佳化器（訓練/測試資料分割與 GeneticAlgorithm 相同）"""
+
+    def __init__(self, data: pd.DataFrame, grid: ParameterGrid = None):
+        self.grid = grid or ParameterGrid()
+        self.train_data, self.test_data = split_train_test_data(data.copy())
+        window_range = (int(self.grid.m_intervals.min()), int(self.grid.m_intervals.max()))
+        self.train_series = prepare_series(self.train_data, 'train', window_range)
+        self.test_series = prepare_series(self.test_data, 'test', window_range)
+        self.search_result = None
+        self.stop_reason = ""
+
+    def optimize(self, progress=None) -> TradingResult:
+        """掃過整個網格，回傳訓練資料上的最佳結果（附測試資料結果）"""
+        print(f"🔎 網格搜尋: {' × '.join(str(size) for size in self.grid.shape)} = {self.grid.size:,} 組參數")
+        self.search_result = grid_search(self.train_series, self.grid, progress)
+        best_result = self.search_result.best_result()
+        self.stop_reason = f"完成網格搜尋 ({self.grid.size:,} 組參數)"
+
+        print(f"⏱️  網格搜尋耗時: {self.search_result.elapsed_seconds:.2f} 秒 "
+              f"({self.grid.size / max(self.search_result.elapsed_seconds, 1e-9):,.0f} 組/秒)")
+        print(f"📈 訓練數據最佳適應度: {best_result.fitness:.4f}")
+
+        if not self.test_data.empty:
+            test_result = evaluate_deterministic(self.test_series, best_result.parameters)
+            print(f"🧪 測試數據適應度: {test_result.fitness:.4f}")
+            best_result = replace(best_result, test_result=test_result)
+        return best_result
@@ -0,0 +1,272 @@
+"""
+島嶼模型遺傳演算法
+將族群分成 K 個子族群（島嶼），每個島嶼在獨立的工作行程中演化，
+每隔 N 個世代依環狀（ring）或全連接（all）拓撲交換各島嶼的最佳個體，
+讓單一股票的分析也能使用所有 CPU 核心
+"""
+
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List
+
+import numpy as np
+
+from backtest_engine import PreparedSeries, PopulationStats
+from ga_checkpoint import load_checkpoint, save_checkpoint
+from ga_optimizer import GeneticAlgorithm, TradingResult, genotypic_diversity
+from vectorized_ga import (PopulationArrays, concat_stats, evaluate_population_arrays, evolve_generation,
+                           population_result, take_stats)
+
+TOPOLOGIES = ('ring', 'all')
+
+# 工作行程內的訓練序列（由 initializer 設定一次，之後每個 epoch 只傳送族群陣列）
+_WORKER_SERIES = None
+
+
+def _init_island_worker(series: PreparedSeries):
+    """工作行程初始化：保存訓練序列"""
+    global _WORKER_SERIES
+    _WORKER_SERIES = series
+
+
+@dataclass
+class IslandState:
+    """單一島嶼的演化狀態（在主行程與工作行程之間傳遞）"""
+    island_id: int
+    rng_state: dict
+    population: PopulationArrays = None
+    fitness: np.ndarray = None
+    stats: PopulationStats = None
+    best_history: List[float] = field(default_factory=list)
+    avg_history: List[float] = field(default_factory=list)
+    diversity_history: List[float] = field(default_factory=list)
+
+    def record(self, param_ranges: dict):
+        """記錄目前族群的最佳與平均適應度及基因型多樣性"""
+        self.best_history.append(float(self.fitness.max()))
+        self.avg_history.append(float(self.fitness.mean()))
+        self.diversity_history.append(genotypic_diversity(self.population.as_matrix(), param_ranges))
+
+    def mutation_rate(self, settings: dict) -> float:
+        """島嶼多樣性低於 diversity_boost_threshold 時提高突變率（與 GeneticAlgorithm.diversity_mutation_rate 相同）"""
+        threshold = settings['diversity_boost_threshold']
+        if threshold is not None and self.diversity_history and self.diversity_history[-1] < threshold:
+            return min(1.0, settings['mutation_rate'] * settings['diversity_boost_factor'])
+        return settings['mutation_rate']
+
+
+def run_island_epoch(state: IslandState, generations: int, settings: dict,
+                     series: PreparedSeries = None) -> IslandState:
+    """讓一個島嶼演化指定的世代數（尚未評估的島嶼先評估初始族群，沒有初始族群時隨機建立）"""
+    series = series if series is not None else _WORKER_SERIES
+    rng = np.random.default_rng()
+    rng.bit_generator.state = state.rng_state
+
+    if state.fitness is None:
+        if state.population is None:
+            state.population = PopulationArrays.random(settings['population_size'], rng, settings['param_ranges'])
+        state.fitness, state.stats = evaluate_population_arrays(series, state.population, rng)
+        state.record(settings['param_ranges'])
+
+    for _ in range(generations):
+        state.population, state.fitness, state.stats = evolve_generation(
+            series, state.population, state.fitness, state.stats, rng,
+            settings['crossover_rate'], state.mutation_rate(settings),
+            settings['param_ranges'], settings['tournament_size']
+        )
+        state.record(settings['param_ranges'])
+
+    state.rng_state = rng.bit_generator.state
+    return state
+
+
+def migration_sources(island_id: int, n_islands: int, topology: str) -> List[int]:
+    """島嶼接收移民的來源島嶼"""
+    if n_islands <= 1:
+        return []
+    if topology == 'ring':
+        return [(island_id - 1) % n_islands]
+    return [k for k in range(n_islands) if k != island_id]
+
+
+def migrate(states: List[IslandState], migration_size: int, topology: str):
+    """交換各島嶼的最佳個體：移民取代接收島嶼中最差的個體（連同適應度與回測統計）"""
+    emigrants = [np.argsort(state.fitness)[::-1][:migration_size] for state in states]
+    incoming = []
+    for state in states:
+        sources = migration_sources(state.island_id, len(states), topology)
+        incoming.append((
+            PopulationArrays.concat([states[k].population.take(emigrants[k]) for k in sources]),
+            np.concatenate([states[k].fitness[emigrants[k]] for k in sources]),
+            concat_stats([take_stats(states[k].stats, emigrants[k]) for k in sources])
+        ) if sources else None)
+
+    for state, arrivals in zip(states, incoming):
+        if arrivals is None:
+            continue
+        population, fitness, stats = arrivals
+        # 保留島嶼自己的最佳個體
+        count = min(len(fitness), len(state.fitness) - 1)
+        worst = np.argsort(state.fitness)[:count]
+        keep = np.setdiff1d(np.arange(len(state.fitness)), worst)
+        state.population = PopulationArrays.concat([state.population.take(keep), population.take(np.arange(count))])
+        state.fitness = np.concatenate([state.fitness[keep], fitness[:count]])
+        state.stats = concat_stats([take_stats(state.stats, keep), take_stats(stats, np.arange(count))])
+
+
+class IslandGeneticAlgorithm(GeneticAlgorithm):
+    """島嶼模型遺傳演算法（population_size 為每個島嶼的族群大小）"""
+
+    def __init__(self, data, n_islands: int = 4, migration_interval: int = 5, migration_size: int = 2,
+                 topology: str = 'ring', max_workers: int = None, seed: int = None, tournament_size: int = 3,
+                 **kwargs):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"不支援的遷移拓撲: {topology}（可用: {', '.join(TOPOLOGIES)}）")
+        super().__init__(data, **kwargs)
+        self.n_islands = max(1, n_islands)
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = migration_size
+        self.topology = topology
+        self.max_workers = max_workers if max_workers is not None else min(self.n_islands, mp.cpu_count())
+        self.seed = seed
+        self.tournament_size = tournament_size
+
+        # 每個島嶼的適應度歷史（供 save_evolution_plot 繪製）
+        self.island_best_histories = []
+        self.island_avg_histories = []
+        self.island_diversity_histories = []
+
+    def evolution_settings(self) -> dict:
+        """傳送給工作行程的演化設定"""
+        return {
+            'population_size': self.population_size,
+            'crossover_rate': self.crossover_rate,
+            'mutation_rate': self.mutation_rate,
+            'param_ranges': self.param_ranges,
+            'tournament_size': self.tournament_size,
+            'diversity_boost_threshold': self.diversity_boost_threshold,
+            'diversity_boost_factor': self.diversity_boost_factor
+        }
+
+    def run_epoch(self, executor, states: List[IslandState], generations: int) -> List[IslandState]:
+        """所有島嶼同時演化一個 epoch"""
+        settings = self.evolution_settings()
+        if executor is None:
+            return [run_island_epoch(state, generations, settings, self.train_series) for state in states]
+        futures = [executor.submit(run_island_epoch, state, generations, settings) for state in states]
+        return [future.result() for future in futures]
+
+    def record_histories(self, states: List[IslandState], start: int):
+        """由各島嶼歷史更新整體的最佳/平均適應度歷史（多樣性為各島嶼的平均）"""
+        for index in range(start, len(states[0].best_history)):
+            self.best_fitness_history.append(max(state.best_history[index] for state in states))
+            self.avg_fitness_history.append(float(np.mean([state.avg_history[index] for state in states])))
+            self.diversity_history.append(float(np.mean([state.diversity_history[index] for state in states])))
+
+    def checkpoint_state(self, states: List[IslandState], generation: int, elapsed_seconds: float) -> dict:
+        """目前演化狀態（寫入檢查點用）：各島嶼的族群、回測統計、隨機數狀態與歷史"""
+        return {'islands': states, **self.history_state(generation, elapsed_seconds)}
+
+    def restore_checkpoint(self, state: dict) -> tuple:
+        """由檢查點還原演化狀態，回傳 (各島嶼狀態, 世代, 已用秒數)"""
+        if len(state['islands']) != self.n_islands:
+            raise ValueError(f"檢查點的島嶼數 ({len(state['islands'])}) 與目前設定 ({self.n_islands}) 不同")
+        self.restore_history(state)
+        return state['islands'], state['generation'], state['elapsed_seconds']
+
+    def evolve(self, resume_from: str = None) -> TradingResult:
+        """執行島嶼模型演化（resume_from 指定檢查點檔案時從該處繼續）"""
+        if resume_from is not None:
+            states, generation, elapsed_seconds = self.restore_checkpoint(load_checkpoint(resume_from))
+            start_time = time.time() - elapsed_seconds
+            print(f"♻️ 從檢查點繼續: 世代 {generation}, 已用時間 {elapsed_seconds / 60:.1f}分")
+        else:
+            start_time = time.time()
+            seeds = np.random.SeedSequence(self.seed).spawn(self.n_islands)
+            states = [IslandState(island_id=k, rng_state=np.random.default_rng(s).bit_generator.state)
+                      for k, s in enumerate(seeds)]
+            if self.seed_parameters:
+                # 暖啟動：每個島嶼的初始族群都包含由歷史最佳參數產生的個體
+                for state in states:
+                    state.population = PopulationArrays.from_parameters(self.initial_population())
+
+        print(f"🏝️ 島嶼模型: {self.n_islands} 個島嶼 × 族群 {self.population_size}, "
+              f"每 {self.migration_interval} 世代以 {self.topology} 拓撲遷移 {self.migration_size} 個個體, "
+              f"工作行程 {self.max_workers}")
+
+        executor = None
+        if self.max_workers > 1 and self.n_islands > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_island_worker,
+                                           initargs=(self.train_series,))
+        try:
+            if resume_from is None:
+                states = self.run_epoch(executor, states, 0)
+                self.record_histories(states, 0)
+                generation = 0
+
+            while True:
+                stop_conditions = []
+                if self.check_time_limit(start_time):
+                    self.stop_reason = f"達到時間限制 ({self.max_time_minutes} 分鐘)"
+                    stop_conditions.append("時間限制")
+                if self.check_convergence():
+                    self.stop_reason = f"種群已收斂 (適應度變異 < {self.convergence_threshold})"
+                    stop_conditions.append("種群收斂")
+                if self.check_diversity_collapse():
+                    self.stop_reason = f"族群基因已塌縮 (多樣性 {self.diversity_history[-1]:.4f} < {self.diversity_threshold})"
+                    stop_conditions.append("多樣性塌縮")
+                if generation >= self.generations - 1:
+                    self.stop_reason = f"達到最大世代數 ({self.generations})"
+                    stop_conditions.append("最大世代")
+
+                if stop_conditions:
+                    print(f"世代 {generation}: 停止演化 - {', '.join(stop_conditions)}")
+                    print(f"最佳適應度 = {self.best_fitness_history[-1]:.4f}, 平均適應度 = {self.avg_fitness_history[-1]:.4f}")
+                    break
+
+                epoch = min(self.migration_interval, self.generations - 1 - generation)
+                recorded = len(states[0].best_history)
+                states = self.run_epoch(executor, states, epoch)
+                self.record_histories(states, recorded)
+                migrate(states, self.migration_size, self.topology)
+                generation += epoch
+
+                # 遷移後的世代跨過 checkpoint_interval 的倍數時寫入檢查點
+                interval = self.checkpoint_interval
+                if self.checkpoint_path and generation // interval > (generation - epoch) // interval:
+                    save_checkpoint(self.checkpoint_path,
+                                    self.checkpoint_state(states, generation, time.time() - start_time))
+
+                elapsed_minutes = (time.time() - start_time) / 60
+                island_best = ", ".join(f"{state.fitness.max():.2f}" for state in states)
+                print(f"世代 {generation}: 最佳適應度 = {self.best_fitness_history[-1]:.4f}, "
+                      f"各島嶼最佳 = [{island_best}], 多樣性 = {self.diversity_history[-1]:.3f}, "
+                      f"已用時間 = {elapsed_minutes:.1f}分")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        self.island_best_histories = [state.best_history for state in states]
+        self.island_avg_histories = [state.avg_history for state in states]
+        self.island_diversity_histories = [state.diversity_history for state in states]
+
+        best_state = max(states, key=lambda state: state.fitness.max())
+        best_result = population_result(best_state.population, best_state.fitness, best_state.stats,
+                                         int(np.argmax(best_state.fitness)))
+        total_time = (time.time() - start_time) / 60
+        test_result = self.evaluate_on_test_data(best_result.parameters)
+
+        print(f"\n🎉 演化完成!")
+        print(f"📊 停止原因: {self.stop_reason}")
+        print(f"⏱️  總用時間: {total_time:.2f} 分鐘")
+        print(f"🔢 執行世代: {generation + 1} / {self.generations}")
+        print(f"🏝️ 最佳結果來自島嶼 {best_state.island_id + 1}")
+        print(f"📈 訓練數據最佳適應度: {best_result.fitness:.4f}")
+
+        if not self.test_data.empty:
+            print(f"🧪 測試數據適應度: {test_result.fitness:.4f}")
+            print(f"📊 訓練vs測試差異: {best_result.fitness - test_result.fitness:.4f}")
+
+        return replace(best_result, test_result=test_result if not self.test_data.empty else None)
@@ -0,0 +1,175 @@
+"""
+多檔股票同步演化
+產業內 N 檔股票各自有獨立的族群，但以 (股票 × 族群 × 基因) 的張量同步演化：
+每個世代的選擇、交叉、突變與回測都一次涵蓋所有股票，
+整個產業只需要一個 Python 世代迴圈，最後每檔股票各得到一組最佳參數
+"""
+
+import time
+from dataclasses import replace
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import (PopulationStats, PricePanel, build_price_panel, compute_population_fitness,
+                             generate_signal_matrix, panel_moving_average, population_fitness_noise,
+                             prepare_series, simulate_population)
+from ga_optimizer import TradingResult, evaluate_parameters, split_train_test_data
+from vectorized_ga import STAT_FIELDS, PopulationArrays, blend_crossover, mutate_population, population_result
+
+
+def build_panel_ma_bank(panel: PricePanel, max_window: int) -> np.ndarray:
+    """價格面板的移動平均庫 (股票 × 窗口 × 交易日)，第二維以窗口大小索引（1 到 max_window，索引 0 不使用）"""
+    n_stocks, n_bars = panel.close.shape
+    bank = np.full((n_stocks, max_window + 1, n_bars), np.nan)
+    for window in range(1, max_window + 1):
+        bank[:, window] = panel_moving_average(panel.close, panel.lengths, np.full(n_stocks, window))
+    return bank
+
+
+def evaluate_panel_population(panel: PricePanel, ma_bank: np.ndarray, population: PopulationArrays,
+                              rows: np.ndarray, rng: np.random.Generator):
+    """在價格面板上評估族群，第 i 個個體回測第 rows[i] 檔股票，回傳 (含隨機擾動的適應度, 回測統計)
+
+    與 evaluate_population_arrays 相同：資料不足的個體給予 -5，沒有買入信號的個體給予 -3
+    """
+    lengths = panel.lengths[rows]
+    windows = np.maximum(1, np.minimum(population.m_intervals, lengths // 2))
+    ma = ma_bank[rows, windows]
+    signals = generate_signal_matrix(panel.close[rows], ma, population.alpha)
+    stats = simulate_population(panel.close, signals, windows, population.target_profit_ratio,
+                                population.hold_days, lengths, close_rows=rows)
+    stats.max_drawdown = np.where(stats.buy_signals == 0, 0.1, stats.max_drawdown)
+
+    fitness = (compute_population_fitness(stats, population.target_profit_ratio, population.alpha, lengths)
+               + population_fitness_noise(stats, rng))
+
+    short = lengths < population.m_intervals + 10
+    fitness[short] = -5.0
+    for name in STAT_FIELDS:
+        getattr(stats, name)[short] = 0
+    stats.max_drawdown[short] = 1.0
+    return fitness, stats
+
+
+class LockstepMultiStockOptimizer:
+    """以 (股票 × 族群 × 基因) 張量同步演化多檔股票的獨立族群（參數範圍與 GeneticAlgorithm 相同）"""
+
+    def __init__(self, stock_data: Dict[str, pd.DataFrame], population_size: int = 30, generations: int = 50,
+                 mutation_rate: float = 0.1, crossover_rate: float = 0.8, max_time_minutes: float = 10.0,
+                 tournament_size: int = 3, seed: int = None):
+        self.population_size = max(2, population_size)
+        self.generations = generations
+        self.mutation_rate = mutation_rate
+        self.crossover_rate = crossover_rate
+        self.max_time_minutes = max_time_minutes
+        self.tournament_size = tournament_size
+        self.rng = np.random.default_rng(seed)
+        self.param_ranges = {
+            'm_intervals': (5, 50),
+            'hold_days': (1, 30),
+            'target_profit_ratio': (0.02, float('inf')),
+            'alpha': (0.5, 99.0)
+        }
+
+        train_series, self.test_series = [], {}
+        for name, data in stock_data.items():
+            train_data, test_data = split_train_test_data(data.copy())
+            train_series.append(prepare_series(train_data, name, self.param_ranges['m_intervals']))
+            if not test_data.empty:
+                self.test_series[name] = prepare_series(test_data, f"{name}:test", self.param_ranges['m_intervals'])
+        self.panel = build_price_panel(train_series)
+        self.ma_bank = build_panel_ma_bank(self.panel, self.param_ranges['m_intervals'][1])
+
+        # 每個世代各股票的最佳/平均適應度（長度為股票數的陣列）
+        self.best_fitness_history: List[np.ndarray] = []
+        self.avg_fitness_history: List[np.ndarray] = []
+        self.stop_reason = ""
+
+    @property
+    def stock_names(self) -> List[str]:
+        return list(self.panel.names)
+
+    def evolve_generation(self, population: PopulationArrays, fitness: np.ndarray, stats: PopulationStats):
+        """所有股票同時演化一個世代：各股票保留自己的最佳個體，其餘由同一檔股票的親代繁殖後整批評估
+
+        族群以股票為主序展平（第 s 檔股票的個體位於 s*P 到 (s+1)*P-1），fitness 形狀為 (股票數, P)
+        """
+        n_stocks, size = fitness.shape
+        n_children = size - 1
+        offsets = (np.arange(n_stocks) * size)[:, None]
+
+        # 每檔股票各自進行錦標賽選擇（參賽者只來自同一檔股票）
+        contestants = self.rng.integers(0, size, (n_stocks, 2 * n_children, self.tournament_size)) + offsets[..., None]
+        winners = np.take_along_axis(contestants, np.argmax(fitness.ravel()[contestants], axis=2)[..., None], axis=2)
+        parents = winners.reshape(n_stocks, 2, n_children)
+
+        children = blend_crossover(population.take(parents[:, 0].ravel()), population.take(parents[:, 1].ravel()),
+                                   self.rng, self.crossover_rate)
+        children = mutate_population(children, self.rng, self.mutation_rate, self.param_ranges)
+        child_rows = np.repeat(np.arange(n_stocks), n_children)
+        child_fitness, child_stats = evaluate_panel_population(self.panel, self.ma_bank, children, child_rows, self.rng)
+
+        # 重新排列為股票主序：[股票 s 的菁英, 股票 s 的子代...]
+        elites = np.argmax(fitness, axis=1) + offsets[:, 0]
+        order = np.column_stack([np.arange(n_stocks),
+                                 n_stocks + np.arange(n_stocks * n_children).reshape(n_stocks, n_children)]).ravel()
+        combined = PopulationArrays.concat([population.take(elites), children]).take(order)
+        combined_fitness = np.concatenate([fitness.ravel()[elites], child_fitness])[order]
+        combined_stats = PopulationStats(*(
+            np.concatenate([getattr(stats, name)[elites], getattr(child_stats, name)])[order] for name in STAT_FIELDS
+        ))
+        return combined, combined_fitness.reshape(n_stocks, size), combined_stats
+
+    def evolve(self) -> Dict[str, TradingResult]:
+        """同步演化所有股票，回傳 {股票: 訓練資料最佳結果（附測試資料結果）}"""
+        start_time = time.time()
+        n_stocks, size = len(self.panel.names), self.population_size
+        if n_stocks == 0:
+            print("❌ 沒有可用的股票資料")
+            return {}
+        print(f"🧮 同步演化: {n_stocks} 檔股票 × 族群 {size}, 最多 {self.generations} 世代")
+
+        population = PopulationArrays.random(n_stocks * size, self.rng, self.param_ranges)
+        rows = np.repeat(np.arange(n_stocks), size)
+        fitness, stats = evaluate_panel_population(self.panel, self.ma_bank, population, rows, self.rng)
+        fitness = fitness.reshape(n_stocks, size)
+
+        generation = 0
+        while True:
+            self.best_fitness_history.append(fitness.max(axis=1))
+            self.avg_fitness_history.append(fitness.mean(axis=1))
+
+            if self.check_time_limit(start_time):
+                self.stop_reason = f"達到時間限制 ({self.max_time_minutes} 分鐘)"
+                break
+            if generation >= self.generations - 1:
+                self.stop_reason = f"達到最大世代數 ({self.generations})"
+                break
+
+            population, fitness, stats = self.evolve_generation(population, fitness, stats)
+
+            if generation % 5 == 0:
+                elapsed_minutes = (time.time() - start_time) / 60
+                print(f"世代 {generation}: 各股票最佳適應度 平均 = {self.best_fitness_history[-1].mean():.4f}, "
+                      f"最低 = {self.best_fitness_history[-1].min():.4f}, 已用時間 = {elapsed_minutes:.1f}分")
+            generation += 1
+
+        results = {}
+        for s, name in enumerate(self.panel.names):
+            best_index = s * size + int(np.argmax(fitness[s]))
+            result = population_result(population, fitness.ravel(), stats, best_index)
+            if name in self.test_series:
+                result = replace(result, test_result=evaluate_parameters(self.test_series[name], result.parameters))
+            results[name] = result
+
+        total_time = (time.time() - start_time) / 60
+        print(f"\n🎉 同步演化完成! 停止原因: {self.stop_reason}")
+        print(f"⏱️  總用時間: {total_time:.2f} 分鐘, 執行世代: {generation + 1}, "
+              f"共評估 {n_stocks * (size + generation * (size - 1))} 個個體")
+        return results
+
+    def check_time_limit(self, start_time) -> bool:
+        """檢查是否超過時間限制"""
+        return (time.time() - start_time) / 60 >= self.max_time_minutes
@@ -1,4 +1,5 @@
-from full_gui import demo
+from full_gui import create_full_interface
 
 if __name__ == "__main__":
+    demo = create_full_interface()
     demo.launch(server_name="127.0.0.1", server_port=7860)
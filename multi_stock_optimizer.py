@@ -50,7 +50,8 @@ def optimize_all_stocks():
     log.append(f"\n📊 批次分析完成！處理: {processed} 個, 跳過: {skipped} 個")
     return "\n".join(log)
 
-def optimize_by_industry(industry):
+def optimize_by_industry(industry, lockstep=False):
+    """逐一最佳化產業內每隻股票（lockstep=True 時所有股票的族群以張量同步演化，只跑一個世代迴圈）"""
     db = DBConnector()
     db.create_best_params_table()
     stocks = db.get_stocks_by_industry(industry)
@@ -58,6 +59,7 @@ def optimize_by_industry(industry):
     
     processed = 0
     skipped = 0
+    stock_data = {}  # 同步演化模式：先載入所有股票資料
     
     for stock in stocks:
         try:
@@ -72,6 +74,10 @@ def optimize_by_industry(industry):
                 log.append(f"⚠️ 跳過 {stock}: 資料不足 ({len(data)} 筆)")
                 skipped += 1
                 continue
+            
+            if lockstep:
+                stock_data[stock] = data
+                continue
                 
             ga = GeneticAlgorithm(
                 data, 
@@ -91,5 +97,100 @@ def optimize_by_industry(industry):
             log.append(f"❌ {stock} 失敗: {str(e)}")
             skipped += 1
     
+    if lockstep and stock_data:
+        from lockstep_ga import LockstepMultiStockOptimizer
+        
+        optimizer = LockstepMultiStockOptimizer(
+            stock_data,
+            population_size=30,
+            generations=50,
+            max_time_minutes=3.0
+        )
+        results = optimizer.evolve()
+        for stock in stock_data:
+            if stock not in results:
+                log.append(f"⚠️ 跳過 {stock}: 無法取得有效的價格序列")
+                skipped += 1
+                continue
+            try:
+                db.save_best_params(stock, results[stock], industry)
+                processed += 1
+                log.append(f"✅ {stock} 完成 (適應度: {results[stock].fitness:.4f})")
+            except Exception as e:
+                log.append(f"❌ {stock} 失敗: {str(e)}")
+                skipped += 1
+    
     log.append(f"\n📊 產業分析完成！處理: {processed} 個, 跳過: {skipped} 個")
     return "\n".join(log)
+
+def optimize_industry_universal(industry):
+    """以產業內所有股票的彙總適應度，最佳化一組產業通用參數"""
+    from universe_evaluator import UniverseEvaluator, UniversalGeneticAlgorithm
+    
+    db = DBConnector()
+    evaluator = UniverseEvaluator.from_industry(db, industry)
+    log = [f"開始產業通用參數分析 '{industry}'，有效股票 {len(evaluator.stock_names)} 隻"]
+    
+    if not evaluator.stock_names:
+        log.append("❌ 沒有可用的股票資料")
+        return "\n".join(log)
+    
+    ga = UniversalGeneticAlgorithm(
+        evaluator,
+        population_size=30,
+        generations=50,
+        max_time_minutes=3.0,
+        convergence_threshold=0.001,
+        convergence_generations=5
+    )
+    best_result = ga.evolve()
+    params = best_result.parameters
+    log.append(f"🔧 通用參數: 區間數={params.m_intervals}, 持有天數={params.hold_days}, "
+               f"目標利潤={params.target_profit_ratio*100:.2f}%, α={params.alpha:.1f}%")
+    log.append(f"📈 彙總適應度: {best_result.fitness:.4f}")
+    
+    for stock, result in zip(evaluator.stock_names, evaluator.evaluate(params)):
+        log.append(f"   {stock}: 適應度 {result.fitness:.4f}, 總利潤 {result.total_profit:,.2f}, 勝率 {result.win_rate:.1%}")
+    
+    return "\n".join(log)
+
+def optimize_industry_pareto(industry):
+    """以 NSGA-II 分析產業內每隻股票，儲存柏拉圖前緣與加權適應度最佳的參數"""
+    from nsga2 import NSGA2Optimizer
+    
+    db = DBConnector()
+    db.create_best_params_table()
+    db.create_pareto_front_table()
+    stocks = db.get_stocks_by_industry(industry)
+    log = [f"開始多目標分析產業 '{industry}'，找到 {len(stocks)} 隻股票"]
+    
+    processed = 0
+    skipped = 0
+    
+    for stock in stocks:
+        try:
+            if not db.validate_stock_table(stock):
+                log.append(f"⚠️ 跳過 {stock}: 不是有效的股票資料表")
+                skipped += 1
+                continue
+            
+            data = db.read_stock_data(stock)
+            if data.empty or len(data) < 50:
+                log.append(f"⚠️ 跳過 {stock}: 資料不足 ({len(data)} 筆)")
+                skipped += 1
+                continue
+            
+            optimizer = NSGA2Optimizer(data, population_size=60, generations=50, max_time_minutes=3.0)
+            best_result = optimizer.evolve()
+            db.save_best_params(stock, best_result, industry)
+            run_id = db.save_pareto_front(stock, optimizer.pareto_front, industry)
+            
+            processed += 1
+            log.append(f"✅ {stock} 完成 (前緣 {len(optimizer.pareto_front)} 組, RunId: {run_id})")
+            
+        except Exception as e:
+            log.append(f"❌ {stock} 失敗: {str(e)}")
+            skipped += 1
+    
+    log.append(f"\n📊 多目標分析完成！處理: {processed} 個, 跳過: {skipped} 個")
+    return "\n".join(log)
@@ -0,0 +1,171 @@
+"""
+NSGA-II 多目標最佳化
+同時最佳化總利潤（最大化）、最大回撤（最小化）與夏普比率（最大化），
+以向量化的快速非支配排序與擁擠距離維持柏拉圖前緣，
+一次執行即可得到適用於不同風險偏好的整組參數
+"""
+
+import time
+from dataclasses import replace
+from typing import List
+
+import numpy as np
+
+from backtest_engine import PopulationStats
+from ga_optimizer import GeneticAlgorithm, TradingResult, penalty_result
+from vectorized_ga import (PopulationArrays, blend_crossover, concat_stats, evaluate_population_arrays,
+                           mutate_population, population_result, take_stats)
+
+
+def objective_matrix(stats: PopulationStats) -> np.ndarray:
+    """(個體數 × 3) 的目標矩陣，全部轉為越小越好；沒有交易的個體（含無法回測者）排在最後"""
+    objectives = np.column_stack([-stats.total_profit, stats.max_drawdown, -stats.sharpe_ratio])
+    objectives[stats.trades == 0] = np.inf
+    return objectives
+
+
+def dominance_matrix(objectives: np.ndarray) -> np.ndarray:
+    """D[i, j] 為 True 表示個體 i 支配個體 j（所有目標不差且至少一個目標較好）"""
+    left, right = objectives[:, None, :], objectives[None, :, :]
+    return np.all(left <= right, axis=2) & np.any(left < right, axis=2)
+
+
+def non_dominated_sort(objectives: np.ndarray) -> np.ndarray:
+    """快速非支配排序，回傳每個個體的前緣等級（0 為柏拉圖前緣）"""
+    dominates = dominance_matrix(objectives)
+    dominated_count = dominates.sum(axis=0)
+    ranks = np.full(len(objectives), -1, dtype=np.int64)
+    front = np.flatnonzero(dominated_count == 0)
+    rank = 0
+    while front.size:
+        ranks[front] = rank
+        dominated_count = dominated_count - dominates[front].sum(axis=0)
+        dominated_count[ranks >= 0] = -1
+        front = np.flatnonzero(dominated_count == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """每個前緣內的擁擠距離（各目標邊界個體為無限大）"""
+    distance = np.zeros(len(objectives))
+    finite = np.where(np.isfinite(objectives), objectives, 0.0)
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if members.size <= 2:
+            distance[members] = np.inf
+            continue
+        values = finite[members]
+        order = np.argsort(values, axis=0, kind='stable')
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        span = sorted_values[-1] - sorted_values[0]
+        gaps = np.zeros_like(values)
+        gaps[1:-1] = (sorted_values[2:] - sorted_values[:-2]) / np.where(span > 0, span, 1.0)
+        gaps[0] = gaps[-1] = np.inf
+        member_distance = np.zeros(members.size)
+        for objective in range(values.shape[1]):
+            member_distance[order[:, objective]] += gaps[:, objective]
+        distance[members] = member_distance
+    return distance
+
+
+def crowded_tournament(ranks: np.ndarray, distance: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    """二元擁擠錦標賽：等級較低者勝，同等級時擁擠距離較大者勝"""
+    first = rng.integers(0, len(ranks), n)
+    second = rng.integers(0, len(ranks), n)
+    first_wins = (ranks[first] < ranks[second]) | ((ranks[first] == ranks[second]) & (distance[first] >= distance[second]))
+    return np.where(first_wins, first, second)
+
+
+def environmental_selection(objectives: np.ndarray, size: int) -> np.ndarray:
+    """依 (前緣等級, -擁擠距離) 選出下一世代的個體索引"""
+    ranks = non_dominated_sort(objectives)
+    distance = crowding_distance(objectives, ranks)
+    return np.lexsort((-distance, ranks))[:size]
+
+
+class NSGA2Optimizer(GeneticAlgorithm):
+    """NSGA-II 多目標最佳化器（訓練/測試資料分割與參數範圍與 GeneticAlgorithm 相同）"""
+
+    supports_checkpoint = False
+
+    def __init__(self, data, seed: int = None, **kwargs):
+        super().__init__(data, **kwargs)
+        self.rng = np.random.default_rng(seed)
+        self.pareto_front = []
+        self.front_size_history = []
+
+    def evolve_front(self) -> List[TradingResult]:
+        """執行 NSGA-II，回傳訓練資料上的柏拉圖前緣（依總利潤排序，附測試資料結果）"""
+        start_time = time.time()
+        series = self.train_series
+        size = self.population_size
+
+        population = PopulationArrays.random(size, self.rng, self.param_ranges)
+        fitness, stats = evaluate_population_arrays(series, population, self.rng)
+
+        generation = 0
+        while True:
+            objectives = objective_matrix(stats)
+            ranks = non_dominated_sort(objectives)
+            distance = crowding_distance(objectives, ranks)
+            self.front_size_history.append(int((ranks == 0).sum()))
+            self.best_fitness_history.append(float(fitness.max()))
+            self.avg_fitness_history.append(float(fitness.mean()))
+
+            if self.check_time_limit(start_time):
+                self.stop_reason = f"達到時間限制 ({self.max_time_minutes} 分鐘)"
+                break
+            if generation >= self.generations - 1:
+                self.stop_reason = f"達到最大世代數 ({self.generations})"
+                break
+
+            parents = crowded_tournament(ranks, distance, 2 * size, self.rng)
+            children = blend_crossover(population.take(parents[:size]), population.take(parents[size:]),
+                                       self.rng, self.crossover_rate)
+            children = mutate_population(children, self.rng, self.mutation_rate, self.param_ranges)
+            child_fitness, child_stats = evaluate_population_arrays(series, children, self.rng)
+
+            # 親代與子代合併後依非支配等級與擁擠距離選出下一世代
+            population = PopulationArrays.concat([population, children])
+            fitness = np.concatenate([fitness, child_fitness])
+            stats = concat_stats([stats, child_stats])
+            survivors = environmental_selection(objective_matrix(stats), size)
+            population, fitness, stats = population.take(survivors), fitness[survivors], take_stats(stats, survivors)
+
+            if generation % 5 == 0:
+                elapsed_minutes = (time.time() - start_time) / 60
+                print(f"世代 {generation}: 前緣個體 = {self.front_size_history[-1]}, "
+                      f"最佳適應度 = {self.best_fitness_history[-1]:.4f}, 已用時間 = {elapsed_minutes:.1f}分")
+            generation += 1
+
+        # 柏拉圖前緣（相同參數只保留一個，排除無法回測或沒有交易的個體）
+        front, seen = [], set()
+        for i in np.flatnonzero(ranks == 0):
+            result = population_result(population, fitness, stats, i)
+            key = (result.parameters.m_intervals, result.parameters.hold_days,
+                   round(result.parameters.target_profit_ratio, 4), round(result.parameters.alpha, 3))
+            if key in seen or not np.isfinite(objectives[i]).all():
+                continue
+            seen.add(key)
+            if not self.test_data.empty:
+                result = replace(result, test_result=self.evaluate_on_test_data(result.parameters))
+            front.append(result)
+        front.sort(key=lambda result: result.total_profit, reverse=True)
+        self.pareto_front = front
+
+        print(f"\n🎉 NSGA-II 完成! 停止原因: {self.stop_reason}")
+        print(f"⏱️  總用時間: {(time.time() - start_time) / 60:.2f} 分鐘, 執行世代: {generation + 1}")
+        print(f"📐 柏拉圖前緣: {len(front)} 組參數")
+        for result in front[:10]:
+            print(f"   利潤 ${result.total_profit:,.2f}, 回撤 {result.max_drawdown:.1%}, 夏普 {result.sharpe_ratio:.3f} "
+                  f"← m={result.parameters.m_intervals}, h={result.parameters.hold_days}, "
+                  f"t={result.parameters.target_profit_ratio:.3f}, α={result.parameters.alpha:.2f}")
+        return front
+
+    def evolve(self) -> TradingResult:
+        """執行 NSGA-II，回傳前緣中加權適應度最高的結果（完整前緣存於 pareto_front）"""
+        front = self.evolve_front()
+        if not front:
+            return penalty_result(self.create_random_individual(), -10)
+        return max(front, key=lambda result: result.fitness)
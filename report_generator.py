@@ -6,10 +6,13 @@ import os
 plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False  # 解決負號顯示問題
 
-def save_evolution_plot(fitness_history, avg_history, output_path="outputs/evolution.png"):
+def save_evolution_plot(fitness_history, avg_history, output_path="outputs/evolution.png", island_histories=None):
     plt.figure(figsize=(10, 6))
     plt.plot(fitness_history, label="最佳適應度", linewidth=2)
     plt.plot(avg_history, label="平均適應度", linestyle="--")
+    # 島嶼模型：各島嶼的最佳適應度
+    for k, history in enumerate(island_histories or []):
+        plt.plot(history, label=f"島嶼 {k + 1}", linewidth=1, alpha=0.5)
     plt.title("遺傳演算法適應度演化")
     plt.xlabel("世代")
     plt.ylabel("適應度")
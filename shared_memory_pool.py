@@ -0,0 +1,135 @@
+"""
+共享記憶體行程池
+整個 GA 執行期間只建立一次的評估行程池：預處理後的收盤價陣列透過
+multiprocessing.shared_memory 發佈給所有工作行程，每個世代只傳送參數陣列，
+工作行程回傳族群回測統計，不再需要序列化 DataFrame
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest_engine import MovingAverageBank, PopulationStats, PreparedSeries, run_population_backtest
+
+# 工作行程內附加的共享記憶體與預處理序列
+_WORKER_SHM = None
+_WORKER_SERIES = None
+
+
+def _attach_shared_series(shm_name: str, n_bars: int, name: str, window_range):
+    """工作行程初始化：附加共享記憶體中的收盤價並建立移動平均庫"""
+    global _WORKER_SHM, _WORKER_SERIES
+    _WORKER_SHM = shared_memory.SharedMemory(name=shm_name)
+    if os.name == 'posix' and multiprocessing.get_start_method() != 'fork':
+        # 共享記憶體由主行程負責釋放，避免工作行程結束時被 resource_tracker 提前移除；
+        # fork 啟動的工作行程與主行程共用同一個 resource_tracker，取消登記會移除主行程自己的登記
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(_WORKER_SHM._name, 'shared_memory')
+        except Exception:
+            pass
+
+    close = np.ndarray((n_bars,), dtype=np.float64, buffer=_WORKER_SHM.buf)
+    _WORKER_SERIES = PreparedSeries(name=name, close=close, source_rows=n_bars,
+                                    ma_bank=MovingAverageBank(close, window_range))
+
+
+def _evaluate_chunk(m_intervals, hold_days, target_profit_ratios, alphas):
+    """工作行程：批次回測一塊參數，回傳 (回測統計, 運算秒數)"""
+    start = time.perf_counter()
+    stats = run_population_backtest(_WORKER_SERIES.close, m_intervals, hold_days, target_profit_ratios,
+                                    alphas, _WORKER_SERIES.ma_bank)
+    return stats, time.perf_counter() - start
+
+
+class SharedMemoryEvaluationPool:
+    """以共享記憶體發佈收盤價的常駐評估行程池"""
+
+    def __init__(self, series: PreparedSeries, max_workers: int, window_range=(5, 50)):
+        self.series = series
+        self.max_workers = max(1, max_workers)
+
+        # 計時統計
+        self.startup_seconds = 0.0     # 建立共享記憶體與啟動工作行程
+        self.transfer_seconds = 0.0    # 往返傳送參數與結果（總耗時扣除工作行程運算）
+        self.compute_seconds = 0.0     # 工作行程回測運算（各塊中最長者）
+        self.calls = 0
+
+        start = time.perf_counter()
+        self._shm = None
+        self._executor = None
+        try:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(1, series.close.nbytes))
+            np.ndarray(series.close.shape, dtype=np.float64, buffer=self._shm.buf)[:] = series.close
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_attach_shared_series,
+                initargs=(self._shm.name, series.n_bars, series.name, window_range)
+            )
+            # 先讓每個工作行程完成初始化，啟動成本計入 startup_seconds
+            for future in [self._executor.submit(_evaluate_chunk, [5], [5], [0.05], [1.0])
+                           for _ in range(self.max_workers)]:
+                future.result()
+        except BaseException:
+            # 啟動失敗（或被中斷）時關閉已啟動的工作行程並釋放共享記憶體
+            self.close()
+            raise
+        self.startup_seconds = time.perf_counter() - start
+
+    def run_population_backtest(self, m_intervals, hold_days, target_profit_ratios, alphas) -> PopulationStats:
+        """將參數陣列分塊交給工作行程回測，合併回傳族群回測統計"""
+        start = time.perf_counter()
+        arrays = [np.asarray(values) for values in (m_intervals, hold_days, target_profit_ratios, alphas)]
+        n_chunks = min(self.max_workers, len(arrays[0]))
+        bounds = np.linspace(0, len(arrays[0]), n_chunks + 1).astype(int)
+        futures = [
+            self._executor.submit(_evaluate_chunk, *(values[lo:hi] for values in arrays))
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        parts = [future.result() for future in futures]
+
+        elapsed = time.perf_counter() - start
+        compute = max(seconds for _, seconds in parts)
+        self.compute_seconds += compute
+        self.transfer_seconds += max(0.0, elapsed - compute)
+        self.calls += 1
+
+        return PopulationStats(*(
+            np.concatenate([getattr(stats, name) for stats, _ in parts])
+            for name in (field.name for field in fields(PopulationStats))
+        ))
+
+    def timing_stats(self) -> dict:
+        """計時統計"""
+        return {
+            'pool_startup_seconds': self.startup_seconds,
+            'transfer_seconds': self.transfer_seconds,
+            'worker_compute_seconds': self.compute_seconds,
+            'pool_calls': self.calls
+        }
+
+    def summary(self) -> str:
+        """計時統計摘要"""
+        return (f"啟動 {self.startup_seconds:.2f}秒, 傳輸 {self.transfer_seconds:.2f}秒, "
+                f"運算 {self.compute_seconds:.2f}秒, 呼叫 {self.calls} 次, 工作行程 {self.max_workers}")
+
+    def close(self):
+        """關閉行程池並釋放共享記憶體"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
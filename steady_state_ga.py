@@ -0,0 +1,129 @@
+"""
+非同步穩態遺傳演算法
+世代式演化每一代都要等最慢的評估完成（例如 alpha 很小、幾乎每天交易的個體），
+其他工作執行緒只能閒置；穩態模式在任何一個工作執行緒空出時立刻繁殖並送出一個子代，
+評估完成後以取代最差個體的方式插入族群。停止條件以評估次數與執行時間表示
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import replace
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from fast_ga_optimizer import FastGeneticAlgorithm
+from fitness_cache import quantize_parameters
+from ga_optimizer import TradingParameters, TradingResult, evaluate_parameters
+
+
+class SteadyStateGeneticAlgorithm(FastGeneticAlgorithm):
+    """非同步穩態遺傳演算法（max_evaluations 未指定時為 population_size × generations）"""
+
+    supports_checkpoint = False
+
+    def __init__(self, data: pd.DataFrame, max_evaluations: int = None, **kwargs):
+        super().__init__(data, **kwargs)
+        self.max_evaluations = max_evaluations or self.population_size * self.generations
+        self.population: List[TradingResult] = []
+
+    def breed_child(self) -> TradingParameters:
+        """由目前族群繁殖一個子代（族群尚未建立時隨機產生）"""
+        if len(self.population) < 2:
+            return self.create_random_individual()
+        parent1 = self.tournament_selection(self.population)
+        parent2 = self.tournament_selection(self.population)
+        return self.mutate(self.crossover(parent1, parent2))
+
+    def insert(self, result: TradingResult) -> bool:
+        """將評估結果插入族群：族群未滿時直接加入，否則在優於最差個體時取代之（相同基因不重複加入）"""
+        key = quantize_parameters(result.parameters)
+        if any(quantize_parameters(member.parameters) == key for member in self.population):
+            return False
+        if len(self.population) < self.population_size:
+            self.population.append(result)
+            return True
+        worst = min(range(len(self.population)), key=lambda i: self.population[i].fitness)
+        if result.fitness <= self.population[worst].fitness:
+            return False
+        self.population[worst] = result
+        return True
+
+    def record_progress(self, evaluations: int):
+        """以每 population_size 次評估為一個「世代」記錄適應度歷史"""
+        fitness_values = [member.fitness for member in self.population]
+        self.best_fitness_history.append(max(fitness_values))
+        self.avg_fitness_history.append(float(np.mean(fitness_values)))
+        self.evaluation_history.append(evaluations)
+
+    def evolve(self) -> TradingResult:
+        """非同步穩態演化：同時最多 max_workers 個評估進行中，任一個完成就補送下一個"""
+        in_flight = max(1, self.max_workers if self.use_parallel else 1)
+        print(f"🚀 啟動非同步穩態遺傳演算法")
+        print(f"📊 參數: 族群={self.population_size}, 評估上限={self.max_evaluations}, "
+              f"時間上限={self.max_time_minutes} 分鐘, 同時評估={in_flight}")
+
+        start_time = time.time()
+        series = self.train_series
+        executor = self.get_thread_pool()
+        queued = self.initial_population()
+        self.population = []
+        pending = {}
+        submitted = evaluations = 0
+        best_result = None
+
+        def submit_next():
+            nonlocal submitted
+            individual = queued.pop() if queued else self.breed_child()
+            pending[executor.submit(evaluate_parameters, series, individual, self.fitness_cache)] = individual
+            submitted += 1
+
+        try:
+            while submitted < min(in_flight, self.max_evaluations):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    evaluations += 1
+                    self.insert(result)
+                    if best_result is None or result.fitness > best_result.fitness:
+                        best_result = result
+                    if evaluations % self.population_size == 0:
+                        self.record_progress(evaluations)
+
+                if self.check_time_limit(start_time):
+                    self.stop_reason = f"超過時間限制 ({self.max_time_minutes} 分鐘)"
+                    break
+                while len(pending) < in_flight and submitted < self.max_evaluations:
+                    submit_next()
+                if not pending:
+                    self.stop_reason = f"達到評估次數上限 ({self.max_evaluations})"
+        finally:
+            for future in pending:
+                future.cancel()
+            self.shutdown_pools()
+
+        elapsed = time.time() - start_time
+        if best_result is None:
+            print("❌ 優化失敗")
+            return TradingResult(parameters=TradingParameters(5, 3, 0.03, 0.02), fitness=-1, total_profit=0,
+                                 win_rate=0, max_drawdown=0.1, sharpe_ratio=0.0)
+        if not self.evaluation_history or self.evaluation_history[-1] != evaluations:
+            self.record_progress(evaluations)
+
+        self.timing_stats['evaluations_per_second'] = evaluations / max(elapsed, 1e-9)
+        test_result = self.evaluate_on_test_data(best_result.parameters)
+
+        print(f"✅ 優化完成！總耗時: {elapsed / 60:.2f} 分鐘")
+        print(f"🎯 停止原因: {self.stop_reason}")
+        print(f"⚡ 評估次數: {evaluations}, 吞吐量: {self.timing_stats['evaluations_per_second']:.1f} 次/秒")
+        print(f"🗂️ 適應度快取: {self.fitness_cache.summary()}")
+        print(f"📈 訓練數據最佳適應度: {best_result.fitness:.4f}")
+        if not self.test_data.empty:
+            print(f"🧪 測試數據適應度: {test_result.fitness:.4f}")
+
+        return replace(best_result, test_result=test_result if not self.test_data.empty else None)
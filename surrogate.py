@@ -0,0 +1,94 @@
+"""
+代理模型預篩選
+以本次執行中所有已評估的 (參數, 適應度) 建立 k 近鄰代理模型，
+先預測子代的適應度，只把最有希望的一部分送去完整回測；
+每個世代記錄節省的評估次數與代理預測的等級相關係數
+"""
+
+import numpy as np
+
+from ga_optimizer import GENE_NAMES, normalize_gene_matrix
+from vectorized_ga import PopulationArrays
+
+
+def normalize_genes(population: PopulationArrays, param_ranges: dict) -> np.ndarray:
+    """(個體數 × 4) 的正規化基因矩陣，每個基因縮放到約 [0, 1]"""
+    return normalize_gene_matrix(population.as_matrix(), param_ranges)
+
+
+def rank_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman 等級相關係數（樣本不足或其中一組沒有變異時回傳 nan）"""
+    if len(a) < 3:
+        return float('nan')
+    rank_a = np.argsort(np.argsort(a)).astype(np.float64)
+    rank_b = np.argsort(np.argsort(b)).astype(np.float64)
+    if np.ptp(a) == 0 or np.ptp(b) == 0:
+        return float('nan')
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+class FitnessSurrogate:
+    """k 近鄰代理模型：以距離倒數加權最近 k 個已評估個體的適應度作為預測
+
+    archive_size 限制保存的評估數（超過時保留最新的），使每次預測的成本固定；
+    已評估個體少於 min_samples 時不篩選，所有子代都進行完整回測
+    """
+
+    def __init__(self, param_ranges: dict, screen_fraction: float = 0.5, neighbors: int = 5,
+                 min_samples: int = 50, archive_size: int = 5000):
+        if not 0 < screen_fraction <= 1:
+            raise ValueError(f"screen_fraction 必須介於 0 與 1 之間: {screen_fraction}")
+        self.param_ranges = param_ranges
+        self.screen_fraction = screen_fraction
+        self.neighbors = neighbors
+        self.min_samples = min_samples
+        self.archive_size = archive_size
+        self.genes = np.empty((0, len(GENE_NAMES)))
+        self.fitness = np.empty(0)
+
+        # 每個世代的篩選紀錄
+        self.saved_history = []
+        self.correlation_history = []
+
+    @property
+    def size(self) -> int:
+        return len(self.fitness)
+
+    @property
+    def total_saved(self) -> int:
+        return int(sum(self.saved_history))
+
+    def add(self, population: PopulationArrays, fitness: np.ndarray, evaluated: np.ndarray = None):
+        """加入已完整評估的個體
+
+        evaluated 標記實際完成回測的個體（見 vectorized_ga.backtested_mask），資料不足或無法評估的
+        懲罰值不加入；回撤懲罰造成的低適應度是真實評估結果，仍會加入。None 表示全部都已回測
+        """
+        valid = np.ones(len(fitness), dtype=bool) if evaluated is None else np.asarray(evaluated, dtype=bool)
+        self.genes = np.vstack([self.genes, normalize_genes(population, self.param_ranges)[valid]])[-self.archive_size:]
+        self.fitness = np.concatenate([self.fitness, fitness[valid]])[-self.archive_size:]
+
+    def predict(self, population: PopulationArrays) -> np.ndarray:
+        """預測族群的適應度"""
+        query = normalize_genes(population, self.param_ranges)
+        k = min(self.neighbors, self.size)
+        distances = np.sqrt(((query[:, None, :] - self.genes[None, :, :]) ** 2).sum(axis=2))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        weights = 1.0 / (nearest_distances + 1e-9)
+        return (weights * self.fitness[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+    def screen(self, population: PopulationArrays):
+        """挑選要完整回測的子代，回傳 (索引, 預測適應度)；資料不足時全部回測、預測為 None"""
+        n = len(population)
+        if self.size < self.min_samples or self.screen_fraction >= 1:
+            return np.arange(n), None
+        predicted = self.predict(population)
+        count = max(1, int(np.ceil(n * self.screen_fraction)))
+        return np.argsort(predicted)[::-1][:count], predicted
+
+    def record(self, n_candidates: int, predicted: np.ndarray, actual: np.ndarray):
+        """記錄一個世代的篩選結果：節省的評估次數與被回測子代的預測/實際等級相關"""
+        self.saved_history.append(n_candidates - len(actual))
+        self.correlation_history.append(rank_correlation(predicted, actual) if predicted is not None
+                                        else float('nan'))
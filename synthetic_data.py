@@ -0,0 +1,34 @@
+"""
+合成資料
+測試、基準測試與最佳化器比較共用的合成日線資料，
+以及 GeneticAlgorithm 實際使用的參數範圍
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from ga_optimizer import GeneticAlgorithm
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def make_synthetic_data(days: int = 1500, seed: int = 42) -> pd.DataFrame:
+    """產生 2019 年起的合成日線資料（幾何隨機漫步）"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.bdate_range('2019-01-02', periods=days),
+        'Close': 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, days)))
+    })
+
+
+def ga_param_ranges() -> dict:
+    """GeneticAlgorithm 實際使用的參數範圍（由建立的實例取得，參數範圍調整時自動跟著改變）"""
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(days=300), population_size=2, generations=1)
+    return dict(ga.param_ranges)
+
+
+PARAM_RANGES = ga_param_ranges()
@@ -0,0 +1,97 @@
+"""
+差分演化與 CMA-ES 最佳化器測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from compare_optimizers import fitness_call_history
+from continuous_optimizers import CMAESOptimizer, DifferentialEvolutionOptimizer
+from fast_ga_optimizer import FastGeneticAlgorithm, create_speed_preset, fast_optimize, get_optimizer_class
+from ga_optimizer import TradingParameters
+from synthetic_data import make_synthetic_data
+
+
+def test_optimizers_return_ga_compatible_results():
+    """差分演化與 CMA-ES 回傳在參數範圍內的 TradingResult，最佳適應度歷史單調不減"""
+    data = make_synthetic_data()
+    for optimizer_class in (DifferentialEvolutionOptimizer, CMAESOptimizer):
+        with redirect_stdout(io.StringIO()):
+            optimizer = optimizer_class(data, seed=4, population_size=16, generations=12)
+            result = optimizer.evolve()
+
+        params = result.parameters
+        assert isinstance(params.m_intervals, int) and 5 <= params.m_intervals <= 50
+        assert isinstance(params.hold_days, int) and 1 <= params.hold_days <= 30
+        assert 0.02 <= params.target_profit_ratio <= 1.0
+        assert 0.5 <= params.alpha <= 99.0
+        assert np.all(np.diff(optimizer.best_fitness_history) >= 0)
+        assert result.fitness == optimizer.best_fitness_history[-1]
+        assert optimizer.evaluation_history[-1] == 16 * len(optimizer.best_fitness_history)
+
+
+def test_select_optimizer_by_name():
+    """速度預設與 fast_optimize 可依名稱選用最佳化器"""
+    assert 'optimizer' not in create_speed_preset('fast')
+    assert get_optimizer_class('cmaes') is CMAESOptimizer
+
+    with redirect_stdout(io.StringIO()):
+        result = fast_optimize(make_synthetic_data(), 'ultra_fast', optimizer='de')
+    assert result.fitness > -10
+
+    try:
+        get_optimizer_class('pso')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知的最佳化器名稱應該拋出 ValueError")
+
+
+def test_comparison_counts_every_fitness_call():
+    """比較評估次數時遺傳演算法也計入沿用適應度的個體，與差分演化相同地每個候選解都算一次"""
+    data = make_synthetic_data()
+    with redirect_stdout(io.StringIO()):
+        ga = FastGeneticAlgorithm(data, population_size=16, generations=6, use_parallel=False,
+                                  early_stop_patience=100, convergence_generations=100)
+        ga.evolve()
+        de = DifferentialEvolutionOptimizer(data, seed=4, population_size=16, generations=6)
+        de.evolve()
+
+    assert ga.evaluation_history[-1] < 16 * len(ga.best_fitness_history)
+    assert fitness_call_history(ga).tolist() == [16 * (i + 1) for i in range(len(ga.best_fitness_history))]
+    assert fitness_call_history(de).tolist() == de.evaluation_history
+
+
+def test_warm_start_seeds_initial_search():
+    """種子參數編碼為正規化向量：差分演化的初始族群包含種子，CMA-ES 以種子重心為初始平均"""
+    data = make_synthetic_data()
+    seeds = [TradingParameters(20, 10, 0.1, 5.0), TradingParameters(30, 5, 0.3, 10.0)]
+    with redirect_stdout(io.StringIO()):
+        de = DifferentialEvolutionOptimizer(data, seed=1, population_size=10, generations=3,
+                                            seed_parameters=seeds, seed_fraction=0.5)
+        cmaes = CMAESOptimizer(data, seed=1, population_size=10, generations=3, seed_parameters=seeds)
+
+    de.initialize()
+    initial = de.decode(de.ask())
+    assert [initial.parameters(i) for i in range(2)] == seeds
+
+    cmaes.initialize()
+    assert np.allclose(cmaes.mean, cmaes.encode(seeds).mean(axis=0))
+    assert cmaes.decode(cmaes.encode(seeds)).parameters(1) == seeds[1]
+
+    try:
+        de.evolve(resume_from='checkpoint.pkl')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("不支援的 resume_from 應該拋出 ValueError")
+
+
+if __name__ == "__main__":
+    test_optimizers_return_ga_compatible_results()
+    test_select_optimizer_by_name()
+    test_comparison_counts_every_fitness_call()
+    test_warm_start_seeds_initial_search()
+    print("✅ 差分演化與 CMA-ES 測試通過")
@@ -0,0 +1,51 @@
+"""
+基因型多樣性測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from fast_ga_optimizer import FastGeneticAlgorithm
+from ga_optimizer import genotypic_diversity, normalize_gene_matrix
+from synthetic_data import PARAM_RANGES, make_synthetic_data
+from vectorized_ga import PopulationArrays, VectorizedGeneticAlgorithm
+
+
+def test_diversity_matches_pairwise_distance():
+    """多樣性等於正規化基因兩兩距離的均方根（除以均勻分佈的期望值），塌縮族群為 0"""
+    rng = np.random.default_rng(0)
+    genes = PopulationArrays.random(300, rng, PARAM_RANGES).as_matrix()
+    normalized = normalize_gene_matrix(genes, PARAM_RANGES)
+    squared = ((normalized[:, None, :] - normalized[None, :, :]) ** 2).sum(axis=2)
+    pairwise = np.sqrt(squared[~np.eye(len(genes), dtype=bool)].mean() / (2 * 4 / 12))
+
+    assert np.isclose(genotypic_diversity(genes, PARAM_RANGES), pairwise)
+    assert 0.8 < genotypic_diversity(genes, PARAM_RANGES) < 1.2
+    assert genotypic_diversity(np.repeat(genes[:1], 50, axis=0), PARAM_RANGES) < 1e-9
+
+
+def test_diversity_drives_termination_and_mutation_boost():
+    """多樣性記錄在 diversity_history，低於門檻時停止演化並提高突變率"""
+    data = make_synthetic_data()
+    with redirect_stdout(io.StringIO()):
+        ga = VectorizedGeneticAlgorithm(data, seed=3, population_size=40, generations=200, mutation_rate=0.05,
+                                        convergence_threshold=0, diversity_threshold=0.2)
+        ga.evolve()
+    assert len(ga.diversity_history) == len(ga.avg_fitness_history)
+    assert ga.stop_reason.startswith("族群基因已塌縮")
+    assert ga.diversity_history[-1] < 0.2 <= ga.diversity_history[0]
+
+    with redirect_stdout(io.StringIO()):
+        fast = FastGeneticAlgorithm(data, use_parallel=False, diversity_boost_threshold=0.5, diversity_boost_factor=3)
+    fast.diversity_history = [0.9]
+    assert fast.diversity_mutation_rate(0.1) == 0.1
+    fast.diversity_history = [0.1]
+    assert np.isclose(fast.diversity_mutation_rate(0.1), 0.3)
+
+
+if __name__ == "__main__":
+    test_diversity_matches_pairwise_distance()
+    test_diversity_drives_termination_and_mutation_boost()
+    print("✅ 基因型多樣性測試通過")
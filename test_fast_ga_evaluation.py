@@ -0,0 +1,119 @@
+"""
+加速版遺傳演算法評估流程測試
+"""
+
+import io
+from contextlib import redirect_stdout
+from dataclasses import FrozenInstanceError
+
+from fast_ga_optimizer import FastGeneticAlgorithm
+from fitness_cache import quantize_parameters
+from ga_optimizer import TradingParameters
+from synthetic_data import make_synthetic_data
+
+
+def make_fast_ga(**kwargs):
+    with redirect_stdout(io.StringIO()):
+        return FastGeneticAlgorithm(make_synthetic_data(), use_parallel=False, **kwargs)
+
+
+def test_generation_reuses_known_and_duplicate_genomes():
+    """已知基因沿用適應度，重複基因只評估一次"""
+    ga = make_fast_ga(population_size=6, generations=1)
+    elite = TradingParameters(20, 5, 0.05, 1.0)
+    fresh = TradingParameters(30, 10, 0.1, 2.0)
+    known = {quantize_parameters(elite): 123.0}
+
+    fitness, generation_fitness, evaluated = ga.evaluate_generation(
+        [elite, fresh, TradingParameters(30, 10, 0.1, 2.0), elite], known
+    )
+    assert evaluated == 1
+    assert fitness[0] == fitness[3] == 123.0
+    assert fitness[1] == fitness[2]
+    assert set(generation_fitness) == {quantize_parameters(elite), quantize_parameters(fresh)}
+
+
+def test_evolve_reports_saved_evaluations():
+    """精英不再重新評估，每世代記錄省下的評估次數"""
+    ga = make_fast_ga(population_size=20, generations=6, early_stop_patience=100, convergence_generations=100)
+    with redirect_stdout(io.StringIO()):
+        ga.evolve()
+
+    saved = ga.evaluations_saved_history
+    assert len(saved) == len(ga.best_fitness_history)
+    elite_count = max(1, int(20 * ga.elite_ratio))
+    assert all(count >= elite_count for count in saved[1:])
+
+
+def test_restart_on_stagnation_runs_until_time_limit():
+    """開啟重新開始時停滯不會結束演化：族群逐次放大，名人堂保留最佳個體，直到時間用完"""
+    ga = make_fast_ga(population_size=8, generations=10, max_time_minutes=0.01, early_stop_patience=2,
+                      restart_on_stagnation=True, max_population_size=32, hall_of_fame_size=3)
+    with redirect_stdout(io.StringIO()):
+        ga.evolve()
+
+    assert ga.stop_reason.startswith("超過時間限制")
+    sizes = [size for _, size, _ in ga.restart_history]
+    assert sizes[:2] == [16, 32] and max(sizes) == 32
+    assert ga.population_size == 8
+    assert len(ga.hall_of_fame) == 3
+    assert ga.hall_of_fame[0][0] == max(ga.best_fitness_history)
+
+
+def test_early_stop_counter_updates_when_other_stagnation_fires():
+    """其他停滯條件先成立的世代仍會更新早期停止的最佳值與無改善計數"""
+    class RecordingGA(FastGeneticAlgorithm):
+        def check_early_stop(self, current_best_fitness):
+            self.early_stop_calls.append(current_best_fitness)
+            return super().check_early_stop(current_best_fitness)
+
+    with redirect_stdout(io.StringIO()):
+        # 多樣性門檻高於任何族群，每個世代都先以基因塌縮停滯並重新開始
+        ga = RecordingGA(make_synthetic_data(), use_parallel=False, population_size=8, generations=10,
+                         max_time_minutes=0.005, early_stop_patience=100, restart_on_stagnation=True,
+                         diversity_threshold=10.0)
+        ga.early_stop_calls = []
+        ga.evolve()
+
+    assert ga.restart_history
+    # 最後一個世代在時間限制檢查時結束，不會進入停滯判斷
+    assert ga.early_stop_calls == ga.best_fitness_history[:-1]
+
+
+def test_restart_population_reinjects_hall_of_fame():
+    """重新開始的新族群包含名人堂的個體，其餘位置隨機補足"""
+    ga = make_fast_ga(population_size=8, generations=1, restart_on_stagnation=True, hall_of_fame_size=3)
+    population = [TradingParameters(10 + i, 5, 0.05, 1.0) for i in range(8)]
+    ga.update_hall_of_fame(population, [float(i) for i in range(8)])
+
+    restarted = ga.restart_population(8)
+    assert len(restarted) == 16
+    assert restarted[:3] == [population[7], population[6], population[5]]
+
+
+def test_parameters_are_immutable_and_hashable():
+    """交易參數不可變、可雜湊；突變回傳新物件，不影響被共用的親代"""
+    ga = make_fast_ga(population_size=6, generations=1)
+    parent = TradingParameters(20, 5, 0.05, 1.0)
+    assert {parent: 1}[TradingParameters(20, 5, 0.05, 1.0)] == 1
+    assert TradingParameters.from_sequence(parent.as_array()) == parent
+
+    children = [ga.mutate(parent, mutation_rate=1.0) for _ in range(50)]
+    assert parent.as_tuple() == (20, 5, 0.05, 1.0)
+    assert any(child != parent for child in children)
+    try:
+        parent.alpha = 2.0
+    except FrozenInstanceError:
+        pass
+    else:
+        raise AssertionError("TradingParameters 應該不可變")
+
+
+if __name__ == "__main__":
+    test_generation_reuses_known_and_duplicate_genomes()
+    test_evolve_reports_saved_evaluations()
+    test_restart_on_stagnation_runs_until_time_limit()
+    test_early_stop_counter_updates_when_other_stagnation_fires()
+    test_restart_population_reinjects_hall_of_fame()
+    test_parameters_are_immutable_and_hashable()
+    print("✅ 加速版遺傳演算法評估流程測試通過")
@@ -0,0 +1,53 @@
+"""
+適應度快取測試
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+from fitness_cache import FitnessCache
+from ga_optimizer import GeneticAlgorithm, TradingParameters
+from synthetic_data import make_synthetic_data
+
+
+def test_lru_eviction_and_counters():
+    """超過容量時淘汰最久未使用的項目，並正確統計命中/未命中"""
+    cache = FitnessCache(max_size=2)
+    a = TradingParameters(10, 5, 0.05, 1.0)
+    b = TradingParameters(20, 5, 0.05, 1.0)
+    c = TradingParameters(30, 5, 0.05, 1.0)
+
+    cache.put('train', a, 'A')
+    cache.put('train', b, 'B')
+    assert cache.get('train', a) == 'A'      # a 成為最近使用
+    cache.put('train', c, 'C')               # 淘汰 b
+    assert cache.get('train', b) is None
+    assert cache.get('test', a) is None      # 不同資料集不共用
+    assert cache.get('train', TradingParameters(10, 5, 0.050001, 1.0001)) == 'A'  # 量化後相同
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cached_results_keep_noise():
+    """命中快取時仍重新加入隨機擾動，基礎適應度不變"""
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(), population_size=5, generations=1)
+
+    params = TradingParameters(20, 5, 0.05, 1.0)
+    first = ga.evaluate_fitness(params)
+    second = ga.evaluate_fitness(params)
+    assert ga.fitness_cache.hits == 1 and ga.fitness_cache.misses == 1
+    assert first.fitness != second.fitness
+    assert abs(first.fitness - second.fitness) <= 0.2
+    assert first.total_profit == second.total_profit
+
+    random.seed(3)
+    population = [ga.create_random_individual() for _ in range(20)]
+    ga.evaluate_population(population + population)
+    assert ga.fitness_cache.misses == 1 + 20
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_counters()
+    test_cached_results_keep_noise()
+    print("✅ 適應度快取測試通過")
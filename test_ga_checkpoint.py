@@ -0,0 +1,118 @@
+"""
+遺傳演算法檢查點測試
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+
+from fast_ga_optimizer import FastGeneticAlgorithm
+from ga_checkpoint import load_checkpoint
+from ga_optimizer import GeneticAlgorithm
+from island_ga import IslandGeneticAlgorithm
+from synthetic_data import make_synthetic_data
+from vectorized_ga import VectorizedGeneticAlgorithm
+
+
+def test_resume_continues_exactly():
+    """從檢查點繼續的演化與未中斷的演化得到相同的適應度歷史與結果"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'ga.ckpt')
+        settings = dict(population_size=12, generations=7, convergence_generations=100)
+        data = make_synthetic_data()
+
+        with redirect_stdout(io.StringIO()):
+            full_run = GeneticAlgorithm(data, checkpoint_path=path, checkpoint_interval=3, **settings)
+            full_result = full_run.evolve()
+
+        state = load_checkpoint(path)
+        assert state['generation'] == 6
+        assert len(state['best_fitness_history']) == 6
+        assert [name for name in os.listdir(directory)] == ['ga.ckpt']  # 沒有殘留暫存檔
+
+        with redirect_stdout(io.StringIO()):
+            resumed = GeneticAlgorithm(data, **settings)
+            resumed_result = resumed.evolve(resume_from=path)
+
+        assert resumed.best_fitness_history == full_run.best_fitness_history
+        assert resumed.avg_fitness_history == full_run.avg_fitness_history
+        assert resumed_result.parameters == full_result.parameters
+        assert resumed_result.fitness == full_result.fitness
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_fast_ga_resume_continues_exactly():
+    """加速版演化從檢查點繼續時，歷史、評估次數與結果都與未中斷的演化相同"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'fast.ckpt')
+        settings = dict(population_size=12, generations=7, convergence_generations=100, early_stop_patience=100,
+                        use_parallel=False)
+        data = make_synthetic_data()
+
+        with redirect_stdout(io.StringIO()):
+            full_run = FastGeneticAlgorithm(data, checkpoint_path=path, checkpoint_interval=3, **settings)
+            full_result = full_run.evolve()
+
+        assert load_checkpoint(path)['generation'] == 6
+
+        with redirect_stdout(io.StringIO()):
+            resumed = FastGeneticAlgorithm(data, **settings)
+            resumed_result = resumed.evolve(resume_from=path)
+
+        assert resumed.best_fitness_history == full_run.best_fitness_history
+        assert resumed.avg_fitness_history == full_run.avg_fitness_history
+        assert resumed.evaluation_history == full_run.evaluation_history
+        assert resumed_result.parameters == full_result.parameters
+        assert resumed_result.fitness == full_result.fitness
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_island_resume_continues_exactly():
+    """島嶼模型從檢查點繼續時，各島嶼歷史與結果都與未中斷的演化相同"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'island.ckpt')
+        settings = dict(n_islands=2, migration_interval=2, max_workers=1, seed=3, population_size=10,
+                        generations=8, convergence_generations=100)
+        data = make_synthetic_data()
+
+        with redirect_stdout(io.StringIO()):
+            full_run = IslandGeneticAlgorithm(data, checkpoint_path=path, checkpoint_interval=3, **settings)
+            full_result = full_run.evolve()
+
+        assert load_checkpoint(path)['generation'] == 6
+
+        with redirect_stdout(io.StringIO()):
+            resumed = IslandGeneticAlgorithm(data, **settings)
+            resumed_result = resumed.evolve(resume_from=path)
+
+        assert resumed.best_fitness_history == full_run.best_fitness_history
+        assert resumed.island_best_histories == full_run.island_best_histories
+        assert resumed_result.parameters == full_result.parameters
+        assert resumed_result.fitness == full_result.fitness
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_unsupported_optimizer_rejects_checkpoint():
+    """不支援檢查點的最佳化器指定 checkpoint_path 時拋出 ValueError，而不是默默忽略"""
+    try:
+        VectorizedGeneticAlgorithm(make_synthetic_data(), checkpoint_path='unused.ckpt')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("VectorizedGeneticAlgorithm 應該拒絕 checkpoint_path")
+
+
+if __name__ == "__main__":
+    test_resume_continues_exactly()
+    test_fast_ga_resume_continues_exactly()
+    test_island_resume_continues_exactly()
+    test_unsupported_optimizer_rejects_checkpoint()
+    print("✅ 檢查點測試通過")
@@ -0,0 +1,59 @@
+"""
+網格搜尋測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import backtest_engine
+from backtest_engine import prepare_series
+from grid_search import GridSearchOptimizer, ParameterGrid, evaluate_deterministic, grid_search
+from synthetic_data import make_synthetic_data
+
+SMALL_GRID = ParameterGrid(
+    m_intervals=[5, 12, 30, 50],
+    hold_days=[1, 3, 10, 30],
+    target_profit_ratio=[0.02, 0.1, 0.6],
+    alpha=[0.5, 2.0, 8.0, 60.0]
+)
+
+
+def test_grid_matches_single_evaluation():
+    """網格中每個點的適應度與逐一評估相同（NumPy 與 numba 核心皆同）"""
+    series = prepare_series(make_synthetic_data(), 'train')
+    for use_numba in {backtest_engine.USE_NUMBA, False}:
+        previous = backtest_engine.USE_NUMBA
+        backtest_engine.USE_NUMBA = use_numba
+        try:
+            result = grid_search(series, SMALL_GRID)
+        finally:
+            backtest_engine.USE_NUMBA = previous
+
+        for index in np.ndindex(SMALL_GRID.shape):
+            expected = evaluate_deterministic(series, SMALL_GRID.parameters(index))
+            actual = result.result_at(index)
+            assert np.isclose(actual.fitness, expected.fitness, rtol=1e-9, atol=1e-12)
+            assert np.isclose(actual.total_profit, expected.total_profit, rtol=1e-9, atol=1e-9)
+            assert np.isclose(actual.max_drawdown, expected.max_drawdown, rtol=1e-9, atol=1e-12)
+
+        best = result.best_result()
+        assert best.fitness == result.fitness.max()
+        assert result.landscape().shape == (4, 4)
+        assert [r.fitness for r in result.top_results(3)] == sorted(result.fitness.ravel())[::-1][:3]
+
+
+def test_optimizer_is_deterministic():
+    """同樣的資料與網格得到完全相同的最佳參數"""
+    with redirect_stdout(io.StringIO()):
+        first = GridSearchOptimizer(make_synthetic_data(), SMALL_GRID).optimize()
+        second = GridSearchOptimizer(make_synthetic_data(), SMALL_GRID).optimize()
+    assert first.parameters == second.parameters
+    assert first.fitness == second.fitness
+
+
+if __name__ == "__main__":
+    test_grid_matches_single_evaluation()
+    test_optimizer_is_deterministic()
+    print("✅ 網格搜尋測試通過")
@@ -0,0 +1,86 @@
+"""
+島嶼模型遺傳演算法測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from backtest_engine import PopulationStats
+from island_ga import IslandGeneticAlgorithm, IslandState, migrate, migration_sources
+from synthetic_data import make_synthetic_data
+from vectorized_ga import PopulationArrays
+
+
+def make_island(island_id: int, fitness):
+    """建立測試用島嶼：第 i 個個體的 m_intervals 為 island_id * 100 + i"""
+    n = len(fitness)
+    return IslandState(
+        island_id=island_id,
+        rng_state={},
+        population=PopulationArrays(
+            m_intervals=island_id * 100 + np.arange(n), hold_days=np.ones(n, dtype=np.int64),
+            target_profit_ratio=np.full(n, 0.05), alpha=np.ones(n)
+        ),
+        fitness=np.asarray(fitness, dtype=np.float64),
+        stats=PopulationStats(np.zeros(n), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64),
+                              np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int64))
+    )
+
+
+def test_migration_topologies():
+    """環狀拓撲只接收前一個島嶼的移民，移民取代最差個體"""
+    assert migration_sources(0, 3, 'ring') == [2]
+    assert migration_sources(1, 3, 'all') == [0, 2]
+
+    states = [make_island(k, [1.0, 5.0, 3.0, 0.0]) for k in range(3)]
+    migrate(states, 1, 'ring')
+    for k, state in enumerate(states):
+        source = (k - 1) % 3
+        assert source * 100 + 1 in state.population.m_intervals   # 來源島嶼最佳個體
+        assert k * 100 + 3 not in state.population.m_intervals     # 最差個體被取代
+        assert len(state.population) == 4 and len(state.fitness) == 4
+
+    states = [make_island(k, [1.0, 5.0, 3.0, 0.0]) for k in range(3)]
+    migrate(states, 1, 'all')
+    assert sorted(states[0].population.m_intervals.tolist()) == [1, 2, 101, 201]
+
+
+def test_islands_evolve_in_processes():
+    """多個工作行程演化島嶼，回傳跨島嶼最佳結果與各島嶼歷史"""
+    with redirect_stdout(io.StringIO()):
+        ga = IslandGeneticAlgorithm(make_synthetic_data(), n_islands=3, migration_interval=2, max_workers=2,
+                                    seed=11, population_size=20, generations=6)
+        result = ga.evolve()
+
+    assert len(ga.island_best_histories) == 3
+    assert all(len(history) == 6 for history in ga.island_best_histories)
+    assert len(ga.best_fitness_history) == 6
+    assert len(ga.diversity_history) == 6 and all(len(history) == 6 for history in ga.island_diversity_histories)
+    assert np.isclose(result.fitness, max(history[-1] for history in ga.island_best_histories))
+
+
+def test_island_diversity_boost_and_collapse():
+    """島嶼多樣性偏低時提高突變率；整體多樣性低於 diversity_threshold 時停止演化"""
+    state = make_island(0, [1.0, 2.0, 3.0])
+    settings = {'mutation_rate': 0.1, 'diversity_boost_threshold': 0.5, 'diversity_boost_factor': 3.0}
+    state.diversity_history = [0.8]
+    assert state.mutation_rate(settings) == 0.1
+    state.diversity_history.append(0.2)
+    assert np.isclose(state.mutation_rate(settings), 0.3)
+
+    with redirect_stdout(io.StringIO()):
+        ga = IslandGeneticAlgorithm(make_synthetic_data(), n_islands=2, max_workers=1, seed=3,
+                                    population_size=12, generations=10, diversity_threshold=5.0)
+        ga.evolve()
+
+    assert len(ga.diversity_history) == 1
+    assert "塌縮" in ga.stop_reason
+
+
+if __name__ == "__main__":
+    test_migration_topologies()
+    test_islands_evolve_in_processes()
+    test_island_diversity_boost_and_collapse()
+    print("✅ 島嶼模型遺傳演算法測試通過")
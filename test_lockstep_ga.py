@@ -0,0 +1,57 @@
+"""
+多檔股票同步演化測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from backtest_engine import build_price_panel, compute_population_fitness, prepare_series
+from lockstep_ga import LockstepMultiStockOptimizer, build_panel_ma_bank, evaluate_panel_population
+from synthetic_data import PARAM_RANGES, make_synthetic_data
+from vectorized_ga import PopulationArrays, evaluate_population_arrays
+
+
+def test_panel_evaluation_matches_single_series():
+    """面板上的族群評估（扣除隨機擾動）與逐檔股票評估相同，長度不同的股票也一致"""
+    series = [prepare_series(make_synthetic_data(days, seed), f"s{seed}") for seed, days in enumerate((900, 600, 1200))]
+    panel = build_price_panel(series)
+    bank = build_panel_ma_bank(panel, 50)
+    rng = np.random.default_rng(0)
+    population = PopulationArrays.random(3 * 40, rng, PARAM_RANGES)
+    rows = np.repeat(np.arange(3), 40)
+
+    _, stats = evaluate_panel_population(panel, bank, population, rows, rng)
+    for k in range(3):
+        members = np.flatnonzero(rows == k)
+        expected_fitness, expected = evaluate_population_arrays(series[k], population.take(members), rng)
+        assert np.array_equal(stats.trades[members], expected.trades)
+        assert np.allclose(stats.total_profit[members], expected.total_profit, rtol=1e-9, atol=1e-12)
+        assert np.allclose(stats.max_drawdown[members], expected.max_drawdown, rtol=1e-9, atol=1e-12)
+        fitness = compute_population_fitness(stats, population.target_profit_ratio, population.alpha,
+                                             panel.lengths[rows])[members]
+        assert np.all(np.abs(fitness - expected_fitness) <= 0.5 + 1e-9)
+
+
+def test_lockstep_evolution_returns_one_result_per_stock():
+    """同步演化回傳每檔股票的最佳結果，各股票的最佳適應度逐代不下降"""
+    data = {f"s{seed}": make_synthetic_data(seed=seed) for seed in range(4)}
+    with redirect_stdout(io.StringIO()):
+        optimizer = LockstepMultiStockOptimizer(data, population_size=16, generations=10, seed=5)
+        results = optimizer.evolve()
+
+    assert list(results) == list(data)
+    history = np.array(optimizer.best_fitness_history)
+    assert history.shape == (10, 4)
+    assert np.all(np.diff(history, axis=0) >= 0)
+    for k, result in enumerate(results.values()):
+        assert result.fitness == history[-1, k]
+        assert 5 <= result.parameters.m_intervals <= 50
+        assert result.test_result is not None
+
+
+if __name__ == "__main__":
+    test_panel_evaluation_matches_single_series()
+    test_lockstep_evolution_returns_one_result_per_stock()
+    print("✅ 多檔股票同步演化測試通過")
@@ -0,0 +1,90 @@
+"""
+NSGA-II 多目標最佳化測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from backtest_engine import PopulationStats, compute_population_fitness
+from nsga2 import NSGA2Optimizer, crowding_distance, dominance_matrix, non_dominated_sort, objective_matrix
+from synthetic_data import make_synthetic_data
+
+
+def brute_force_ranks(objectives):
+    """逐一剝除非支配個體的參考實作"""
+    ranks = np.full(len(objectives), -1)
+    remaining = set(range(len(objectives)))
+    rank = 0
+    while remaining:
+        front = [i for i in remaining
+                 if not any(np.all(objectives[j] <= objectives[i]) and np.any(objectives[j] < objectives[i])
+                            for j in remaining)]
+        ranks[front] = rank
+        remaining -= set(front)
+        rank += 1
+    return ranks
+
+
+def test_sorting_matches_reference():
+    """向量化非支配排序與參考實作一致，邊界個體擁擠距離為無限大"""
+    rng = np.random.default_rng(3)
+    objectives = np.round(rng.normal(size=(120, 3)), 1)   # 含重複值
+    objectives[:5] = np.inf
+    ranks = non_dominated_sort(objectives)
+    assert np.array_equal(ranks, brute_force_ranks(objectives))
+
+    distance = crowding_distance(objectives, ranks)
+    front = np.flatnonzero(ranks == 0)
+    for objective in range(3):
+        assert np.isinf(distance[front[np.argmin(objectives[front, objective])]])
+    assert np.all(distance >= 0)
+
+
+def test_no_trade_individuals_never_reach_front():
+    """沒有交易的個體（適應度 -3）即使回撤最低也不會進入柏拉圖前緣"""
+    stats = PopulationStats(
+        total_profit=np.array([0.0, 500.0, 800.0]), wins=np.array([0, 3, 4]), trades=np.array([0, 5, 6]),
+        max_drawdown=np.array([0.1, 0.2, 0.3]), sharpe_ratio=np.array([0.0, 1.0, 0.8]),
+        buy_signals=np.array([0, 5, 6])
+    )
+    objectives = objective_matrix(stats)
+    assert np.isinf(objectives[0]).all()
+    assert non_dominated_sort(objectives).tolist() == [1, 0, 0]
+
+
+def test_heavily_penalised_traders_keep_their_objectives():
+    """回撤懲罰使適應度低於 -5 的已交易個體仍以實際目標值參與排序，不會被當成無法回測"""
+    stats = PopulationStats(
+        total_profit=np.array([-0.9, 0.3, 0.0]), wins=np.array([1, 2, 0]), trades=np.array([8, 4, 0]),
+        max_drawdown=np.array([0.6, 0.4, 0.1]), sharpe_ratio=np.array([-1.5, 0.6, 0.0]),
+        buy_signals=np.array([8, 4, 0])
+    )
+    fitness = compute_population_fitness(stats, np.full(3, 0.1), np.full(3, 1.0), 500)
+    assert fitness[0] <= -5
+
+    objectives = objective_matrix(stats)
+    assert np.isfinite(objectives[0]).all() and np.isinf(objectives[2]).all()
+    assert non_dominated_sort(objectives).tolist() == [1, 0, 2]
+
+
+def test_front_is_mutually_non_dominated():
+    """回傳的柏拉圖前緣中沒有任何個體互相支配"""
+    with redirect_stdout(io.StringIO()):
+        optimizer = NSGA2Optimizer(make_synthetic_data(), seed=2, population_size=40, generations=8)
+        best = optimizer.evolve()
+
+    front = optimizer.pareto_front
+    assert front and best in front
+    objectives = np.array([[-r.total_profit, r.max_drawdown, -r.sharpe_ratio] for r in front])
+    assert not dominance_matrix(objectives).any()
+    assert all(r.test_result is not None for r in front)
+
+
+if __name__ == "__main__":
+    test_sorting_matches_reference()
+    test_no_trade_individuals_never_reach_front()
+    test_heavily_penalised_traders_keep_their_objectives()
+    test_front_is_mutually_non_dominated()
+    print("✅ NSGA-II 測試通過")
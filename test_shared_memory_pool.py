@@ -0,0 +1,103 @@
+"""
+共享記憶體行程池測試
+"""
+
+import io
+import os
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest_engine import prepare_series, run_population_backtest
+from fast_ga_optimizer import FastGeneticAlgorithm
+from shared_memory_pool import SharedMemoryEvaluationPool
+from synthetic_data import make_synthetic_data
+
+
+def test_pool_matches_in_process_backtest():
+    """行程池回測結果與主行程批次回測相同，並記錄計時統計"""
+    series = prepare_series(make_synthetic_data(), 'train')
+    rng = np.random.default_rng(5)
+    m = rng.integers(5, 51, 40)
+    h = rng.integers(1, 31, 40)
+    t = rng.uniform(0.02, 1.0, 40)
+    a = rng.uniform(0.5, 10.0, 40)
+
+    with SharedMemoryEvaluationPool(series, max_workers=2) as pool:
+        stats = pool.run_population_backtest(m, h, t, a)
+        timing = pool.timing_stats()
+
+    expected = run_population_backtest(series.close, m, h, t, a, series.ma_bank)
+    assert np.array_equal(stats.trades, expected.trades)
+    assert np.allclose(stats.total_profit, expected.total_profit, rtol=1e-12)
+    assert np.allclose(stats.sharpe_ratio, expected.sharpe_ratio, rtol=1e-12)
+    assert timing['pool_calls'] == 1 and timing['pool_startup_seconds'] > 0
+
+
+def test_fast_ga_with_process_backend():
+    """FastGeneticAlgorithm 使用行程池完成演化，計時統計包含行程池啟動與傳輸"""
+    with redirect_stdout(io.StringIO()):
+        ga = FastGeneticAlgorithm(make_synthetic_data(), population_size=12, generations=3,
+                                  max_workers=2, parallel_backend='process')
+        result = ga.evolve()
+
+    assert result.fitness > -10
+    assert ga.timing_stats['pool_calls'] >= 1
+    assert 'pool_startup_seconds' in ga.timing_stats and 'transfer_seconds' in ga.timing_stats
+    assert ga._process_pool is None
+
+
+def test_interrupted_evolve_releases_pool():
+    """演化中途被中斷時仍會關閉行程池並移除共享記憶體區段"""
+    class InterruptedGA(FastGeneticAlgorithm):
+        def record_diversity(self, population):
+            if len(self.best_fitness_history) == 2:
+                self.shm_name = self._process_pool._shm.name
+                raise KeyboardInterrupt
+            return super().record_diversity(population)
+
+    with redirect_stdout(io.StringIO()):
+        ga = InterruptedGA(make_synthetic_data(), population_size=12, generations=5,
+                           max_workers=2, parallel_backend='process')
+        try:
+            ga.evolve()
+        except KeyboardInterrupt:
+            pass
+        else:
+            raise AssertionError("應該傳出 KeyboardInterrupt")
+
+    assert ga._process_pool is None and ga._thread_pool is None
+    try:
+        shared_memory.SharedMemory(name=ga.shm_name).close()
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("共享記憶體區段應該已被移除")
+
+
+def test_closing_pool_keeps_resource_tracker_quiet():
+    """關閉行程池後 resource_tracker 不會因共享記憶體登記遺失而輸出錯誤"""
+    script = (
+        "from backtest_engine import prepare_series\n"
+        "from shared_memory_pool import SharedMemoryEvaluationPool\n"
+        "from test_vectorized_backtest import make_synthetic_data\n"
+        "series = prepare_series(make_synthetic_data(), 'train')\n"
+        "with SharedMemoryEvaluationPool(series, max_workers=2) as pool:\n"
+        "    pool.run_population_backtest([10, 20], [5, 8], [0.1, 0.2], [1.0, 2.0])\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), timeout=120)
+
+    assert completed.returncode == 0, completed.stderr
+    assert 'Traceback' not in completed.stderr and 'KeyError' not in completed.stderr, completed.stderr
+
+
+if __name__ == "__main__":
+    test_pool_matches_in_process_backtest()
+    test_fast_ga_with_process_backend()
+    test_interrupted_evolve_releases_pool()
+    test_closing_pool_keeps_resource_tracker_quiet()
+    print("✅ 共享記憶體行程池測試通過")
@@ -0,0 +1,47 @@
+"""
+非同步穩態遺傳演算法測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+from fast_ga_optimizer import get_optimizer_class
+from fitness_cache import quantize_parameters
+from ga_optimizer import TradingParameters, TradingResult
+from steady_state_ga import SteadyStateGeneticAlgorithm
+from synthetic_data import make_synthetic_data
+
+
+def test_stops_at_evaluation_budget():
+    """評估次數達到上限即停止，族群大小固定且沒有重複基因"""
+    with redirect_stdout(io.StringIO()):
+        ga = SteadyStateGeneticAlgorithm(make_synthetic_data(), population_size=20, max_evaluations=130,
+                                         max_workers=3)
+        result = ga.evolve()
+
+    assert ga.evaluation_history[-1] == 130
+    assert len(ga.population) == 20
+    assert len({quantize_parameters(member.parameters) for member in ga.population}) == 20
+    assert result.fitness >= max(member.fitness for member in ga.population)
+    assert ga.timing_stats['evaluations_per_second'] > 0
+    assert get_optimizer_class('steady') is SteadyStateGeneticAlgorithm
+
+
+def test_insert_replaces_worst():
+    """族群已滿時只有優於最差個體的結果會取代最差個體"""
+    with redirect_stdout(io.StringIO()):
+        ga = SteadyStateGeneticAlgorithm(make_synthetic_data(), population_size=2)
+
+    def result(m, fitness):
+        return TradingResult(TradingParameters(m, 5, 0.1, 5.0), fitness, 0, 0, 0.1)
+
+    assert ga.insert(result(10, 1.0)) and ga.insert(result(20, 3.0))
+    assert not ga.insert(result(30, 0.5))
+    assert ga.insert(result(40, 2.0))
+    assert sorted(member.fitness for member in ga.population) == [2.0, 3.0]
+
+
+if __name__ == "__main__":
+    test_stops_at_evaluation_budget()
+    test_insert_replaces_worst()
+    print("✅ 非同步穩態遺傳演算法測試通過")
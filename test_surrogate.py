@@ -0,0 +1,64 @@
+"""
+代理模型預篩選測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from surrogate import FitnessSurrogate, rank_correlation
+from synthetic_data import PARAM_RANGES, make_synthetic_data
+from vectorized_ga import PopulationArrays, VectorizedGeneticAlgorithm
+
+
+def test_surrogate_ranks_smooth_function():
+    """代理模型能排出平滑函數的順序，篩選只保留預測最好的比例"""
+    rng = np.random.default_rng(0)
+    archive = PopulationArrays.random(400, rng, PARAM_RANGES)
+    surrogate = FitnessSurrogate(PARAM_RANGES, screen_fraction=0.25)
+
+    def objective(population):
+        return -np.abs(population.m_intervals - 20) / 45 - np.abs(population.alpha - 30) / 98
+
+    surrogate.add(archive, objective(archive))
+    candidates = PopulationArrays.random(100, rng, PARAM_RANGES)
+    selected, predicted = surrogate.screen(candidates)
+
+    assert len(selected) == 25
+    assert rank_correlation(predicted, objective(candidates)) > 0.8
+    assert objective(candidates)[selected].mean() > objective(candidates).mean()
+
+
+def test_surrogate_keeps_heavily_penalised_backtests():
+    """回撤懲罰使適應度低於 -5 的已回測個體仍留在代理模型中，只排除未回測的個體"""
+    rng = np.random.default_rng(1)
+    population = PopulationArrays.random(10, rng, PARAM_RANGES)
+    fitness = np.array([-7.5, -6.0, 0.3, -5.0, -5.0, 1.2, -9.0, 0.1, -5.0, 0.4])
+    evaluated = np.array([True, True, True, False, False, True, True, True, False, True])
+
+    surrogate = FitnessSurrogate(PARAM_RANGES)
+    surrogate.add(population, fitness, evaluated)
+
+    assert surrogate.size == 7
+    assert np.array_equal(surrogate.fitness, fitness[evaluated])
+
+
+def test_vectorized_ga_reports_saved_evaluations():
+    """開啟代理模型時每代記錄節省的評估次數，族群大小不變"""
+    with redirect_stdout(io.StringIO()):
+        ga = VectorizedGeneticAlgorithm(make_synthetic_data(), seed=2, population_size=60, generations=8,
+                                        surrogate_fraction=0.5)
+        result = ga.evolve()
+
+    assert len(ga.surrogate.saved_history) == len(ga.best_fitness_history) - 1
+    assert all(saved == 29 for saved in ga.surrogate.saved_history)
+    assert len(ga.surrogate.correlation_history) == len(ga.surrogate.saved_history)
+    assert result.fitness == max(ga.best_fitness_history)
+
+
+if __name__ == "__main__":
+    test_surrogate_ranks_smooth_function()
+    test_surrogate_keeps_heavily_penalised_backtests()
+    test_vectorized_ga_reports_saved_evaluations()
+    print("✅ 代理模型預篩選測試通過")
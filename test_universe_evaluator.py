@@ -0,0 +1,65 @@
+"""
+跨股票張量評估器測試
+面板一次回測的結果應與逐檔回測相同
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from backtest_engine import compute_fitness, prepare_series, run_backtest
+from ga_optimizer import TradingParameters, split_train_test_data
+from synthetic_data import make_synthetic_data
+from universe_evaluator import UniversalGeneticAlgorithm, UniverseEvaluator
+
+
+def test_panel_matches_per_stock_backtest():
+    """不同長度的股票放在同一面板中，結果與逐檔回測一致"""
+    stock_data = {
+        f"{1100 + k}TW測試{k}": make_synthetic_data(days=days, seed=k)
+        for k, days in enumerate([1500, 1300, 900, 1450])
+    }
+    with redirect_stdout(io.StringIO()):
+        evaluator = UniverseEvaluator(stock_data)
+
+    for params in [TradingParameters(20, 5, 0.05, 1.0), TradingParameters(7, 1, 0.02, 0.5),
+                   TradingParameters(45, 30, 0.3, 3.0)]:
+        results = evaluator.evaluate(params)
+        assert len(results) == len(stock_data)
+
+        for name, result in zip(evaluator.stock_names, results):
+            with redirect_stdout(io.StringIO()):
+                train_data, _ = split_train_test_data(stock_data[name].copy())
+            series = prepare_series(train_data, name)
+            stats = run_backtest(series.close, params)
+            assert np.isclose(result.fitness, compute_fitness(stats, params, series.n_bars), rtol=1e-9)
+            assert np.isclose(result.total_profit, stats.total_profit * 1000, rtol=1e-9, atol=1e-9)
+            assert np.isclose(result.max_drawdown, stats.max_drawdown, rtol=1e-9, atol=1e-12)
+            assert np.isclose(result.sharpe_ratio, stats.sharpe_ratio, rtol=1e-9, atol=1e-12)
+
+        aggregate = evaluator.aggregate_fitness(params)
+        assert np.isclose(aggregate, np.mean([r.fitness for r in results]))
+
+
+def test_universal_ga_reuses_reference_series():
+    """通用參數 GA 沿用評估器的第一檔股票序列，evaluate_fitness 與基底類別的呼叫方式相容"""
+    stock_data = {f"{1200 + k}TW測試{k}": make_synthetic_data(days=1200, seed=k) for k in range(3)}
+    with redirect_stdout(io.StringIO()):
+        evaluator = UniverseEvaluator(stock_data)
+        ga = UniversalGeneticAlgorithm(evaluator, population_size=6, generations=1)
+
+    assert ga.train_series is evaluator.reference_series[0]
+    assert ga.test_series is evaluator.reference_series[1]
+    assert ga.train_data is evaluator.reference_split[0]
+
+    params = TradingParameters(20, 5, 0.05, 1.0)
+    result = ga.evaluate_fitness(params, ga.train_series)
+    assert np.isclose(result.fitness, evaluator.aggregate_fitness(params))
+    assert ga.evaluate_population([params], ga.train_series)[0].fitness == result.fitness
+
+
+if __name__ == "__main__":
+    test_panel_matches_per_stock_backtest()
+    test_universal_ga_reuses_reference_series()
+    print("✅ 跨股票張量評估結果與逐檔回測一致")
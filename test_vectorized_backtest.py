@@ -0,0 +1,161 @@
+"""
+向量化回測引擎等價性測試
+以合成股價資料比較 evaluate_fitness 與原始逐日迴圈參考實作的結果
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from ga_optimizer import GeneticAlgorithm, TradingParameters
+from synthetic_data import make_synthetic_data
+
+
+def test_vectorized_matches_reference():
+    """向量化引擎與參考實作在相同隨機種子下應得到相同結果"""
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(), population_size=5, generations=1)
+
+    rng = random.Random(7)
+    for case in range(80):
+        params = TradingParameters(
+            m_intervals=rng.randint(5, 50),
+            hold_days=rng.randint(1, 30),
+            target_profit_ratio=round(rng.uniform(0.02, 0.3), 4),
+            alpha=round(rng.choice([rng.uniform(0.5, 5.0), rng.uniform(0.5, 99.0)]), 3)
+        )
+
+        with redirect_stdout(io.StringIO()):
+            random.seed(case)
+            expected = ga.evaluate_fitness_reference(params)
+            random.seed(case)
+            actual = ga.evaluate_fitness(params)
+
+        for field in ['fitness', 'total_profit', 'win_rate', 'max_drawdown', 'sharpe_ratio']:
+            assert np.isclose(getattr(actual, field), getattr(expected, field), rtol=1e-9, atol=1e-9), \
+                f"{params} {field}: {getattr(actual, field)} != {getattr(expected, field)}"
+
+
+def test_population_matches_single():
+    """批次評估整個族群應與逐一評估結果相同"""
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(seed=3), population_size=5, generations=1)
+
+    random.seed(11)
+    population = [ga.create_random_individual() for _ in range(60)]
+    population += [TradingParameters(5, 1, 0.02, 0.5), TradingParameters(50, 30, 5.0, 99.0),
+                   TradingParameters(0, 3, 0.05, 1.0)]
+
+    random.seed(5)
+    expected = [ga.evaluate_fitness(params) for params in population]
+    random.seed(5)
+    actual = ga.evaluate_population(population)
+
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a.parameters is e.parameters
+        for field in ['fitness', 'total_profit', 'win_rate', 'max_drawdown', 'sharpe_ratio']:
+            assert np.isclose(getattr(a, field), getattr(e, field), rtol=1e-9, atol=1e-9), \
+                f"{a.parameters} {field}: {getattr(a, field)} != {getattr(e, field)}"
+
+
+def test_numba_kernel_matches_numpy():
+    """numba 編譯的狀態機與 NumPy 實作結果相同（未安裝 numba 時略過）"""
+    import backtest_engine
+    if not backtest_engine.NUMBA_AVAILABLE:
+        print("⚠️ 未安裝 numba，略過")
+        return
+
+    close = make_synthetic_data(days=1200, seed=9)['Close'].to_numpy()
+    bank = backtest_engine.MovingAverageBank(close)
+    rng = np.random.default_rng(1)
+    m = rng.integers(5, 51, 80)
+    h = rng.integers(1, 31, 80)
+    t = rng.uniform(0.02, 0.5, 80)
+    a = rng.uniform(0.5, 8.0, 80)
+
+    signals = backtest_engine.generate_signal_matrix(close, bank.matrix(m), a)
+    compiled = backtest_engine.simulate_population(close, signals, m, t, h)
+    fallback = backtest_engine.simulate_population_numpy(close, signals, m, t, h)
+    for field in ['total_profit', 'wins', 'trades', 'max_drawdown', 'sharpe_ratio', 'buy_signals']:
+        assert np.allclose(getattr(compiled, field), getattr(fallback, field), rtol=1e-9, atol=1e-12), field
+
+    for k in range(len(m)):
+        single = backtest_engine.simulate_trades(close, signals[k], m[k], t[k], h[k])
+        single_numpy = backtest_engine.simulate_trades_numpy(close, signals[k], m[k], t[k], h[k])
+        assert single.trades == single_numpy.trades == compiled.trades[k]
+        assert np.isclose(single.sharpe_ratio, single_numpy.sharpe_ratio, rtol=1e-9, atol=1e-12)
+        assert np.isclose(single.max_drawdown, single_numpy.max_drawdown, rtol=1e-9, atol=1e-12)
+
+
+def test_prepared_series_handles_bom_and_missing():
+    """預處理序列需移除BOM欄位名稱、轉為數值並移除缺值，日期與收盤價對齊"""
+    from backtest_engine import prepare_series
+
+    data = make_synthetic_data(days=100)
+    data.columns = ['\ufeffDate', 'Close']
+    data['Close'] = data['Close'].astype(object)
+    data.loc[10, 'Close'] = 'N/A'
+    data.loc[20, 'Close'] = np.nan
+
+    series = prepare_series(data, 'train')
+    assert series.is_valid and series.price_column == 'Close'
+    assert series.close.dtype == np.float64 and series.close.flags['C_CONTIGUOUS']
+    assert series.n_bars == 98 and len(series.dates) == 98
+    assert series.dates[10] == np.datetime64(data.loc[11, '\ufeffDate'])
+
+    assert not prepare_series(pd.DataFrame(), 'test').is_valid
+
+
+def test_concurrent_train_and_test_evaluation():
+    """訓練與測試評估在多執行緒中同時進行，不會互相影響"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(), population_size=5, generations=1)
+
+    random.seed(2)
+    population = [ga.create_random_individual() for _ in range(40)]
+    expected_train = [r.total_profit for r in ga.evaluate_population(population, ga.train_series)]
+    expected_test = [r.total_profit for r in ga.evaluate_population(population, ga.test_series)]
+    ga.fitness_cache.clear()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        train_jobs = [executor.submit(ga.evaluate_fitness, params) for params in population]
+        test_jobs = [executor.submit(ga.evaluate_on_test_data, params) for params in population]
+        train = [job.result().total_profit for job in train_jobs]
+        test = [job.result().total_profit for job in test_jobs]
+
+    assert ga.data is ga.train_data
+    assert np.allclose(train, expected_train) and np.allclose(test, expected_test)
+
+
+def test_evaluation_failure_prints_traceback():
+    """回測發生例外時給予懲罰適應度，並印出完整的錯誤追蹤"""
+    from contextlib import redirect_stderr
+    from dataclasses import replace
+
+    from backtest_engine import prepare_series
+    from ga_optimizer import evaluate_parameters
+
+    broken = replace(prepare_series(make_synthetic_data(days=200), 'train'), ma_bank=object())
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        result = evaluate_parameters(broken, TradingParameters(20, 5, 0.05, 1.0))
+
+    assert result.fitness == -10
+    assert "適應度評估失敗" in stdout.getvalue()
+    assert "Traceback" in stderr.getvalue()
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_reference()
+    test_population_matches_single()
+    test_numba_kernel_matches_numpy()
+    test_prepared_series_handles_bom_and_missing()
+    test_concurrent_train_and_test_evaluation()
+    test_evaluation_failure_prints_traceback()
+    print("✅ 向量化回測引擎與參考實作結果一致")
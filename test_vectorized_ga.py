@@ -0,0 +1,70 @@
+"""
+陣列化族群遺傳演算法測試
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from backtest_engine import compute_fitness, prepare_series, run_backtest
+from synthetic_data import PARAM_RANGES, make_synthetic_data
+from vectorized_ga import (PopulationArrays, VectorizedGeneticAlgorithm, blend_crossover,
+                           evaluate_population_arrays, mutate_population, tournament_select)
+
+
+def test_operators_stay_in_bounds():
+    """交叉與突變後的族群仍在參數範圍內，整數基因維持整數"""
+    rng = np.random.default_rng(0)
+    population = PopulationArrays.random(2000, rng, PARAM_RANGES)
+    fitness = rng.normal(size=2000)
+
+    winners = tournament_select(fitness, 4000, rng)
+    children = blend_crossover(population.take(winners[:2000]), population.take(winners[2000:]), rng, 0.8)
+    children = mutate_population(children, rng, 0.9, PARAM_RANGES)
+
+    assert len(children) == 2000
+    assert np.issubdtype(children.m_intervals.dtype, np.integer)
+    assert np.issubdtype(children.hold_days.dtype, np.integer)
+    for name, (low, high) in PARAM_RANGES.items():
+        values = getattr(children, name)
+        assert values.min() >= low and values.max() <= high
+    # 錦標賽勝者的平均適應度應高於族群平均
+    assert fitness[winners].mean() > fitness.mean()
+
+
+def test_array_evaluation_matches_single_backtest():
+    """陣列族群評估結果（扣除隨機擾動）與逐一回測相同"""
+    data = make_synthetic_data()
+    series = prepare_series(data, 'train')
+    rng = np.random.default_rng(1)
+    population = PopulationArrays.random(60, rng, PARAM_RANGES)
+    population = PopulationArrays.concat([population, population.take(np.arange(10))])
+
+    fitness, stats = evaluate_population_arrays(series, population, rng)
+    for i, params in enumerate(population.to_parameters()):
+        expected = run_backtest(series.close, params, series.ma_bank)
+        assert stats.trades[i] == expected.trades
+        assert np.isclose(stats.total_profit[i], expected.total_profit, rtol=1e-9, atol=1e-12)
+        if expected.buy_signals == 0:
+            assert fitness[i] == -3
+        else:
+            noise = 0.1 if expected.trades > 0 else 0.5
+            assert abs(fitness[i] - compute_fitness(expected, params, series.n_bars)) <= noise + 1e-9
+
+
+def test_large_population_evolves():
+    """大族群（500 個體）可完成演化並回傳最佳結果"""
+    with redirect_stdout(io.StringIO()):
+        ga = VectorizedGeneticAlgorithm(make_synthetic_data(), seed=7, population_size=500, generations=5)
+        result = ga.evolve()
+    assert len(ga.best_fitness_history) == 5
+    assert result.fitness == ga.best_fitness_history[-1]
+    assert 5 <= result.parameters.m_intervals <= 50
+
+
+if __name__ == "__main__":
+    test_operators_stay_in_bounds()
+    test_array_evaluation_matches_single_backtest()
+    test_large_population_evolves()
+    print("✅ 陣列化族群遺傳演算法測試通過")
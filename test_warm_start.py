@@ -0,0 +1,77 @@
+"""
+暖啟動初始族群測試
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+from ga_optimizer import GeneticAlgorithm, TradingParameters, load_warm_start_parameters
+from synthetic_data import make_synthetic_data
+from vectorized_ga import VectorizedGeneticAlgorithm
+
+
+class BestParametersTable:
+    """以記憶體中的紀錄模擬 DBConnector 的 BestParameters 查詢"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def extract_stock_code_from_table_name(self, table_name):
+        return table_name[:6]
+
+    def get_recent_best_params(self, stock_code, industry=None, limit=20):
+        return self.rows[:limit]
+
+
+def test_load_warm_start_parameters_skips_invalid_rows():
+    """無效的歷史紀錄不會成為種子"""
+    db = BestParametersTable([
+        {'BestIntervals': 20, 'HoldDays': 5, 'TargetProfitRatio': 0.05, 'Alpha': 1.5},
+        {'BestIntervals': None, 'HoldDays': 5, 'TargetProfitRatio': 0.05, 'Alpha': 1.5},
+        {'BestIntervals': 10, 'HoldDays': 0, 'TargetProfitRatio': 0.05, 'Alpha': 1.5},
+    ])
+    with redirect_stdout(io.StringIO()):
+        seeds = load_warm_start_parameters(db, '2330TW台積電', '半導體業')
+    assert seeds == [TradingParameters(20, 5, 0.05, 1.5)]
+
+
+def test_initial_population_uses_seed_fraction():
+    """初始族群中種子比例的個體來自歷史參數（每個種子保留一份原值，其餘小幅擾動）"""
+    seeds = [TradingParameters(20, 5, 0.05, 1.5), TradingParameters(40, 25, 0.3, 8.0)]
+    with redirect_stdout(io.StringIO()):
+        ga = GeneticAlgorithm(make_synthetic_data(), population_size=20, seed_parameters=seeds, seed_fraction=0.5)
+
+    random.seed(0)
+    population = ga.initial_population()
+    assert len(population) == 20
+    assert population[:2] == seeds
+    for i, individual in enumerate(population[2:10], start=2):
+        seed = seeds[i % 2]
+        assert abs(individual.m_intervals - seed.m_intervals) <= 2
+        assert abs(individual.hold_days - seed.hold_days) <= 2
+        assert abs(individual.alpha / seed.alpha - 1) <= 0.1 + 1e-3
+
+    with redirect_stdout(io.StringIO()):
+        cold = GeneticAlgorithm(make_synthetic_data(), population_size=20)
+    assert len(cold.initial_population()) == 20
+
+
+def test_vectorized_ga_starts_from_seeds():
+    """陣列化遺傳演算法的初始族群同樣由種子參數產生"""
+    seed = TradingParameters(20, 5, 0.05, 1.5)
+    with redirect_stdout(io.StringIO()):
+        ga = VectorizedGeneticAlgorithm(make_synthetic_data(), seed=1, population_size=12, generations=1,
+                                        seed_parameters=[seed], seed_fraction=1.0)
+        result = ga.evolve()
+
+    assert abs(result.parameters.m_intervals - seed.m_intervals) <= 2
+    assert abs(result.parameters.hold_days - seed.hold_days) <= 2
+    assert abs(result.parameters.alpha / seed.alpha - 1) <= 0.1 + 1e-3
+
+
+if __name__ == "__main__":
+    test_load_warm_start_parameters_skips_invalid_rows()
+    test_initial_population_uses_seed_fraction()
+    test_vectorized_ga_starts_from_seeds()
+    print("✅ 暖啟動測試通過")
@@ -0,0 +1,139 @@
+"""
+跨股票張量評估器
+將多檔股票整理成 (股票 × 交易日) 價格面板，以一次向量化回測評估同一組交易參數
+在整個股票池的表現，並提供產業通用參數最佳化所需的彙總適應度
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import replace
+from typing import Dict, List
+
+from backtest_engine import PreparedSeries, prepare_series, build_price_panel, run_panel_backtest, compute_fitness
+from ga_optimizer import GeneticAlgorithm, TradingParameters, TradingResult, split_train_test_data
+
+
+class UniverseEvaluator:
+    """以價格面板評估同一組參數在多檔股票上的表現"""
+
+    def __init__(self, stock_data: Dict[str, pd.DataFrame], window_range=(5, 50)):
+        train_series, test_series = [], []
+        # 第一檔股票的分割資料與預處理序列，提供給 GA 基底類別沿用（不重複分割與預處理）
+        self.reference_split = (pd.DataFrame(), pd.DataFrame())
+        self.reference_series = (prepare_series(None, 'train'), prepare_series(None, 'test'))
+        for name, data in stock_data.items():
+            train_data, test_data = split_train_test_data(data.copy())
+            train_series.append(prepare_series(train_data, name, window_range))
+            test_series.append(prepare_series(test_data, name, window_range))
+            if len(train_series) == 1:
+                self.reference_split = (train_data, test_data)
+                self.reference_series = (train_series[0], test_series[0])
+
+        self.train_panel = build_price_panel(train_series)
+        self.test_panel = build_price_panel(test_series)
+        self.reference_data = next(iter(stock_data.values())) if stock_data else pd.DataFrame()
+
+        print(f"📊 股票池面板: 訓練 {len(self.train_panel.names)} 檔 × {self.train_panel.close.shape[1]} 日, "
+              f"測試 {len(self.test_panel.names)} 檔")
+
+    @classmethod
+    def from_industry(cls, db, industry: str, min_rows: int = 50):
+        """從 StockIndustry 取得產業內所有股票並載入資料"""
+        stock_data = {}
+        for table in db.get_stocks_by_industry(industry):
+            if not db.validate_stock_table(table):
+                print(f"⚠️ 跳過 {table}: 不是有效的股票資料表")
+                continue
+            data = db.read_stock_data(table)
+            if data.empty or len(data) < min_rows:
+                print(f"⚠️ 跳過 {table}: 資料不足 ({len(data)} 筆)")
+                continue
+            stock_data[table] = data
+        return cls(stock_data)
+
+    @property
+    def stock_names(self) -> List[str]:
+        return list(self.train_panel.names)
+
+    def evaluate(self, params: TradingParameters, dataset: str = 'train') -> List[TradingResult]:
+        """一次向量化回測，回傳每檔股票的 TradingResult（適應度不含隨機擾動）"""
+        panel = self.train_panel if dataset == 'train' else self.test_panel
+        if len(panel.names) == 0:
+            return []
+
+        stats = run_panel_backtest(panel, params)
+        results = []
+        for k, n_bars in enumerate(panel.lengths):
+            n_bars = int(n_bars)
+            row = stats.row(k)
+            if n_bars < params.m_intervals + 10:
+                results.append(TradingResult(parameters=params, fitness=-5, total_profit=0,
+                                             win_rate=0, max_drawdown=1.0, sharpe_ratio=0.0))
+            elif row.buy_signals == 0:
+                results.append(TradingResult(parameters=params, fitness=-3, total_profit=0,
+                                             win_rate=0, max_drawdown=0.1, sharpe_ratio=0.0))
+            else:
+                results.append(TradingResult(
+                    parameters=params,
+                    fitness=compute_fitness(row, params, n_bars),
+                    total_profit=row.total_profit * 1000,
+                    win_rate=row.wins / row.trades if row.trades > 0 else 0,
+                    max_drawdown=row.max_drawdown,
+                    sharpe_ratio=row.sharpe_ratio
+                ))
+        return results
+
+    def aggregate(self, params: TradingParameters, results: List[TradingResult]) -> TradingResult:
+        """將各股票結果彙總為單一結果（各欄位取平均）"""
+        if not results:
+            return TradingResult(parameters=params, fitness=-10, total_profit=0,
+                                 win_rate=0, max_drawdown=1.0, sharpe_ratio=0.0)
+        return TradingResult(
+            parameters=params,
+            fitness=float(np.mean([r.fitness for r in results])),
+            total_profit=float(np.mean([r.total_profit for r in results])),
+            win_rate=float(np.mean([r.win_rate for r in results])),
+            max_drawdown=float(np.mean([r.max_drawdown for r in results])),
+            sharpe_ratio=float(np.mean([r.sharpe_ratio for r in results]))
+        )
+
+    def aggregate_fitness(self, params: TradingParameters, dataset: str = 'train') -> float:
+        """整個股票池的彙總適應度"""
+        return self.aggregate(params, self.evaluate(params, dataset)).fitness
+
+
+class UniversalGeneticAlgorithm(GeneticAlgorithm):
+    """以股票池彙總適應度最佳化單一組產業通用參數"""
+
+    def __init__(self, evaluator: UniverseEvaluator, **kwargs):
+        self.evaluator = evaluator
+        super().__init__(evaluator.reference_data, **kwargs)
+
+    def split_train_test_data(self, data):
+        """沿用評估器已分割好的第一檔股票資料"""
+        return self.evaluator.reference_split
+
+    def build_series(self) -> tuple:
+        """沿用評估器已建立的第一檔股票預處理序列"""
+        return self.evaluator.reference_series
+
+    def evaluate_fitness(self, params: TradingParameters, series: PreparedSeries = None) -> TradingResult:
+        """在訓練面板上評估彙總適應度（series 不使用，保留以與 GeneticAlgorithm 的介面相容）"""
+        cached = self.fitness_cache.get('universe', params)
+        if cached is None:
+            cached = self.evaluator.aggregate(params, self.evaluator.evaluate(params, 'train'))
+            self.fitness_cache.put('universe', params, cached)
+        return replace(cached, parameters=params)
+
+    def evaluate_population(self, population: List[TradingParameters],
+                            series: PreparedSeries = None) -> List[TradingResult]:
+        """逐一參數組評估，每組參數在整個股票池上一次向量化完成（series 不使用）"""
+        return [self.evaluate_fitness(params) for params in population]
+
+    def evaluate_on_test_data(self, params: TradingParameters) -> TradingResult:
+        """在測試面板上評估彙總表現"""
+        if len(self.evaluator.test_panel.names) == 0:
+            print("⚠️ 測試數據為空，無法進行測試評估")
+            return TradingResult(parameters=params, fitness=0, total_profit=0,
+                                 win_rate=0, max_drawdown=0, sharpe_ratio=0.0)
+        return self.evaluator.aggregate(params, self.evaluator.evaluate(params, 'test'))
@@ -0,0 +1,338 @@
+"""
+陣列化族群的遺傳演算法
+族群以四個 NumPy 陣列（結構陣列，structure-of-arrays）表示，
+錦標賽選擇、混合交叉、邊界突變與裁切都是整個陣列一次運算，
+所有隨機數由同一個 numpy.random.Generator 產生；
+族群放大到數百、數千個個體時，除了回測以外幾乎不增加成本
+"""
+
+import time
+from dataclasses import dataclass, fields, replace
+from typing import List
+
+import numpy as np
+
+from backtest_engine import (PreparedSeries, PopulationStats, run_population_backtest,
+                             compute_population_fitness, population_fitness_noise)
+from ga_optimizer import GENE_NAMES, GeneticAlgorithm, TradingParameters, TradingResult, genotypic_diversity
+
+STAT_FIELDS = tuple(field.name for field in fields(PopulationStats))
+
+
+@dataclass
+class PopulationArrays:
+    """以四個陣列表示的族群，第 i 個個體為各陣列的第 i 個元素"""
+    m_intervals: np.ndarray
+    hold_days: np.ndarray
+    target_profit_ratio: np.ndarray
+    alpha: np.ndarray
+
+    def __len__(self):
+        return len(self.m_intervals)
+
+    @classmethod
+    def random(cls, size: int, rng: np.random.Generator, param_ranges: dict, max_target_ratio: float = 1.0):
+        """產生隨機族群（分佈與 GeneticAlgorithm.create_random_individual 相同）"""
+        m_low, m_high = param_ranges['m_intervals']
+        h_low, h_high = param_ranges['hold_days']
+        a_low, a_high = param_ranges['alpha']
+        return cls(
+            m_intervals=rng.integers(m_low, m_high, size, endpoint=True),
+            hold_days=rng.integers(h_low, h_high, size, endpoint=True),
+            target_profit_ratio=np.round(rng.uniform(param_ranges['target_profit_ratio'][0], max_target_ratio, size), 4),
+            alpha=np.round(rng.uniform(a_low, a_high, size), 3)
+        )
+
+    @classmethod
+    def from_parameters(cls, population: List[TradingParameters]):
+        """由 TradingParameters 串列建立"""
+        genes = np.array([p.as_tuple() for p in population], dtype=np.float64).reshape(-1, len(GENE_NAMES))
+        return cls(
+            m_intervals=genes[:, 0].astype(np.int64),
+            hold_days=genes[:, 1].astype(np.int64),
+            target_profit_ratio=genes[:, 2],
+            alpha=genes[:, 3]
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        """串接多個族群"""
+        return cls(*(np.concatenate([getattr(part, name) for part in parts]) for name in GENE_NAMES))
+
+    def take(self, indices):
+        """依索引取出個體（可重複）"""
+        return PopulationArrays(*(getattr(self, name)[indices] for name in GENE_NAMES))
+
+    def parameters(self, i: int) -> TradingParameters:
+        """取出第 i 個個體"""
+        return TradingParameters(
+            m_intervals=int(self.m_intervals[i]),
+            hold_days=int(self.hold_days[i]),
+            target_profit_ratio=float(self.target_profit_ratio[i]),
+            alpha=float(self.alpha[i])
+        )
+
+    def to_parameters(self) -> List[TradingParameters]:
+        """轉換為 TradingParameters 串列"""
+        return [self.parameters(i) for i in range(len(self))]
+
+    def as_matrix(self) -> np.ndarray:
+        """(個體數 × 4) 的基因矩陣"""
+        return np.column_stack([getattr(self, name).astype(np.float64) for name in GENE_NAMES])
+
+
+def clip_population(population: PopulationArrays, param_ranges: dict) -> PopulationArrays:
+    """將每個基因裁切到參數範圍內"""
+    return PopulationArrays(*(np.clip(getattr(population, name), *param_ranges[name]) for name in GENE_NAMES))
+
+
+def tournament_select(fitness: np.ndarray, n: int, rng: np.random.Generator, tournament_size: int = 3) -> np.ndarray:
+    """一次進行 n 場錦標賽，回傳勝者索引（每場的參賽者可重複抽出）"""
+    contestants = rng.integers(0, len(fitness), (n, tournament_size))
+    return contestants[np.arange(n), np.argmax(fitness[contestants], axis=1)]
+
+
+def blend_crossover(parent1: PopulationArrays, parent2: PopulationArrays, rng: np.random.Generator,
+                    crossover_rate: float) -> PopulationArrays:
+    """整批混合交叉：整數基因隨機取自其中一個親代，連續基因以 0.3~0.7 的權重插值
+
+    未進行交叉的子代隨機複製其中一個親代（與 GeneticAlgorithm.crossover 相同）
+    """
+    n = len(parent1)
+    crossed = rng.random(n) < crossover_rate
+    copy_first = rng.random(n) < 0.5
+    blend = rng.uniform(0.3, 0.7, n)
+
+    def discrete(name):
+        pick_first = np.where(crossed, rng.random(n) < 0.5, copy_first)
+        return np.where(pick_first, getattr(parent1, name), getattr(parent2, name))
+
+    def continuous(name):
+        first, second = getattr(parent1, name), getattr(parent2, name)
+        mixed = first * blend + second * (1 - blend)
+        return np.where(crossed, mixed, np.where(copy_first, first, second))
+
+    return PopulationArrays(
+        m_intervals=discrete('m_intervals'),
+        hold_days=discrete('hold_days'),
+        target_profit_ratio=continuous('target_profit_ratio'),
+        alpha=continuous('alpha')
+    )
+
+
+def mutate_population(population: PopulationArrays, rng: np.random.Generator, mutation_rate: float,
+                      param_ranges: dict) -> PopulationArrays:
+    """整批邊界突變（每個基因的突變機率與步幅與 GeneticAlgorithm.mutate 相同），最後裁切到範圍內"""
+    n = len(population)
+
+    def mask():
+        return (rng.random(n) < mutation_rate) & (rng.random(n) < 0.25)
+
+    mutated = PopulationArrays(
+        m_intervals=population.m_intervals + np.where(mask(), rng.integers(-8, 8, n, endpoint=True), 0),
+        hold_days=population.hold_days + np.where(mask(), rng.integers(-5, 5, n, endpoint=True), 0),
+        target_profit_ratio=population.target_profit_ratio + np.where(mask(), rng.uniform(-0.03, 0.03, n), 0.0),
+        alpha=population.alpha + np.where(mask(), rng.uniform(-5.0, 5.0, n), 0.0)
+    )
+    return clip_population(mutated, param_ranges)
+
+
+def backtested_mask(series: PreparedSeries, population: PopulationArrays) -> np.ndarray:
+    """實際會進行回測的個體（序列可評估且資料長度足夠），其餘個體只給予懲罰適應度"""
+    if not series.is_valid:
+        return np.zeros(len(population), dtype=bool)
+    return series.n_bars >= population.m_intervals + 10
+
+
+def evaluate_population_arrays(series: PreparedSeries, population: PopulationArrays,
+                               rng: np.random.Generator):
+    """評估陣列族群，回傳 (含隨機擾動的適應度, 回測統計)
+
+    相同參數（量化後）只回測一次；資料不足的個體給予 -5，序列無法評估時全部給予 -10
+    """
+    n = len(population)
+    stats = PopulationStats(
+        total_profit=np.zeros(n), wins=np.zeros(n, dtype=np.int64), trades=np.zeros(n, dtype=np.int64),
+        max_drawdown=np.ones(n), sharpe_ratio=np.zeros(n), buy_signals=np.zeros(n, dtype=np.int64)
+    )
+    if not series.is_valid:
+        return np.full(n, -10.0), stats
+
+    enough_data = backtested_mask(series, population)
+    fitness = np.full(n, -5.0)
+    if not enough_data.any():
+        return fitness, stats
+
+    # 依量化參數去重後整批回測
+    batch = np.flatnonzero(enough_data)
+    keys = np.column_stack([
+        population.m_intervals[batch], population.hold_days[batch],
+        np.round(population.target_profit_ratio[batch], 4), np.round(population.alpha[batch], 3)
+    ])
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    members = batch[first]
+    unique_stats = run_population_backtest(
+        series.close, population.m_intervals[members], population.hold_days[members],
+        population.target_profit_ratio[members], population.alpha[members], series.ma_bank
+    )
+    inverse = inverse.ravel()
+    for name in STAT_FIELDS:
+        getattr(stats, name)[batch] = getattr(unique_stats, name)[inverse]
+    stats.max_drawdown[batch] = np.where(stats.buy_signals[batch] == 0, 0.1, stats.max_drawdown[batch])
+
+    batch_stats = PopulationStats(*(getattr(stats, name)[batch] for name in STAT_FIELDS))
+    fitness[batch] = (compute_population_fitness(batch_stats, population.target_profit_ratio[batch],
+                                                 population.alpha[batch], series.n_bars)
+                      + population_fitness_noise(batch_stats, rng))
+    return fitness, stats
+
+
+def concat_stats(parts) -> PopulationStats:
+    """串接多個族群的回測統計"""
+    return PopulationStats(*(np.concatenate([getattr(part, name) for part in parts]) for name in STAT_FIELDS))
+
+
+def take_stats(stats: PopulationStats, indices) -> PopulationStats:
+    """依索引取出回測統計"""
+    return PopulationStats(*(getattr(stats, name)[indices] for name in STAT_FIELDS))
+
+
+def population_result(population: PopulationArrays, fitness: np.ndarray, stats: PopulationStats, i: int) -> TradingResult:
+    """將第 i 個個體的評估結果轉換為 TradingResult"""
+    trades = int(stats.trades[i])
+    return TradingResult(
+        parameters=population.parameters(i),
+        fitness=float(fitness[i]),
+        total_profit=float(stats.total_profit[i]) * 1000,
+        win_rate=int(stats.wins[i]) / trades if trades > 0 else 0,
+        max_drawdown=float(stats.max_drawdown[i]),
+        sharpe_ratio=float(stats.sharpe_ratio[i])
+    )
+
+
+def evolve_generation(series: PreparedSeries, population: PopulationArrays, fitness: np.ndarray,
+                      stats: PopulationStats, rng: np.random.Generator, crossover_rate: float,
+                      mutation_rate: float, param_ranges: dict, tournament_size: int = 3, surrogate=None):
+    """演化一個世代：保留最佳個體與其評估結果，其餘以選擇、交叉、突變產生並整批評估
+
+    提供 surrogate（surrogate.FitnessSurrogate）時先以代理模型預測子代適應度，
+    只回測預測最好的一部分，空出的位置由上一代適應度最高的個體補上。
+    回傳 (新族群, 適應度, 回測統計)，族群大小不變
+    """
+    n_children = len(population) - 1
+    parents = tournament_select(fitness, 2 * n_children, rng, tournament_size)
+    children = blend_crossover(population.take(parents[:n_children]), population.take(parents[n_children:]),
+                               rng, crossover_rate)
+    children = mutate_population(children, rng, mutation_rate, param_ranges)
+
+    if surrogate is not None:
+        selected, predicted = surrogate.screen(children)
+        children = children.take(selected)
+        child_fitness, child_stats = evaluate_population_arrays(series, children, rng)
+        surrogate.record(n_children, predicted[selected] if predicted is not None else None, child_fitness)
+        surrogate.add(children, child_fitness, backtested_mask(series, children))
+    else:
+        child_fitness, child_stats = evaluate_population_arrays(series, children, rng)
+
+    # 最佳個體（及篩選掉的子代名額）由上一代適應度最高的個體保留
+    elite = np.argsort(-fitness, kind='stable')[:len(population) - len(children)]
+    return (PopulationArrays.concat([population.take(elite), children]),
+            np.concatenate([fitness[elite], child_fitness]),
+            concat_stats([take_stats(stats, elite), child_stats]))
+
+
+class VectorizedGeneticAlgorithm(GeneticAlgorithm):
+    """以陣列化族群執行演化的遺傳演算法（停止條件與輸出與 GeneticAlgorithm 相同）"""
+
+    supports_checkpoint = False
+
+    def __init__(self, data, seed: int = None, tournament_size: int = 3, surrogate_fraction: float = None,
+                 surrogate_neighbors: int = 5, **kwargs):
+        super().__init__(data, **kwargs)
+        self.rng = np.random.default_rng(seed)
+        self.tournament_size = tournament_size
+        # 代理模型預篩選：每代只回測預測最好的 surrogate_fraction 比例子代（None 表示不使用）
+        self.surrogate_fraction = surrogate_fraction
+        self.surrogate_neighbors = surrogate_neighbors
+        self.surrogate = None
+
+    def evolve(self) -> TradingResult:
+        """執行陣列化遺傳演算法"""
+        start_time = time.time()
+        series = self.train_series
+
+        if self.seed_parameters:
+            # 暖啟動：初始族群包含由歷史最佳參數產生的個體
+            population = PopulationArrays.from_parameters(self.initial_population())
+        else:
+            population = PopulationArrays.random(self.population_size, self.rng, self.param_ranges)
+        fitness, stats = evaluate_population_arrays(series, population, self.rng)
+        if self.surrogate_fraction is not None:
+            from surrogate import FitnessSurrogate
+
+            self.surrogate = FitnessSurrogate(self.param_ranges, self.surrogate_fraction, self.surrogate_neighbors,
+                                              min_samples=min(50, self.population_size))
+            self.surrogate.add(population, fitness, backtested_mask(series, population))
+
+        generation = 0
+        while generation < self.generations:
+            best_fitness = float(fitness.max())
+            avg_fitness = float(fitness.mean())
+            self.best_fitness_history.append(best_fitness)
+            self.avg_fitness_history.append(avg_fitness)
+            self.diversity_history.append(genotypic_diversity(population.as_matrix(), self.param_ranges))
+
+            stop_conditions = []
+            if self.check_time_limit(start_time):
+                self.stop_reason = f"達到時間限制 ({self.max_time_minutes} 分鐘)"
+                stop_conditions.append("時間限制")
+            if self.check_convergence():
+                self.stop_reason = f"種群已收斂 (適應度變異 < {self.convergence_threshold})"
+                stop_conditions.append("種群收斂")
+            if self.check_diversity_collapse():
+                self.stop_reason = f"族群基因已塌縮 (多樣性 {self.diversity_history[-1]:.4f} < {self.diversity_threshold})"
+                stop_conditions.append("多樣性塌縮")
+            if generation >= self.generations - 1:
+                self.stop_reason = f"達到最大世代數 ({self.generations})"
+                stop_conditions.append("最大世代")
+
+            if stop_conditions:
+                print(f"世代 {generation}: 停止演化 - {', '.join(stop_conditions)}")
+                print(f"最佳適應度 = {best_fitness:.4f}, 平均適應度 = {avg_fitness:.4f}")
+                break
+
+            # 菁英主義：最佳個體與其評估結果原樣保留，只評估子代
+            population, fitness, stats = evolve_generation(
+                series, population, fitness, stats, self.rng, self.crossover_rate,
+                self.diversity_mutation_rate(self.mutation_rate), self.param_ranges, self.tournament_size,
+                self.surrogate
+            )
+
+            if generation % 5 == 0:
+                elapsed_minutes = (time.time() - start_time) / 60
+                print(f"世代 {generation}: 最佳適應度 = {best_fitness:.4f}, 平均適應度 = {avg_fitness:.4f}, 已用時間 = {elapsed_minutes:.1f}分")
+                if self.surrogate is not None:
+                    print(f"   代理模型: 節省 {self.surrogate.saved_history[-1]} 次評估, "
+                          f"等級相關 = {self.surrogate.correlation_history[-1]:.3f}")
+
+            generation += 1
+
+        best_result = population_result(population, fitness, stats, int(np.argmax(fitness)))
+        total_time = (time.time() - start_time) / 60
+        test_result = self.evaluate_on_test_data(best_result.parameters)
+
+        print(f"\n🎉 演化完成!")
+        print(f"📊 停止原因: {self.stop_reason}")
+        print(f"⏱️  總用時間: {total_time:.2f} 分鐘")
+        print(f"🔢 執行世代: {generation + 1} / {self.generations}")
+        if self.surrogate is not None:
+            correlations = np.array(self.surrogate.correlation_history)
+            mean_correlation = np.nanmean(correlations) if np.isfinite(correlations).any() else float('nan')
+            print(f"🤖 代理模型共節省 {self.surrogate.total_saved} 次評估, 平均等級相關 = {mean_correlation:.3f}")
+        print(f"📈 訓練數據最佳適應度: {best_result.fitness:.4f}")
+
+        if not self.test_data.empty:
+            print(f"🧪 測試數據適應度: {test_result.fitness:.4f}")
+            print(f"📊 訓練vs測試差異: {best_result.fitness - test_result.fitness:.4f}")
+
+        return replace(best_result, test_result=test_result if not self.test_data.empty else None)